@@ -0,0 +1,92 @@
+"""
+Providers producing the analysis of a prompt.
+
+A backend is a class with an analyze(prompt, timeout) method returning the analysis text, or
+raising BackendError. ANALYZER_BACKEND is the dotted path of the backend used; StubBackend
+answers locally and deterministically, for development and tests, and OpenAIBackend calls the
+chat completions API of OpenAI, which needs the openai package.
+"""
+
+import hashlib
+from functools import lru_cache
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+SYSTEM_PROMPT = "You are a software debugging assistant."
+
+
+class BackendError(Exception):
+    """
+    Failure of a provider call; retryable ones (timeouts, rate limiting, server errors) are
+    retried by analyzer.client.
+    """
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class AnalysisBackend:
+    def analyze(self, prompt, timeout):
+        """
+        Returns the analysis of prompt, giving up after timeout seconds.
+        """
+        raise NotImplementedError
+
+
+class StubBackend(AnalysisBackend):
+    """
+    Returns the same made-up analysis for the same prompt, without calling any provider.
+    """
+
+    def analyze(self, prompt, timeout):
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        first_line = prompt.strip().partition('\n')[0]
+        return f"Stub analysis {digest} of: {first_line}"
+
+
+class OpenAIBackend(AnalysisBackend):
+    """
+    Asks ANALYZER_OPENAI_MODEL through the chat completions API. Retries are left to
+    analyzer.client, so the client of the openai package does not retry.
+    """
+
+    def __init__(self):
+        if openai is None:
+            raise ImproperlyConfigured('OpenAIBackend requires the openai package.')
+        self.client = openai.OpenAI(api_key=settings.ANALYZER_OPENAI_API_KEY, max_retries=0)
+
+    def analyze(self, prompt, timeout):
+        try:
+            response = self.client.chat.completions.create(
+                model=settings.ANALYZER_OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                timeout=timeout,
+            )
+        except (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                openai.InternalServerError) as e:
+            raise BackendError(str(e), retryable=True) from e
+        except openai.OpenAIError as e:
+            raise BackendError(str(e)) from e
+        return response.choices[0].message.content
+
+
+@lru_cache
+def load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    """
+    Returns the instance of the ANALYZER_BACKEND class, shared by the whole process.
+    """
+    return load_backend(settings.ANALYZER_BACKEND)
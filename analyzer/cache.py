@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from .models import ErrorAnalysis
+
+
+class AnalysisCache:
+    """
+    Maps (fingerprint, prompt version) to the text of its ErrorAnalysis.
+
+    Lookups go through an in-process LRU of ANALYZER_CACHE_SIZE entries, then, when
+    ANALYZER_CACHE_ALIAS names one of the configured CACHES, Django's cache framework shared by
+    every worker, and finally the ErrorAnalysis table. Analyses never change once stored, so the
+    entries do not need to be invalidated.
+    """
+    key_prefix = 'analysis:'
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        alias = settings.ANALYZER_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, fingerprint, prompt_version):
+        key = (fingerprint, prompt_version)
+        analysis = self._get_local(key)
+        if analysis is not None:
+            return analysis
+
+        if self.shared is not None:
+            analysis = self.shared.get(self._shared_key(key))
+        if analysis is None:
+            analysis = (ErrorAnalysis.objects
+                        .filter(fingerprint=fingerprint, prompt_version=prompt_version)
+                        .values_list('analysis', flat=True)
+                        .first())
+            if analysis is None:
+                return None
+            self._set_shared(key, analysis)
+        self._set_local(key, analysis)
+        return analysis
+
+    def get_many(self, fingerprints, prompt_version):
+        """
+        Returns a dict mapping the fingerprints with an analysis to it, with at most one lookup
+        in the shared cache and one query.
+        """
+        analyses = {}
+        missing = []
+        for fingerprint in fingerprints:
+            analysis = self._get_local((fingerprint, prompt_version))
+            if analysis is None:
+                missing.append(fingerprint)
+            else:
+                analyses[fingerprint] = analysis
+
+        if missing and self.shared is not None:
+            shared = self.shared.get_many([self._shared_key((fingerprint, prompt_version)) for fingerprint in missing])
+            for fingerprint in missing:
+                analysis = shared.get(self._shared_key((fingerprint, prompt_version)))
+                if analysis is not None:
+                    analyses[fingerprint] = analysis
+                    self._set_local((fingerprint, prompt_version), analysis)
+            missing = [fingerprint for fingerprint in missing if fingerprint not in analyses]
+
+        if missing:
+            stored = ErrorAnalysis.objects.filter(fingerprint__in=missing, prompt_version=prompt_version)
+            for fingerprint, analysis in stored.values_list('fingerprint', 'analysis'):
+                analyses[fingerprint] = analysis
+                self._set_shared((fingerprint, prompt_version), analysis)
+                self._set_local((fingerprint, prompt_version), analysis)
+        return analyses
+
+    def set(self, fingerprint, prompt_version, analysis):
+        """
+        Stores an analysis and returns the one stored for the key, which is the existing one if
+        another worker stored it first.
+        """
+        key = (fingerprint, prompt_version)
+        analysis = ErrorAnalysis.objects.get_or_create(
+            fingerprint=fingerprint, prompt_version=prompt_version, defaults={'analysis': analysis}
+        )[0].analysis
+        self._set_shared(key, analysis)
+        self._set_local(key, analysis)
+        return analysis
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _shared_key(self, key):
+        return f'{self.key_prefix}{key[1]}:{key[0]}'
+
+    def _set_shared(self, key, analysis):
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), analysis, settings.ANALYZER_CACHE_TTL)
+
+    def _get_local(self, key):
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+            return analysis
+
+    def _set_local(self, key, analysis):
+        with self._lock:
+            self._entries[key] = analysis
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.ANALYZER_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,101 @@
+"""
+Calls of the analysis backend, bounded in number and shared between concurrent requests.
+
+Provider calls run on a pool of ANALYZER_MAX_CONCURRENCY threads, so however many requests need
+an analysis, at most that many calls are in flight, and at most ANALYZER_MAX_PENDING distinct
+prompts are queued or running. A request for a key that is already being analyzed waits for that
+call instead of making another one. Every attempt is given ANALYZER_TIMEOUT seconds; retryable
+failures are retried ANALYZER_RETRIES times, after a random delay of up to
+ANALYZER_RETRY_BACKOFF * 2 ** attempt seconds so the workers failing together do not retry
+together.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .backends import BackendError, get_backend
+
+
+class AnalysisFailed(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = 'The analysis provider failed.'
+    default_code = 'analysis_failed'
+
+
+class AnalysisTimeout(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = 'The analysis provider did not answer in time.'
+    default_code = 'analysis_timeout'
+
+
+class AnalyzerBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many analyses are in progress, try again later.'
+    default_code = 'analyzer_busy'
+
+
+class AnalysisClient:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._executor = None
+
+    def analyze(self, key, prompt):
+        """
+        Returns the backend's analysis of prompt, sharing the call with the other requests for key.
+
+        Raises AnalyzerBusy, AnalysisTimeout or AnalysisFailed. A call the caller stopped waiting
+        for still runs to completion, and its result goes to the requests still waiting for it.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            # Calls that just finished may not have been forgotten yet
+            if future is None or future.done():
+                if len(self._in_flight) >= settings.ANALYZER_MAX_PENDING:
+                    self._in_flight = {k: f for k, f in self._in_flight.items() if not f.done()}
+                    if len(self._in_flight) >= settings.ANALYZER_MAX_PENDING:
+                        raise AnalyzerBusy()
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(settings.ANALYZER_MAX_CONCURRENCY,
+                                                        thread_name_prefix='analyzer')
+                future = self._in_flight[key] = self._executor.submit(self._call, prompt)
+        # Outside of the lock, as the callback runs right away if the call is already done
+        future.add_done_callback(lambda done: self._forget(key, done))
+
+        try:
+            return future.result(timeout=self.wait_timeout())
+        except TimeoutError:
+            raise AnalysisTimeout()
+        except BackendError as e:
+            raise AnalysisFailed(str(e)) from e
+
+    @staticmethod
+    def wait_timeout():
+        """
+        Returns how long a call may take with all its attempts and the delays between them.
+        """
+        retries = settings.ANALYZER_RETRIES
+        return settings.ANALYZER_TIMEOUT * (retries + 1) + settings.ANALYZER_RETRY_BACKOFF * (2 ** retries - 1)
+
+    @staticmethod
+    def _call(prompt):
+        backend = get_backend()
+        for attempt in range(settings.ANALYZER_RETRIES + 1):
+            try:
+                return backend.analyze(prompt, settings.ANALYZER_TIMEOUT)
+            except BackendError as e:
+                if not e.retryable or attempt == settings.ANALYZER_RETRIES:
+                    raise
+            time.sleep(random.uniform(0, settings.ANALYZER_RETRY_BACKOFF * 2 ** attempt))
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+analysis_client = AnalysisClient()
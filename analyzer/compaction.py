@@ -0,0 +1,174 @@
+"""
+Compaction of error messages to a token budget before they are sent to an analysis provider.
+
+Tracebacks are reduced in steps, each applied only while the message is over budget:
+
+1. runs of identical frames or cycles of frames (recursion) are collapsed to their first
+   occurrence and a "[Previous N frames repeated M more times]" marker;
+2. every line of a frame but its "File ..." line, i.e. its source line and locals, is cut to
+   ANALYZER_PROMPT_MAX_LINE_CHARS characters;
+3. of every traceback, only the ANALYZER_PROMPT_EDGE_FRAMES outermost and innermost frames are
+   kept, then fewer, down to one of each;
+4. the middle of the message is cut, keeping its beginning and its end with the exception.
+
+Lines outside of frames, i.e. the exception lines and the chained exception messages, are kept
+by the first three steps. Tokens are estimated locally by estimate_tokens(), a single regex pass
+approximating the BPE tokenizers of the providers (a token per symbol and per 4 characters of a
+word), so no tokenizer has to be loaded or called.
+"""
+
+import re
+from collections import namedtuple
+from django.conf import settings
+
+CompactedMessage = namedtuple('CompactedMessage', ['text', 'tokens', 'original_tokens'])
+
+# Words and single symbols; a word is counted as one token per 4 characters
+_TOKEN_PIECE = re.compile(r'\w+|[^\w\s]')
+_FRAME_START = re.compile(r'^\s*File "[^"]*", line (?:\d+|<n>)')
+
+# Longest cycle of frames collapsed by collapse_repeated_frames()
+MAX_CYCLE_LENGTH = 4
+
+
+def estimate_tokens(text):
+    """
+    Returns an estimate of the number of tokens of text.
+    """
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECE.findall(text))
+
+
+def split_traceback(lines):
+    """
+    Splits lines into text lines and runs of frames: yields ('text', line) and ('frames', frames)
+    items, a frame being the tuple of its "File ..." line and the more indented lines after it.
+    """
+    frames = []
+    frame = None
+    for line in lines:
+        if _FRAME_START.match(line):
+            if frame is not None:
+                frames.append(tuple(frame))
+            frame = [line]
+        elif frame is not None and line.startswith(' ' * (len(frame[0]) - len(frame[0].lstrip()) + 1)):
+            frame.append(line)
+        else:
+            if frame is not None:
+                frames.append(tuple(frame))
+                frame = None
+            if frames:
+                yield 'frames', frames
+                frames = []
+            yield 'text', line
+    if frame is not None:
+        frames.append(tuple(frame))
+    if frames:
+        yield 'frames', frames
+
+
+def collapse_repeated_frames(frames):
+    """
+    Returns frames with every repetition of a frame or a cycle of up to MAX_CYCLE_LENGTH frames
+    replaced by a marker line, itself a one-line frame.
+    """
+    collapsed = []
+    index = 0
+    while index < len(frames):
+        best_length, best_repeats = 1, 1
+        for length in range(1, MAX_CYCLE_LENGTH + 1):
+            cycle = frames[index:index + length]
+            repeats = 1
+            while frames[index + repeats * length:index + (repeats + 1) * length] == cycle:
+                repeats += 1
+            if repeats > 1 and repeats * length > best_repeats * best_length:
+                best_length, best_repeats = length, repeats
+        collapsed.extend(frames[index:index + best_length])
+        if best_repeats > 1:
+            frames_word = 'frame' if best_length == 1 else f'{best_length} frames'
+            collapsed.append((f'  [Previous {frames_word} repeated {best_repeats - 1} more times]',))
+        index += best_length * best_repeats
+    return collapsed
+
+
+def truncate_frame_lines(frame, max_chars):
+    """
+    Cuts the lines of a frame after its "File ..." line to max_chars characters.
+    """
+    return frame[:1] + tuple(
+        line if len(line) <= max_chars else f'{line[:max_chars]}... [{len(line) - max_chars} chars]'
+        for line in frame[1:]
+    )
+
+
+def keep_edge_frames(frames, count):
+    """
+    Returns the count outermost and count innermost frames, with a marker for the ones omitted.
+    """
+    if len(frames) <= 2 * count + 1:
+        return frames
+    omitted = len(frames) - 2 * count
+    return frames[:count] + [(f'  [{omitted} frames omitted]',)] + frames[-count:]
+
+
+def join_traceback(items):
+    lines = []
+    for kind, value in items:
+        if kind == 'text':
+            lines.append(value)
+        else:
+            lines.extend(line for frame in value for line in frame)
+    return '\n'.join(lines)
+
+
+def truncate_middle(text, budget):
+    """
+    Cuts the middle of text down to budget tokens, keeping a third of what is left before the
+    cut and two thirds after, where the exception is.
+    """
+    original = text
+    tokens = estimate_tokens(text)
+    keep = len(text)
+    while tokens > budget and keep > 0:
+        keep = int(keep * min(budget / tokens, 0.9))
+        head = original[:keep // 3]
+        tail = original[len(original) - (keep - keep // 3):]
+        text = f'{head}\n[... {len(original) - keep} chars omitted ...]\n{tail}'
+        tokens = estimate_tokens(text)
+    return text
+
+
+def compact_error_message(error_message, budget=None):
+    """
+    Returns a CompactedMessage of error_message within budget tokens (ANALYZER_PROMPT_TOKEN_BUDGET
+    by default), along with its estimated size before and after compaction.
+    """
+    if budget is None:
+        budget = settings.ANALYZER_PROMPT_TOKEN_BUDGET
+    original_tokens = estimate_tokens(error_message)
+    if original_tokens <= budget:
+        return CompactedMessage(error_message, original_tokens, original_tokens)
+
+    items = [
+        (kind, collapse_repeated_frames(value) if kind == 'frames' else value)
+        for kind, value in split_traceback(error_message.splitlines())
+    ]
+    text = join_traceback(items)
+
+    if estimate_tokens(text) > budget:
+        max_chars = settings.ANALYZER_PROMPT_MAX_LINE_CHARS
+        items = [
+            (kind, [truncate_frame_lines(frame, max_chars) for frame in value] if kind == 'frames' else value)
+            for kind, value in items
+        ]
+        text = join_traceback(items)
+
+    count = settings.ANALYZER_PROMPT_EDGE_FRAMES
+    while count > 0 and estimate_tokens(text) > budget:
+        text = join_traceback(
+            (kind, keep_edge_frames(value, count) if kind == 'frames' else value) for kind, value in items
+        )
+        count -= 1
+
+    if estimate_tokens(text) > budget:
+        text = truncate_middle(text, budget)
+    return CompactedMessage(text, estimate_tokens(text), original_tokens)
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from error_tracker.groups import WINDOWS
+from analyzer.preanalysis import PreAnalyzer
+
+
+class Command(BaseCommand):
+    help = ("Analyzes the error groups hit recently that have no analysis yet, most frequent first, "
+            "so the analyzer endpoint serves stored analyses. Runs until interrupted unless --once.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Poll once, wait for the queued analyses and exit, e.g. from cron.")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Number of analyses run at once (default: ANALYZER_MAX_CONCURRENCY).")
+        parser.add_argument('--interval', type=float, default=None,
+                            help="Seconds between two polls (default: ANALYZER_PREANALYSIS_INTERVAL).")
+        parser.add_argument('--window', default=None,
+                            help="Window the occurrences are counted in, one of "
+                                 f"{', '.join(WINDOWS)} (default: ANALYZER_PREANALYSIS_WINDOW).")
+        parser.add_argument('--queue-size', type=int, default=None,
+                            help="Number of fingerprints queued at once (default: ANALYZER_PREANALYSIS_QUEUE_SIZE).")
+
+    def handle(self, *args, **options):
+        window = options['window'] or settings.ANALYZER_PREANALYSIS_WINDOW
+        if window not in WINDOWS:
+            raise CommandError(f"Unknown window {window!r}, expected one of {', '.join(WINDOWS)}.")
+
+        preanalyzer = PreAnalyzer(queue_size=options['queue_size'], window=window)
+        try:
+            preanalyzer.run(
+                workers=options['workers'] or settings.ANALYZER_MAX_CONCURRENCY,
+                interval=options['interval'] or settings.ANALYZER_PREANALYSIS_INTERVAL,
+                once=options['once'],
+                log=self.stdout.write,
+            )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Stopped analyzing error groups."))
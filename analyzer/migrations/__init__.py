@@ -0,0 +1,4 @@
+"""
+The migrations of analyzer are not committed: they are generated with makemigrations and applied
+with migrate at deploy time, ErrorAnalysis included. See error_tracker.migrations.
+"""
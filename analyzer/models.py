@@ -1,3 +1,19 @@
 from django.db import models
 
-# Create your models here.
+
+class ErrorAnalysis(models.Model):
+    """
+    Analysis of an error, shared by every occurrence and every ErrorGroup with the same fingerprint.
+
+    An analysis is only valid for the prompt it was produced with, so a new PROMPT_VERSION
+    produces new rows instead of reusing the old ones.
+    """
+    fingerprint = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=32)
+    analysis = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['fingerprint', 'prompt_version'], name='unique_error_analysis'),
+        ]
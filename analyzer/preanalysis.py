@@ -0,0 +1,135 @@
+"""
+Background analysis of the ErrorGroups being hit, so AnalyzeBugView only reads stored analyses.
+
+Every poll, the fingerprints of the groups with occurrences in ANALYZER_PREANALYSIS_WINDOW that
+have no analysis for the current PROMPT_VERSION are ranked by their number of occurrences in the
+window, summed over the projects sharing the fingerprint, and put in a bounded priority queue.
+Worker threads take the most frequent fingerprint first, analyze a recent occurrence through
+analyzer.client and store the result in analyzer.cache. When the queue is full, the least
+frequent fingerprints wait for a later poll.
+"""
+
+import itertools
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+from error_tracker.groups import window_rollups
+from error_tracker.models import ErrorGroup, ErrorLog, ErrorRollup
+from project_integrations.models import Project
+from .cache import analysis_cache
+from .client import analysis_client
+from .models import ErrorAnalysis
+from .prompts import PROMPT_VERSION, build_prompt
+
+
+def pending_fingerprints(window, limit, now=None):
+    """
+    Returns up to limit (occurrences in window, fingerprint, group id) tuples of the fingerprints
+    without an analysis, most frequent first, with the id of one of their groups hit in window.
+    """
+    now = now or timezone.now()
+    analyzed = ErrorAnalysis.objects.filter(prompt_version=PROMPT_VERSION).values('fingerprint')
+    unanalyzed_groups = ErrorGroup.objects.exclude(fingerprint='').exclude(fingerprint__in=analyzed)
+    fingerprint = ErrorGroup.objects.filter(id=OuterRef('group_id')).values('fingerprint')
+    return list(
+        window_rollups(Project.objects.values('id'), window, now)
+        .filter(environment=ErrorRollup.ALL_ENVIRONMENTS, group_id__in=unanalyzed_groups.values('id'))
+        .annotate(fingerprint=Subquery(fingerprint))
+        .values('fingerprint')
+        .annotate(window_count=Sum('count'), any_group_id=Max('group_id'))
+        .order_by('-window_count', 'fingerprint')
+        .values_list('window_count', 'fingerprint', 'any_group_id')[:limit]
+    )
+
+
+class PreAnalyzer:
+    """
+    Bounded priority queue of fingerprints to analyze, fed by enqueue_pending() and consumed by
+    process_next(), from worker threads with run().
+    """
+
+    def __init__(self, queue_size=None, window=None):
+        self.queue = queue.PriorityQueue(queue_size or settings.ANALYZER_PREANALYSIS_QUEUE_SIZE)
+        self.window = window or settings.ANALYZER_PREANALYSIS_WINDOW
+        self._queued = set()
+        self._lock = threading.Lock()
+        # Ties in priority are served in order of arrival
+        self._sequence = itertools.count()
+
+    def enqueue_pending(self, now=None):
+        """
+        Queues the most frequent fingerprints without an analysis that are not queued yet, up to
+        the free room of the queue, and returns how many were queued.
+        """
+        queued = 0
+        for count, fingerprint, group_id in pending_fingerprints(self.window, self.queue.maxsize, now):
+            with self._lock:
+                if fingerprint in self._queued:
+                    continue
+                try:
+                    self.queue.put_nowait((-count, next(self._sequence), fingerprint, group_id))
+                except queue.Full:
+                    break
+                self._queued.add(fingerprint)
+            queued += 1
+        return queued
+
+    def process_next(self, timeout=None):
+        """
+        Analyzes the most frequent queued fingerprint, waiting up to timeout seconds for one, and
+        returns it, or None if the queue stayed empty.
+        """
+        try:
+            _, _, fingerprint, group_id = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        try:
+            if analysis_cache.get(fingerprint, PROMPT_VERSION) is None:
+                error_log = (ErrorLog.objects.select_related('message_blob')
+                             .filter(error_group_id=group_id).order_by('-created_at', '-id').first())
+                if error_log is not None:
+                    prompt = build_prompt(error_log)
+                    analysis = analysis_client.analyze((fingerprint, PROMPT_VERSION), prompt.text)
+                    analysis_cache.set(fingerprint, PROMPT_VERSION, analysis)
+        finally:
+            with self._lock:
+                self._queued.discard(fingerprint)
+            self.queue.task_done()
+        return fingerprint
+
+    def run(self, workers, interval, once=False, log=None):
+        """
+        Polls for pending fingerprints every interval seconds and analyzes them from as many
+        threads as workers. With once, returns when the fingerprints of a single poll are done.
+        """
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._work, args=(stop, log), daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                queued = self.enqueue_pending()
+                if log:
+                    log(f"Queued {queued} error fingerprints for analysis.")
+                if once:
+                    self.queue.join()
+                    break
+                stop.wait(interval)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def _work(self, stop, log):
+        while not stop.is_set():
+            try:
+                self.process_next(timeout=1)
+            except Exception as e:
+                # The fingerprint is queued again by a later poll
+                if log:
+                    log(f"Analysis failed: {e}")
+            finally:
+                close_old_connections()
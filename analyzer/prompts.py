@@ -0,0 +1,33 @@
+import logging
+from collections import namedtuple
+from error_tracker.grouping import mask_volatile_values
+from .compaction import compact_error_message
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever build_prompt() changes, so analyses of the previous prompt are not served anymore
+PROMPT_VERSION = '3'
+
+Prompt = namedtuple('Prompt', ['text', 'message_tokens', 'trimmed_tokens'])
+
+
+def build_prompt(error_log):
+    """
+    Returns the analysis Prompt of an ErrorLog, with its error message compacted to
+    ANALYZER_PROMPT_TOKEN_BUDGET tokens and the estimated number of tokens trimmed from it.
+
+    The analysis is shared by the ErrorLogs of every project with the same fingerprint, so the
+    prompt only holds what they all share: the message with the values removed by
+    normalize_error_message() masked, without the environment or time of the occurrence.
+    """
+    message = compact_error_message(mask_volatile_values(error_log.get_error_message()))
+    trimmed_tokens = message.original_tokens - message.tokens
+    if trimmed_tokens > 0:
+        logger.info("Trimmed the message of error log %s from %d to %d tokens",
+                    error_log.pk, message.original_tokens, message.tokens)
+    text = (
+        f"Analyze the following error log:\n\n"
+        f"Error Message: {message.text}\n\n"
+        "What could be the possible cause of this error, and what steps can fix it?"
+    )
+    return Prompt(text, message.tokens, trimmed_tokens)
@@ -0,0 +1,150 @@
+import threading
+from django.test import SimpleTestCase, override_settings
+from analyzer.backends import AnalysisBackend, BackendError, StubBackend, load_backend
+from analyzer.client import AnalysisClient, AnalysisFailed, AnalysisTimeout, AnalyzerBusy
+
+
+class FlakyBackend(AnalysisBackend):
+    """
+    Fails with the errors queued in failures, then answers.
+    """
+    failures = []
+    calls = 0
+
+    def analyze(self, prompt, timeout):
+        FlakyBackend.calls += 1
+        if FlakyBackend.failures:
+            raise FlakyBackend.failures.pop(0)
+        return f"Analysis of {prompt}"
+
+
+class BlockingBackend(AnalysisBackend):
+    """
+    Releases started once per call and answers once release is set.
+    """
+    release = threading.Event()
+    started = threading.Semaphore(0)
+    calls = 0
+
+    def analyze(self, prompt, timeout):
+        BlockingBackend.calls += 1
+        BlockingBackend.started.release()
+        BlockingBackend.release.wait(5)
+        return f"Analysis of {prompt}"
+
+
+@override_settings(ANALYZER_BACKEND='analyzer.tests.test_client.FlakyBackend', ANALYZER_RETRIES=2,
+                   ANALYZER_RETRY_BACKOFF=0, ANALYZER_TIMEOUT=1)
+class AnalysisClientRetryTests(SimpleTestCase):
+
+    def setUp(self):
+        FlakyBackend.failures = []
+        FlakyBackend.calls = 0
+        self.client = AnalysisClient()
+
+    def test_retryable_errors_are_retried(self):
+        """
+        Test that retryable failures are retried until the backend answers.
+        """
+        FlakyBackend.failures = [BackendError('rate limited', retryable=True)] * 2
+        self.assertEqual(self.client.analyze('key', 'prompt'), "Analysis of prompt")
+        self.assertEqual(FlakyBackend.calls, 3)
+
+    def test_retries_are_bounded(self):
+        """
+        Test that a call failing more than ANALYZER_RETRIES times raises AnalysisFailed.
+        """
+        FlakyBackend.failures = [BackendError('unavailable', retryable=True)] * 3
+        with self.assertRaises(AnalysisFailed):
+            self.client.analyze('key', 'prompt')
+        self.assertEqual(FlakyBackend.calls, 3)
+
+    def test_other_errors_are_not_retried(self):
+        """
+        Test that a non-retryable failure is raised after a single call.
+        """
+        FlakyBackend.failures = [BackendError('invalid request')]
+        with self.assertRaises(AnalysisFailed):
+            self.client.analyze('key', 'prompt')
+        self.assertEqual(FlakyBackend.calls, 1)
+
+    def test_failed_key_can_be_analyzed_again(self):
+        """
+        Test that a failed call is not shared with later requests.
+        """
+        FlakyBackend.failures = [BackendError('invalid request')]
+        with self.assertRaises(AnalysisFailed):
+            self.client.analyze('key', 'prompt')
+        self.assertEqual(self.client.analyze('key', 'prompt'), "Analysis of prompt")
+
+
+@override_settings(ANALYZER_BACKEND='analyzer.tests.test_client.BlockingBackend', ANALYZER_RETRIES=0,
+                   ANALYZER_MAX_CONCURRENCY=2, ANALYZER_MAX_PENDING=2)
+class AnalysisClientConcurrencyTests(SimpleTestCase):
+
+    def setUp(self):
+        BlockingBackend.release = threading.Event()
+        BlockingBackend.started = threading.Semaphore(0)
+        BlockingBackend.calls = 0
+        self.addCleanup(lambda: BlockingBackend.release.set())
+        self.client = AnalysisClient()
+
+    def analyze_in_thread(self, key, results):
+        thread = threading.Thread(target=lambda: results.append(self.client.analyze(key, 'prompt')))
+        thread.start()
+        return thread
+
+    def test_concurrent_requests_share_one_call(self):
+        """
+        Test that requests for a key already being analyzed wait for the call in flight.
+        """
+        results = []
+        thread = self.analyze_in_thread('key', results)
+        self.assertTrue(BlockingBackend.started.acquire(timeout=5))
+        # The backend holds the call until release is set, so these requests arrive while it is in
+        # flight; a call of their own would be made on the second thread of the pool
+        with override_settings(ANALYZER_TIMEOUT=0.05):
+            for _ in range(3):
+                with self.assertRaises(AnalysisTimeout):
+                    self.client.analyze('key', 'prompt')
+        self.assertEqual(BlockingBackend.calls, 1)
+
+        BlockingBackend.release.set()
+        thread.join(5)
+        self.assertEqual(results, ["Analysis of prompt"])
+        self.assertEqual(BlockingBackend.calls, 1)
+
+    def test_pending_prompts_are_bounded(self):
+        """
+        Test that a new key is refused once ANALYZER_MAX_PENDING keys are in flight.
+        """
+        results = []
+        threads = [self.analyze_in_thread(key, results) for key in ('first', 'second')]
+        for _ in threads:
+            self.assertTrue(BlockingBackend.started.acquire(timeout=5))
+        with self.assertRaises(AnalyzerBusy):
+            self.client.analyze('third', 'prompt')
+        BlockingBackend.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.client.analyze('third', 'prompt'), "Analysis of prompt")
+
+    @override_settings(ANALYZER_TIMEOUT=0.05, ANALYZER_RETRY_BACKOFF=0)
+    def test_slow_call_times_out(self):
+        """
+        Test that waiting for a call is bounded by the timeouts of its attempts.
+        """
+        with self.assertRaises(AnalysisTimeout):
+            self.client.analyze('key', 'prompt')
+
+
+class StubBackendTests(SimpleTestCase):
+
+    def test_stub_is_deterministic(self):
+        """
+        Test that the stub backend returns the same analysis for the same prompt.
+        """
+        backend = load_backend('analyzer.backends.StubBackend')
+        self.assertIsInstance(backend, StubBackend)
+        self.assertEqual(backend.analyze('KeyError', 1), StubBackend().analyze('KeyError', 1))
+        self.assertNotEqual(backend.analyze('KeyError', 1), backend.analyze('ValueError', 1))
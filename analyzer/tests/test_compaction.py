@@ -0,0 +1,118 @@
+from django.test import SimpleTestCase, override_settings
+from error_tracker.models import ErrorLog
+from analyzer.compaction import compact_error_message, estimate_tokens
+from analyzer.prompts import build_prompt
+
+
+def frame(path, line, function, source, *extra):
+    return f'  File "{path}", line {line}, in {function}\n    {source}\n' + ''.join(f'    {text}\n' for text in extra)
+
+
+def traceback(frames, exception='ValueError: invalid value'):
+    return 'Traceback (most recent call last):\n' + ''.join(frames) + exception
+
+
+@override_settings(ANALYZER_PROMPT_MAX_LINE_CHARS=50, ANALYZER_PROMPT_EDGE_FRAMES=2)
+class CompactErrorMessageTests(SimpleTestCase):
+
+    def test_message_within_budget_is_unchanged(self):
+        """
+        Test that a message within the budget is returned as is.
+        """
+        message = traceback([frame('/app/views.py', 10, 'get', 'return load(pk)')])
+        compacted = compact_error_message(message, budget=1000)
+        self.assertEqual(compacted.text, message)
+        self.assertEqual(compacted.tokens, compacted.original_tokens)
+
+    def test_recursion_is_collapsed(self):
+        """
+        Test that a cycle of frames repeated by recursion is kept once with a marker.
+        """
+        cycle = [frame('/app/a.py', 10, 'a', 'return b(x)'), frame('/app/b.py', 20, 'b', 'return a(x - 1)')]
+        message = traceback([frame('/app/main.py', 1, '<module>', 'main()')] + cycle * 300,
+                            exception='RecursionError: maximum recursion depth exceeded')
+        compacted = compact_error_message(message, budget=200)
+
+        self.assertLessEqual(compacted.tokens, 200)
+        self.assertEqual(compacted.original_tokens, estimate_tokens(message))
+        self.assertEqual(compacted.text.count('File "/app/a.py"'), 1)
+        self.assertIn('[Previous 2 frames repeated 299 more times]', compacted.text)
+        self.assertTrue(compacted.text.endswith('RecursionError: maximum recursion depth exceeded'))
+
+    def test_long_locals_are_truncated(self):
+        """
+        Test that the long lines of a frame are cut and its location is kept.
+        """
+        message = traceback([frame('/app/tasks.py', 42, 'run', 'process(payload)', 'payload = ' + 'x' * 5000)])
+        compacted = compact_error_message(message, budget=100)
+        self.assertIn('File "/app/tasks.py", line 42, in run', compacted.text)
+        self.assertIn('... [4964 chars]', compacted.text)
+        self.assertTrue(compacted.text.endswith('ValueError: invalid value'))
+
+    def test_outermost_and_innermost_frames_are_kept(self):
+        """
+        Test that the middle frames of a deep traceback are dropped before the edge ones.
+        """
+        frames = [frame(f'/app/module_{index}.py', index, f'function_{index}', f'call_{index}()')
+                  for index in range(40)]
+        compacted = compact_error_message(traceback(frames), budget=120)
+
+        self.assertLessEqual(compacted.tokens, 120)
+        for index in (0, 1, 38, 39):
+            self.assertIn(f'/app/module_{index}.py', compacted.text)
+        self.assertIn('[36 frames omitted]', compacted.text)
+        self.assertTrue(compacted.text.endswith('ValueError: invalid value'))
+
+    def test_chained_exceptions_are_kept(self):
+        """
+        Test that the messages between chained tracebacks survive the compaction.
+        """
+        frames = [frame(f'/app/module_{index}.py', index, 'f', 'g()') for index in range(30)]
+        message = (traceback(frames, 'KeyError: 1') + '\n\nDuring handling of the above exception, '
+                   'another exception occurred:\n\n' + traceback(frames))
+        compacted = compact_error_message(message, budget=300)
+
+        self.assertLessEqual(compacted.tokens, 300)
+        self.assertIn('KeyError: 1', compacted.text)
+        self.assertIn('During handling of the above exception', compacted.text)
+        self.assertEqual(compacted.text.count('frames omitted'), 2)
+
+    def test_anything_is_cut_to_the_budget(self):
+        """
+        Test that a message without frames has its middle cut, keeping its end.
+        """
+        message = 'word ' * 10000 + 'MemoryError'
+        compacted = compact_error_message(message, budget=50)
+        self.assertLessEqual(compacted.tokens, 50)
+        self.assertIn('chars omitted', compacted.text)
+        self.assertTrue(compacted.text.endswith('MemoryError'))
+
+
+class BuildPromptTests(SimpleTestCase):
+
+    @override_settings(ANALYZER_PROMPT_TOKEN_BUDGET=100)
+    def test_prompt_reports_trimmed_tokens(self):
+        """
+        Test that the prompt of a long message carries how many tokens were trimmed from it.
+        """
+        error_log = ErrorLog(error_message='Error ' * 1000, environment='production')
+        prompt = build_prompt(error_log)
+        self.assertLessEqual(prompt.message_tokens, 100)
+        self.assertEqual(prompt.message_tokens + prompt.trimmed_tokens, estimate_tokens('Error ' * 1000))
+
+    def test_prompt_only_holds_what_the_fingerprint_shares(self):
+        """
+        Test that occurrences with the same fingerprint get the same prompt, without their values,
+        environment or time.
+        """
+        message = traceback([frame('/app/orders.py', '{line}', 'get', 'return load(pk)')],
+                            exception="KeyError: 'order {uuid} of customer {number}'")
+        first = build_prompt(ErrorLog(error_message=message.format(
+            line=12, uuid='0b4e7a0e-5fe6-4c1b-9d2a-1f0e2d3c4b5a', number=4242), environment='production'))
+        second = build_prompt(ErrorLog(error_message=message.format(
+            line=14, uuid='9f8e7d6c-5b4a-4321-8fed-cba987654321', number=17), environment='acme-staging'))
+
+        self.assertEqual(first.text, second.text)
+        for value in ('0b4e7a0e', '4242', 'production'):
+            self.assertNotIn(value, first.text)
+        self.assertIn('File "/app/orders.py", line <n>, in get', first.text)
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from project_integrations.models import Project
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog
+from analyzer.cache import analysis_cache
+from analyzer.models import ErrorAnalysis
+from analyzer.preanalysis import PreAnalyzer, pending_fingerprints
+from analyzer.prompts import PROMPT_VERSION
+
+
+class PreAnalyzerTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        analysis_cache.clear()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.other_project = Project.objects.create(name="Other Project", user=self.user)
+        store_error_logs(
+            [ErrorLog(project=self.project, error_message="KeyError: 'a'")] * 3
+            + [ErrorLog(project=self.other_project, error_message="KeyError: 'a'")] * 2
+            + [ErrorLog(project=self.project, error_message="TypeError: bad operand")] * 4
+            + [ErrorLog(project=self.project, error_message="ValueError: invalid literal")]
+        )
+        self.fingerprints = {
+            error_type: ErrorLog.objects.filter(error_group__error_type=error_type).first().error_group.fingerprint
+            for error_type in ('KeyError', 'TypeError', 'ValueError')
+        }
+
+    def test_fingerprints_are_ranked_by_occurrences(self):
+        """
+        Test that fingerprints are ranked by their occurrences summed over projects.
+        """
+        pending = pending_fingerprints('1h', 10)
+        self.assertEqual([(count, fingerprint) for count, fingerprint, _ in pending], [
+            (5, self.fingerprints['KeyError']),
+            (4, self.fingerprints['TypeError']),
+            (1, self.fingerprints['ValueError']),
+        ])
+
+    def test_analyzed_fingerprints_are_skipped(self):
+        """
+        Test that fingerprints with an analysis of the current prompt version are not queued.
+        """
+        ErrorAnalysis.objects.create(fingerprint=self.fingerprints['KeyError'], prompt_version=PROMPT_VERSION,
+                                     analysis="Check the dictionary keys.")
+        ErrorAnalysis.objects.create(fingerprint=self.fingerprints['TypeError'], prompt_version='0',
+                                     analysis="Outdated.")
+        pending = [fingerprint for _, fingerprint, _ in pending_fingerprints('1h', 10)]
+        self.assertEqual(pending, [self.fingerprints['TypeError'], self.fingerprints['ValueError']])
+
+    def test_queue_is_bounded_and_served_by_priority(self):
+        """
+        Test that a full queue leaves the least frequent fingerprints for a later poll.
+        """
+        preanalyzer = PreAnalyzer(queue_size=2, window='1h')
+        self.assertEqual(preanalyzer.enqueue_pending(), 2)
+        self.assertEqual(preanalyzer.enqueue_pending(), 0)
+
+        self.assertEqual(preanalyzer.process_next(timeout=0), self.fingerprints['KeyError'])
+        self.assertEqual(preanalyzer.process_next(timeout=0), self.fingerprints['TypeError'])
+        self.assertIsNone(preanalyzer.process_next(timeout=0))
+
+        self.assertEqual(preanalyzer.enqueue_pending(), 1)
+        self.assertEqual(preanalyzer.process_next(timeout=0), self.fingerprints['ValueError'])
+        self.assertEqual(ErrorAnalysis.objects.filter(prompt_version=PROMPT_VERSION).count(), 3)
+
+    def test_endpoint_serves_preanalyzed_groups(self):
+        """
+        Test that once a group is analyzed in the background, the mounted endpoint reads it.
+        """
+        preanalyzer = PreAnalyzer(window='1h')
+        preanalyzer.enqueue_pending()
+        while preanalyzer.process_next(timeout=0):
+            pass
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        error_log = ErrorLog.objects.filter(error_group__error_type='TypeError').first()
+        response = client.get(reverse('analyze_error_log', args=[error_log.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['cached'])
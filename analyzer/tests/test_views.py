@@ -0,0 +1,171 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from project_integrations.models import Project
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog
+from error_tracker.similarity import indexed_groups
+from analyzer.cache import analysis_cache
+from analyzer.models import ErrorAnalysis
+from analyzer.prompts import PROMPT_VERSION
+from analyzer.tests.test_client import FlakyBackend
+from analyzer.backends import BackendError
+from analyzer.views import AnalyzeBugView, SimilarErrorsView
+
+
+class AnalyzeBugViewTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        analysis_cache.clear()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.other_project = Project.objects.create(name="Other Project", user=self.user)
+        self.error_logs = store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 'a' at line 10", environment="production"),
+            ErrorLog(project=self.project, error_message="KeyError: 'a' at line 12", environment="production"),
+            ErrorLog(project=self.other_project, error_message="KeyError: 'a' at line 14", environment="staging"),
+        ])
+
+    def analyze(self, error_log_id, user=True):
+        request = APIRequestFactory().get(f'/analyze/error-log/{error_log_id}/')
+        if user:
+            force_authenticate(request, user=self.user if user is True else user)
+        return AnalyzeBugView.as_view()(request, errorLogId=error_log_id)
+
+    def test_occurrences_share_one_analysis(self):
+        """
+        Test that ErrorLogs with the same fingerprint, in any project, share one stored analysis.
+        """
+        first = self.analyze(self.error_logs[0].id)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertFalse(first.data['cached'])
+
+        for error_log in self.error_logs[1:]:
+            response = self.analyze(error_log.id)
+            self.assertTrue(response.data['cached'])
+            self.assertEqual(response.data['analysis'], first.data['analysis'])
+        self.assertEqual(ErrorAnalysis.objects.count(), 1)
+
+    def test_repeat_views_do_not_query_the_analysis(self):
+        """
+        Test that once an analysis is cached in-process, a view only loads the ErrorLog.
+        """
+        self.analyze(self.error_logs[0].id)
+        with self.assertNumQueries(1):
+            response = self.analyze(self.error_logs[1].id)
+        self.assertTrue(response.data['cached'])
+
+    def test_analysis_is_read_back_from_database(self):
+        """
+        Test that an analysis stored by another worker is found in the database.
+        """
+        ErrorAnalysis.objects.create(fingerprint=self.error_logs[0].error_group.fingerprint,
+                                     prompt_version=PROMPT_VERSION, analysis="Check the dictionary keys.")
+        response = self.analyze(self.error_logs[0].id)
+        self.assertEqual(response.data, {'analysis': "Check the dictionary keys.", 'cached': True})
+
+    def test_new_prompt_version_is_not_served_old_analyses(self):
+        """
+        Test that analyses of another prompt version are ignored.
+        """
+        ErrorAnalysis.objects.create(fingerprint=self.error_logs[0].error_group.fingerprint,
+                                     prompt_version='0', analysis="Outdated.")
+        response = self.analyze(self.error_logs[0].id)
+        self.assertFalse(response.data['cached'])
+        self.assertNotEqual(response.data['analysis'], "Outdated.")
+
+    def test_unknown_error_log_returns_not_found(self):
+        """
+        Test that analyzing a missing ErrorLog returns 404.
+        """
+        response = self.analyze(0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_anonymous_request_is_refused(self):
+        """
+        Test that analyzing requires authentication, before any provider call.
+        """
+        response = self.analyze(self.error_logs[0].id, user=None)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(ErrorAnalysis.objects.exists())
+
+    def test_error_log_of_another_user_is_not_found(self):
+        """
+        Test that a user cannot analyze the error logs of another user's projects.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        response = self.analyze(self.error_logs[0].id, user=other_user)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(ErrorAnalysis.objects.exists())
+
+    @override_settings(ANALYZER_BACKEND='analyzer.tests.test_client.FlakyBackend', ANALYZER_RETRIES=0)
+    def test_provider_failure_is_not_stored(self):
+        """
+        Test that a failing provider returns 502 and the next request analyzes again.
+        """
+        FlakyBackend.failures = [BackendError('invalid request')]
+        response = self.analyze(self.error_logs[0].id)
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertFalse(ErrorAnalysis.objects.exists())
+
+        response = self.analyze(self.error_logs[0].id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['cached'])
+
+
+class SimilarErrorsViewTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        indexed_groups.clear()
+        analysis_cache.clear()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.other_user = User.objects.create_user(username='otheruser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.other_project = Project.objects.create(name="Other Project", user=self.other_user)
+        traceback = ('Traceback (most recent call last):\n'
+                     '  File "/app/orders/views.py", line 10, in create\n'
+                     '    order = Order.objects.create(customer=customer, total=total)\n'
+                     'django.db.utils.IntegrityError: null value in column "{column}" violates not-null constraint')
+        self.error_logs = store_error_logs([
+            ErrorLog(project=self.project, error_message=traceback.format(column='customer_id')),
+            ErrorLog(project=self.project, error_message=traceback.format(column='total_amount')),
+            ErrorLog(project=self.other_project, error_message=traceback.format(column='shipping_id')),
+            ErrorLog(project=self.project, error_message="ZeroDivisionError: division by zero"),
+        ])
+
+    def similar(self, error_log_id, user):
+        request = APIRequestFactory().get(f'/analyze/error-log/{error_log_id}/similar/')
+        force_authenticate(request, user=user)
+        return SimilarErrorsView.as_view()(request, errorLogId=error_log_id)
+
+    def test_similar_errors_of_own_projects_with_analyses(self):
+        """
+        Test that the near-duplicates of the user's projects are listed with their groups and analyses.
+        """
+        near = self.error_logs[1].error_group
+        ErrorAnalysis.objects.create(fingerprint=near.fingerprint, prompt_version=PROMPT_VERSION,
+                                     analysis="Set the total before saving.")
+        response = self.similar(self.error_logs[0].id, self.user)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        similar = response.data['similar']
+        self.assertEqual([entry['fingerprint'] for entry in similar], [near.fingerprint])
+        self.assertEqual(similar[0]['analysis'], "Set the total before saving.")
+        self.assertEqual([group['id'] for group in similar[0]['groups']], [near.id])
+        self.assertGreaterEqual(similar[0]['similarity'], 0.5)
+
+    def test_error_logs_of_other_users_are_not_found(self):
+        """
+        Test that the similar errors of another user's error log are not returned.
+        """
+        response = self.similar(self.error_logs[2].id, self.user)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import AnalyzeBugView
+from .views import AnalyzeBugView, SimilarErrorsView
 
 urlpatterns = [
-    path('error-log/<int:errorLogId>/', AnalyzeBugView.as_view(), name='analyze_error_log')
+    path('error-log/<int:errorLogId>/', AnalyzeBugView.as_view(), name='analyze_error_log'),
+    path('error-log/<int:errorLogId>/similar/', SimilarErrorsView.as_view(), name='similar_error_logs'),
 ]
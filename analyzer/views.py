@@ -1,45 +1,89 @@
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from error_tracker.models import ErrorLog
+from error_tracker.grouping import compute_fingerprint
+from error_tracker.groups import attach_environments, attach_window_counts
+from error_tracker.models import ErrorGroup, ErrorLog
+from error_tracker.serializers import ErrorGroupSerializer
+from error_tracker.similarity import similar_fingerprints
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from nomorebugs.db_routing import ReplicaReadMixin
+from .cache import analysis_cache
+from .client import analysis_client
+from .prompts import PROMPT_VERSION, build_prompt
 
 
-class AnalyzeBugView(APIView):
+def get_fingerprint(error_log):
+    """
+    Returns the fingerprint the analysis of an ErrorLog is shared under.
+    """
+    if error_log.error_group_id is not None and error_log.error_group.fingerprint:
+        return error_log.error_group.fingerprint
+    # ErrorLogs stored before grouping
+    return compute_fingerprint(error_log.get_error_message())
+
+
+class AnalyzeBugView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, errorLogId):
         """
-        Analyzes an error log based on the provided errorLogId.
+        Analyzes an error log of one of the user's projects based on the provided errorLogId.
+
+        Every ErrorLog with the same fingerprint shares one analysis per prompt version, produced
+        by the ANALYZER_BACKEND provider and then served from analyzer.cache.
         """
         # Retrieve the ErrorLog object
-        error_log = get_object_or_404(ErrorLog, id=errorLogId)
-
-        # Prepare the OpenAI API prompt
-        prompt = (
-            f"Analyze the following error log:\n\n"
-            f"Error Message: {error_log.error_message}\n"
-            f"Environment: {error_log.environment or 'N/A'}\n"
-            f"Timestamp: {error_log.created_at}\n\n"
-            "What could be the possible cause of this error, and what steps can fix it?"
-        )
-
-        return Response({'analysis': prompt}, status=status.HTTP_200_OK)
-
-        # try:
-        #     # Call the OpenAI API
-        #     openai.api_key = "your-openai-api-key"
-        #     response = openai.ChatCompletion.create(
-        #         model="gpt-4",
-        #         messages=[
-        #             {"role": "system", "content": "You are a software debugging assistant."},
-        #             {"role": "user", "content": prompt},
-        #         ],
-        #     )
-        #
-        #     analysis = response.choices[0].message['content']
-        #
-        #     # Return the analysis result
-        #     return Response({'analysis': analysis}, status=status.HTTP_200_OK)
-        #
-        # except OpenAIError as e:
-        #     # Handle OpenAI API errors
-        #     return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        error_log = get_object_or_404(ErrorLog.objects.select_related('message_blob', 'error_group'),
+                                      id=errorLogId, project__user=request.user)
+        fingerprint = get_fingerprint(error_log)
+
+        analysis = analysis_cache.get(fingerprint, PROMPT_VERSION)
+        cached = analysis is not None
+        if not cached:
+            # Concurrent requests for the fingerprint share one provider call
+            analysis = analysis_client.analyze((fingerprint, PROMPT_VERSION), build_prompt(error_log).text)
+            analysis = analysis_cache.set(fingerprint, PROMPT_VERSION, analysis)
+
+        return Response({'analysis': analysis, 'cached': cached}, status=status.HTTP_200_OK)
+
+
+class SimilarErrorsView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, errorLogId):
+        """
+        Lists the errors of the user's projects whose normalized messages are the most similar to
+        the one of an error log of theirs, found through error_tracker.similarity.
+
+        Every similar fingerprint comes with its estimated similarity, its stored analysis, if any,
+        and its ErrorGroups in the user's projects, most frequent first.
+        """
+        error_log = get_object_or_404(ErrorLog.objects.select_related('message_blob', 'error_group'),
+                                      id=errorLogId, project__user=request.user)
+        groups = ErrorGroup.objects.filter(project__user=request.user)
+        similar = similar_fingerprints(get_fingerprint(error_log), error_log.get_error_message(),
+                                       fingerprints=groups.values('fingerprint'))
+        fingerprints = [fingerprint for _, fingerprint in similar]
+
+        groups = list(groups.filter(fingerprint__in=fingerprints)
+                      .select_related('project', 'sample_message_blob').order_by('-count', 'id'))
+        now = timezone.now()
+        attach_window_counts(groups, None, now)
+        attach_environments(groups, None, now)
+        groups_by_fingerprint = {}
+        for group in groups:
+            groups_by_fingerprint.setdefault(group.fingerprint, []).append(group)
+        analyses = analysis_cache.get_many(fingerprints, PROMPT_VERSION)
+
+        return Response({'similar': [
+            {
+                'fingerprint': fingerprint,
+                'similarity': round(similarity, 3),
+                'analysis': analyses.get(fingerprint),
+                'groups': ErrorGroupSerializer(groups_by_fingerprint.get(fingerprint, []), many=True).data,
+            }
+            for similarity, fingerprint in similar
+        ]}, status=status.HTTP_200_OK)
@@ -0,0 +1,109 @@
+"""
+Side-by-side load test of the WSGI and ASGI ingestion paths.
+
+Start the same project twice, e.g.
+
+    gunicorn nomorebugs.wsgi -b 127.0.0.1:8001 -w 4 --threads 8
+    ERROR_TRACKER_ASYNC_INGEST=True uvicorn nomorebugs.asgi:application --port 8002 --workers 4
+
+then run
+
+    python benchmarks/ingest_wsgi_vs_asgi.py --api-key <key> --project <uuid> \\
+        --target wsgi=http://127.0.0.1:8001 --target asgi=http://127.0.0.1:8002
+
+Every simulated client opens its own connection and uploads its body in --slow-chunks pieces
+separated by --slow-delay seconds, which is what ties up a thread per request on the WSGI path.
+Only the standard library is used, so the script runs anywhere the servers can be reached.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+PATH = '/api/error-tracker/error-logs/'
+
+
+async def post_slowly(host, port, body, headers, chunks, delay):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (
+            f'POST {PATH} HTTP/1.1\r\n'
+            f'Host: {host}:{port}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: close\r\n'
+            + ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+            + '\r\n'
+        )
+        writer.write(head.encode())
+        step = max(1, len(body) // chunks)
+        for start in range(0, len(body), step):
+            writer.write(body[start:start + step])
+            await writer.drain()
+            if delay:
+                await asyncio.sleep(delay)
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_target(url, args):
+    parts = urlsplit(url)
+    body = json.dumps({
+        'project': args.project,
+        'environment': 'benchmark',
+        'error_message': 'Traceback (most recent call last):\n' + '  File "app.py", line 1, in f\n' * 50 +
+                         'RuntimeError: benchmark',
+    }).encode()
+    headers = {'API-Key': args.api_key}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                code = await post_slowly(parts.hostname, parts.port or 80, body, headers,
+                                         args.slow_chunks, args.slow_delay)
+            except OSError:
+                code = 'connection error'
+            latencies.append(time.perf_counter() - started)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests/s': round(args.requests / elapsed, 1),
+        'p50 ms': round(statistics.median(latencies) * 1000, 1),
+        'p99 ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        'statuses': statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, help="name=base URL, repeatable")
+    parser.add_argument('--api-key', required=True)
+    parser.add_argument('--project', required=True)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--slow-chunks', type=int, default=4)
+    parser.add_argument('--slow-delay', type=float, default=0.25)
+    args = parser.parse_args()
+
+    for target in args.target:
+        name, url = target.split('=', 1)
+        result = asyncio.run(run_target(url, args))
+        print(f'{name:>6}: ' + ', '.join(f'{key}={value}' for key, value in result.items()))
+
+
+if __name__ == '__main__':
+    main()
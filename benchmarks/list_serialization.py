@@ -0,0 +1,92 @@
+"""
+Rows per second of the ErrorLog list endpoint with ErrorLogSerializer and with the values_list()
+read path of error_tracker.rows.
+
+    DJANGO_SETTINGS_MODULE=nomorebugs.settings python benchmarks/list_serialization.py --rows 20000
+
+A throwaway test database is created with --rows ErrorLogs (with --messages distinct messages),
+then every page of --page-size rows is fetched through the test client on both paths. The script
+checks that both paths return the same bytes and prints their throughput, e.g. on SQLite:
+
+    serializer      7,923 rows/s
+    values_list    15,709 rows/s  (2.0x)
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nomorebugs.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+from error_tracker.ingest import store_error_logs  # noqa: E402
+from error_tracker.models import ErrorLog  # noqa: E402
+from project_integrations.models import Project  # noqa: E402
+
+
+def populate(rows, messages):
+    user = User.objects.create_user(username='benchmark', password='benchmark')
+    project = Project.objects.create(name='Benchmark', user=user)
+    for start in range(0, rows, 1000):
+        store_error_logs([
+            ErrorLog(project=project, environment='production',
+                     error_message=f'KeyError: {index % messages}\n' + 'Traceback line\n' * (index % 40))
+            for index in range(start, min(start + 1000, rows))
+        ])
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def fetch_all(client, page_size):
+    """
+    Returns the content of every page and the elapsed time.
+    """
+    pages = []
+    url = reverse('error-log-list-create') + f'?page_size={page_size}'
+    started = time.perf_counter()
+    while url:
+        response = client.get(url)
+        pages.append(response.content)
+        url = response.json()['next']
+    return pages, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(ERROR_TRACKER_MAX_PAGE_SIZE=max(args.page_size, 1)):
+            client = populate(args.rows, args.messages)
+            fetch_all(client, args.page_size)  # Warm up caches and connections
+
+            with override_settings(ERROR_TRACKER_FAST_LIST=False):
+                serializer_pages, serializer_time = fetch_all(client, args.page_size)
+            fast_pages, fast_time = fetch_all(client, args.page_size)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if fast_pages != serializer_pages:
+        sys.exit('The two read paths returned different content.')
+    print(f'serializer   {args.rows / serializer_time:>8,.0f} rows/s')
+    print(f'values_list  {args.rows / fast_time:>8,.0f} rows/s  ({serializer_time / fast_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ErrorTrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'error_tracker'
+
+    def ready(self):
+        import error_tracker.signals
@@ -0,0 +1,93 @@
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import Throttled
+from project_integrations.api_key_cache import aresolve_project, normalize_uuid
+from project_integrations.models import APIKey, Project
+from .ingest import error_log_writer, store_error_logs
+from .models import ErrorLog
+from .serializers import ErrorLogSerializer
+from .throttling import check_ingest_rate, consume_ingest_tokens
+from .views import ErrorLogListCreateView
+
+
+class AsyncErrorLogCreateView(View):
+    """
+    Async-native equivalent of POST on ErrorLogListCreateView for ASGI deployments.
+
+    The API key and project are resolved with the async ORM, so no thread is held while the
+    client uploads or while the lookup runs. In write-behind mode the request never leaves the
+    event loop; otherwise the insert runs through the same pipeline as the other ingestion
+    endpoints on Django's sync-to-async executor.
+    """
+    http_method_names = ['post']
+
+    async def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'detail': 'JSON parse error.'}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({'detail': 'Expected a JSON object.'}, status=400)
+
+        api_key = request.headers.get('API-Key')
+        project_uuid = data.get('project')
+        if not api_key or not project_uuid:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        project_uuid = normalize_uuid(project_uuid)
+        if project_uuid is None:
+            return JsonResponse({'detail': 'Invalid project UUID.'}, status=403)
+        api_key = normalize_uuid(api_key)
+        if api_key is None:
+            return JsonResponse({'detail': 'Invalid API key or project association.'}, status=403)
+
+        try:
+            project = await aresolve_project(api_key, project_uuid)
+        except Project.DoesNotExist:
+            return JsonResponse({'detail': 'Invalid project UUID.'}, status=403)
+        except APIKey.DoesNotExist:
+            return JsonResponse({'detail': 'Invalid API key or project association.'}, status=403)
+
+        try:
+            await sync_to_async(check_ingest_rate)(project)
+        except Throttled as e:
+            response = JsonResponse({'detail': str(e.detail)}, status=429)
+            response['Retry-After'] = str(int(e.wait) + 1)
+            return response
+
+        serializer = ErrorLogSerializer(data=data, context={'project_id': project.id})
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        error_log = ErrorLog(**serializer.validated_data)
+
+        if settings.ERROR_TRACKER_WRITE_BEHIND:
+            if not error_log_writer.submit([error_log]):
+                response = JsonResponse({'detail': 'The ingestion queue is full, retry later.'}, status=503)
+                response['Retry-After'] = '1'
+                return response
+            await sync_to_async(consume_ingest_tokens)(project, 1)
+            return JsonResponse({'detail': 'Error log accepted.'}, status=202)
+
+        await sync_to_async(store_error_logs)([error_log])
+        await sync_to_async(consume_ingest_tokens)(project, 1)
+        return JsonResponse(ErrorLogSerializer(error_log).data, status=201)
+
+
+async_error_log_create_view = csrf_exempt(AsyncErrorLogCreateView.as_view())
+_sync_error_log_list_create_view = ErrorLogListCreateView.as_view()
+
+
+@csrf_exempt
+async def error_log_list_async_create_view(request, *args, **kwargs):
+    """
+    Serves POST with AsyncErrorLogCreateView and every other method with ErrorLogListCreateView.
+
+    Routed to error-logs/ instead of ErrorLogListCreateView when ERROR_TRACKER_ASYNC_INGEST is set.
+    """
+    if request.method == 'POST':
+        return await async_error_log_create_view(request, *args, **kwargs)
+    return await sync_to_async(_sync_error_log_list_create_view)(request, *args, **kwargs)
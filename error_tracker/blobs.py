@@ -0,0 +1,61 @@
+import hashlib
+import zlib
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import connection
+from django.db.models import TextField, Value
+from .models import ErrorMessageBlob
+
+
+def search_vector_for(error_message):
+    """
+    Returns the expression computing the full-text search vector of a message, or None when the
+    database is not PostgreSQL. Only the first ERROR_TRACKER_SEARCH_MAX_CHARS characters are
+    indexed, which keeps huge tracebacks under the tsvector size limit.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    text = error_message[:settings.ERROR_TRACKER_SEARCH_MAX_CHARS]
+    return SearchVector(Value(text, output_field=TextField()), config=settings.ERROR_TRACKER_SEARCH_CONFIG)
+
+
+def make_message_blob(error_message):
+    """
+    Builds the unsaved ErrorMessageBlob holding error_message.
+    """
+    encoded = error_message.encode('utf-8')
+    compressed = len(encoded) >= settings.ERROR_TRACKER_MESSAGE_COMPRESSION_MIN_SIZE
+    blob = ErrorMessageBlob(
+        hash=hashlib.sha256(encoded).hexdigest(),
+        data=zlib.compress(encoded, settings.ERROR_TRACKER_MESSAGE_COMPRESSION_LEVEL) if compressed else encoded,
+        compressed=compressed,
+        size=len(encoded),
+        search_vector=search_vector_for(error_message),
+    )
+    blob._text = error_message
+    return blob
+
+
+def attach_message_blobs(error_logs):
+    """
+    Moves the message of unsaved ErrorLogs to content-addressed ErrorMessageBlobs.
+
+    Each distinct message is hashed and compressed once, and all of them are upserted with a
+    single bulk insert, so a message already stored by any worker is shared. A reused blob gets
+    its created_at refreshed, which keeps it out of delete_unreferenced_message_blobs() until
+    the ErrorLogs referring to it are stored. The ErrorLogs keep their blob cached, so reading
+    their message does not query it back.
+    """
+    blobs = {}
+    for error_log in error_logs:
+        if error_log.message_blob_id is not None:
+            continue
+        blob = blobs.get(error_log.error_message)
+        if blob is None:
+            blob = blobs[error_log.error_message] = make_message_blob(error_log.error_message)
+        error_log.message_blob = blob
+        error_log.error_message = ''
+
+    if blobs:
+        ErrorMessageBlob.objects.bulk_create(blobs.values(), update_conflicts=True, unique_fields=['hash'],
+                                             update_fields=['created_at'])
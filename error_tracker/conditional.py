@@ -0,0 +1,43 @@
+import hashlib
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with 304 Not Modified when the validators of the requested data match
+    the If-None-Match or If-Modified-Since headers, before running the main query.
+
+    Views implement get_validators(request), returning a tuple of values that changes whenever
+    the response would change and the aware datetime the data was last modified, or None when
+    the response may change without anything recording when, e.g. through deletions. It
+    must be much cheaper than the response itself, e.g. a couple of LIMIT 1 index lookups. The
+    ETag also covers the user, the query string and the negotiated media type, so every page,
+    filter and representation has its own.
+    """
+
+    def get_validators(self, request):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        values, last_modified = self.get_validators(request)
+        etag = self.compute_etag(request, values)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Responses depend on the user the JWT belongs to
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    @staticmethod
+    def compute_etag(request, values):
+        key = repr((request.user.pk, request.path, sorted(request.query_params.lists()),
+                    getattr(request, 'accepted_media_type', None), values))
+        return quote_etag(hashlib.sha256(key.encode()).hexdigest()[:32])
@@ -0,0 +1,111 @@
+import atexit
+import threading
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from .models import ErrorGroup
+
+
+class CoalescedCounters:
+    """
+    Base class for counters derived from stored ErrorLogs and coalesced in memory.
+
+    Subclasses aggregate ErrorLogs into self._pending in aggregate() and write the aggregates in
+    write(). With ERROR_TRACKER_COUNTER_FLUSH_INTERVAL set to 0 they are written right away,
+    otherwise the increments of that many seconds are accumulated and flushed by a timer (and
+    at exit).
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._atexit_registered = False
+
+    def aggregate(self, error_logs):
+        raise NotImplementedError
+
+    def write(self, pending):
+        raise NotImplementedError
+
+    def add(self, error_logs):
+        with self._lock:
+            self.aggregate(error_logs)
+
+        if settings.ERROR_TRACKER_COUNTER_FLUSH_INTERVAL > 0:
+            self._schedule_flush()
+        else:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+        if pending:
+            self.write(pending)
+
+    def _schedule_flush(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(settings.ERROR_TRACKER_COUNTER_FLUSH_INTERVAL, self._flush_in_thread)
+            self._timer.daemon = True
+            self._timer.start()
+            if not self._atexit_registered:
+                atexit.register(self.flush)
+                self._atexit_registered = True
+
+    def _flush_in_thread(self):
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+
+class GroupCounters(CoalescedCounters):
+    """
+    Coalesces the occurrence counters of ErrorGroups.
+
+    ErrorLogs are aggregated per group (number of occurrences, first and last created_at, a
+    message blob, number of occurrences not stored by sampling, i.e. without an id) and written
+    with one atomic UPDATE per group, which also gives groups without a sample message their
+    first one.
+    """
+
+    def aggregate(self, error_logs):
+        for error_log in error_logs:
+            if error_log.error_group_id is None:
+                continue
+            created_at = error_log.created_at
+            sampled_out = int(error_log.pk is None)
+            entry = self._pending.get(error_log.error_group_id)
+            if entry is None:
+                self._pending[error_log.error_group_id] = [1, created_at, created_at, error_log.message_blob_id,
+                                                           sampled_out]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], created_at)
+                entry[2] = max(entry[2], created_at)
+                entry[3] = entry[3] or error_log.message_blob_id
+                entry[4] += sampled_out
+
+    def write(self, pending):
+        # Every UPDATE is atomic on its own; going in id order keeps concurrent flushes that run
+        # inside a transaction from deadlocking each other
+        for group_id, (count, first_seen, last_seen, blob_hash, sampled_count) in sorted(pending.items()):
+            changes = {
+                'count': F('count') + count,
+                'first_seen': Least(F('first_seen'), first_seen),
+                'last_seen': Greatest(F('last_seen'), last_seen),
+            }
+            if sampled_count:
+                changes['sampled_count'] = F('sampled_count') + sampled_count
+            if blob_hash is not None:
+                changes['sample_message_blob'] = Coalesce(F('sample_message_blob'), Value(blob_hash),
+                                                        output_field=CharField())
+            ErrorGroup.objects.filter(id=group_id).update(**changes)
+
+
+group_counters = GroupCounters()
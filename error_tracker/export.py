@@ -0,0 +1,57 @@
+import csv
+import json
+from django.conf import settings
+from .rows import COLUMNS, FIELDS, render_error_log_rows
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    File-like object returning what is written to it, so csv.writer can produce rows lazily.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(queryset):
+    """
+    Yields a list of error_tracker.rows.FIELDS values for every ErrorLog of queryset, in
+    (created_at, id) order.
+
+    The rows are read with a server-side cursor ERROR_TRACKER_EXPORT_CHUNK_SIZE at a time and
+    only the columns that are exported are fetched, so memory use does not depend on the number
+    of rows.
+    """
+    rows = queryset.order_by('created_at', 'id').values_list(*COLUMNS).iterator(
+        chunk_size=settings.ERROR_TRACKER_EXPORT_CHUNK_SIZE
+    )
+    return render_error_log_rows(rows)
+
+
+def iter_csv(queryset):
+    """
+    Yields the ErrorLogs of queryset as CSV lines, starting with a header.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for row in iter_export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(queryset):
+    """
+    Yields the ErrorLogs of queryset as newline-delimited JSON objects.
+    """
+    for row in iter_export_rows(queryset):
+        yield json.dumps(dict(zip(FIELDS, row))) + '\n'
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+}
@@ -0,0 +1,139 @@
+"""
+Query parameters shared by the ErrorLog list and export endpoints:
+
+    project         UUID of one of the user's projects
+    environment     exact environment name
+    group           ErrorGroup id
+    created_after   ISO 8601 datetime, inclusive (UTC if it has no offset)
+    created_before  ISO 8601 datetime, exclusive (UTC if it has no offset)
+    search          full-text query (web search syntax) over the messages, PostgreSQL only
+
+Results are ordered by (created_at, id), newest first in the paginated list. Index coverage of
+ErrorLog (see Meta.indexes):
+
+    project [+ created range]                 errorlog_proj_created_idx
+    project + environment [+ created range]   errorlog_proj_env_created_idx
+    group [+ created range], with or without
+    project                                   errorlog_group_created_idx
+    environment [+ created range]             errorlog_proj_env_created_idx, once per project of the user
+    no filter or created range only           errorlog_proj_created_idx, once per project of the user
+    search                                    errorblob_search_idx on the deduplicated messages, then
+                                              the message_blob foreign key index
+
+Without a project, the rows of the user's projects are only read in index order when they are
+fetched with first_rows(), i.e. by the paginated list, and the user has at most
+ERROR_TRACKER_LIST_MAX_MERGED_PROJECTS projects; otherwise, and on databases without LIMIT in
+UNION branches such as SQLite, the matching rows are sorted. The export streams every matching
+row, so it always sorts them.
+
+With search, results are ordered by (rank, id) instead. Messages stored inline, i.e. not yet
+moved to blobs by migrate_error_messages_to_blobs, are not searchable.
+"""
+
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, connections
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from project_integrations.api_key_cache import normalize_uuid
+from project_integrations.models import Project
+
+
+def parse_datetime_param(params, name):
+    """
+    Returns the aware datetime of the query parameter name, None if it is missing.
+    """
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: 'Enter a valid ISO 8601 datetime.'})
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def get_projects(user, params):
+    """
+    Returns the queryset of the projects of user selected by the project parameter of params.
+    """
+    projects = Project.objects.filter(user=user)
+    project_uuid = params.get('project')
+    if project_uuid:
+        project_uuid = normalize_uuid(project_uuid)
+        if project_uuid is None:
+            raise ValidationError({'project': 'Enter a valid UUID.'})
+        projects = projects.filter(uuid=project_uuid)
+    return projects
+
+
+def filter_error_logs(queryset, user, params):
+    """
+    Restricts an ErrorLog queryset to the projects of user and applies the filters in params.
+    """
+    queryset = queryset.filter(project__in=get_projects(user, params).values('id'))
+
+    environment = params.get('environment')
+    if environment:
+        queryset = queryset.filter(environment=environment)
+
+    group = params.get('group')
+    if group:
+        try:
+            queryset = queryset.filter(error_group_id=int(group))
+        except ValueError:
+            raise ValidationError({'group': 'A valid integer is required.'})
+
+    created_after = parse_datetime_param(params, 'created_after')
+    if created_after:
+        queryset = queryset.filter(created_at__gte=created_after)
+    created_before = parse_datetime_param(params, 'created_before')
+    if created_before:
+        queryset = queryset.filter(created_at__lt=created_before)
+
+    search = params.get('search')
+    if search:
+        if connection.vendor != 'postgresql':
+            raise ValidationError({'search': 'Full-text search requires PostgreSQL.'})
+        query = SearchQuery(search, search_type='websearch', config=settings.ERROR_TRACKER_SEARCH_CONFIG)
+        # ts_rank returns a real; cast it so that cursors round-trip it exactly
+        queryset = queryset.filter(message_blob__search_vector=query).annotate(
+            rank=Cast(SearchRank(F('message_blob__search_vector'), query), FloatField())
+        )
+
+    return queryset
+
+
+def get_cursor_field(params):
+    """
+    Returns the field the filtered ErrorLogs are paginated on.
+    """
+    return 'rank' if params.get('search') else 'created_at'
+
+
+def first_rows(queryset, project_ids, ordering, limit):
+    """
+    Returns the first limit rows of a filtered ErrorLog queryset in ordering, on created_at then id.
+
+    Over several projects, (project, created_at, id) indexes cannot return the rows in order, so
+    the first limit ids of every project are read with one index scan each, merged with UNION
+    ALL, and only their rows are fetched.
+    """
+    if (len(project_ids) < 2 or len(project_ids) > settings.ERROR_TRACKER_LIST_MAX_MERGED_PROJECTS
+            or not connections[queryset.db].features.supports_slicing_ordering_in_compound):
+        return list(queryset.order_by(*ordering)[:limit])
+
+    fields = [name.lstrip('-') for name in ordering]
+    scans = [queryset.filter(project_id=project_id).order_by(*ordering).values_list(*fields)[:limit]
+             for project_id in project_ids]
+    merged = scans[0].union(*scans[1:], all=True).order_by(*ordering)[:limit]
+    ids = [row[fields.index('id')] for row in merged]
+    return list(queryset.filter(id__in=ids).order_by(*ordering))
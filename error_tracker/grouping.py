@@ -0,0 +1,127 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from .models import ErrorGroup
+
+# Volatile parts of a traceback that must not split one error into several groups
+_UUID = re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b')
+_MEMORY_ADDRESS = re.compile(r'\b0x[0-9a-fA-F]+\b')
+_LINE_NUMBER = re.compile(r'\bline \d+')
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_HORIZONTAL_SPACE = re.compile(r'[ \t]+')
+_ERROR_TYPE = re.compile(r'^(?:[\w.]+\.)?(\w+(?:Error|Exception|Warning|Exit|Interrupt))\b', re.MULTILINE)
+
+
+def mask_volatile_values(error_message):
+    """
+    Replaces the UUIDs, memory addresses, line numbers and numbers of an error message with
+    placeholders, keeping its layout.
+    """
+    text = _UUID.sub('<uuid>', error_message)
+    text = _MEMORY_ADDRESS.sub('<address>', text)
+    text = _LINE_NUMBER.sub('line <n>', text)
+    return _NUMBER.sub('<n>', text)
+
+
+def normalize_error_message(error_message):
+    """
+    Removes line numbers, memory addresses, UUIDs and numbers from an error message so that
+    occurrences of the same error normalize to the same text.
+    """
+    text = mask_volatile_values(error_message)
+    lines = (_HORIZONTAL_SPACE.sub(' ', line).strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def extract_error_type(error_message):
+    """
+    Returns the name of the exception raised last in the message, e.g. "TypeError".
+    """
+    matches = _ERROR_TYPE.findall(error_message)
+    return matches[-1] if matches else 'UnknownError'
+
+
+def compute_fingerprint(error_message):
+    return hashlib.sha256(normalize_error_message(error_message).encode('utf-8')).hexdigest()
+
+
+class GroupIdCache:
+    """
+    LRU mapping (project id, fingerprint) to the id of its ErrorGroup.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            group_id = self._entries.get(key)
+            if group_id is not None:
+                self._entries.move_to_end(key)
+            return group_id
+
+    def set(self, key, group_id):
+        with self._lock:
+            self._entries[key] = group_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.ERROR_TRACKER_GROUP_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+group_id_cache = GroupIdCache()
+
+
+def assign_error_groups(error_logs):
+    """
+    Sets error_group on every unsaved ErrorLog according to the fingerprint of its message.
+
+    Known fingerprints are served from group_id_cache. The missing groups are created with a
+    single conflict-ignoring bulk insert relying on the (project, fingerprint) unique constraint,
+    so concurrent workers creating the same group end up sharing it, and read back at once.
+    """
+    pending = {}
+    for error_log in error_logs:
+        fingerprint = compute_fingerprint(error_log.error_message)
+        key = (error_log.project_id, fingerprint)
+        group_id = group_id_cache.get(key)
+        if group_id is None:
+            pending.setdefault(key, []).append(error_log)
+        else:
+            error_log.error_group_id = group_id
+
+    if not pending:
+        return
+
+    ErrorGroup.objects.bulk_create(
+        [
+            ErrorGroup(
+                project_id=project_id,
+                fingerprint=fingerprint,
+                error_type=extract_error_type(logs[0].error_message)[:255],
+            )
+            for (project_id, fingerprint), logs in pending.items()
+        ],
+        ignore_conflicts=True,
+    )
+    groups = ErrorGroup.objects.filter(
+        project_id__in={project_id for project_id, _ in pending},
+        fingerprint__in={fingerprint for _, fingerprint in pending},
+    ).values_list('project_id', 'fingerprint', 'id')
+
+    for project_id, fingerprint, group_id in groups:
+        key = (project_id, fingerprint)
+        if key in pending:
+            group_id_cache.set(key, group_id)
+            for error_log in pending[key]:
+                error_log.error_group_id = group_id
@@ -0,0 +1,116 @@
+"""
+Top ErrorGroups of a set of projects, read from the group counters and the ErrorRollups only.
+
+Without a window, groups are ranked by their all-time count (errorgroup_proj_count_idx).
+With a window, the group rows of the rollups of the window are summed and ranked
+(errorrollup_window_idx); the window starts at the beginning of the bucket containing
+now - window, so counts move one bucket at a time.
+"""
+
+from datetime import timedelta
+from django.db.models import Sum
+from .models import ErrorGroup, ErrorRollup
+from .rollups import truncate
+
+# Supported windows: length and rollup resolution read
+WINDOWS = {
+    '1h': (timedelta(hours=1), ErrorRollup.MINUTE),
+    '24h': (timedelta(days=1), ErrorRollup.HOUR),
+    '7d': (timedelta(days=7), ErrorRollup.HOUR),
+    '30d': (timedelta(days=30), ErrorRollup.DAY),
+}
+
+
+def window_start(window, now):
+    """
+    Returns the first bucket of window ending at now, or None for all time.
+    """
+    if window is None:
+        return None
+    length, resolution = WINDOWS[window]
+    return truncate(now - length, resolution)
+
+
+def window_rollups(project_ids, window, now):
+    """
+    Returns the ErrorRollups of the group rows of projects in window, all time being day rollups.
+    """
+    resolution = WINDOWS[window][1] if window else ErrorRollup.DAY
+    rollups = ErrorRollup.objects.filter(project_id__in=project_ids, resolution=resolution)
+    if window:
+        rollups = rollups.filter(bucket__gte=window_start(window, now))
+    return rollups.exclude(group_id=ErrorRollup.ALL_GROUPS)
+
+
+def top_error_groups(groups, project_ids, window, limit, now):
+    """
+    Returns the limit ErrorGroups of the groups queryset with the most occurrences in window.
+
+    Every group gets a window_count attribute, its count in the window or its all-time count.
+    """
+    groups = groups.select_related('project', 'sample_message_blob')
+    if window is None:
+        top = list(groups.order_by('-count', 'id')[:limit])
+        for group in top:
+            group.window_count = group.count
+        return top
+
+    counts = list(
+        window_rollups(project_ids, window, now)
+        .filter(environment=ErrorRollup.ALL_ENVIRONMENTS)
+        .values('group_id')
+        .annotate(window_count=Sum('count'))
+        .order_by('-window_count', 'group_id')
+        .values_list('group_id', 'window_count')[:limit]
+    )
+    by_id = groups.in_bulk([group_id for group_id, _ in counts])
+    top = []
+    for group_id, window_count in counts:
+        group = by_id.get(group_id)
+        if group is not None:
+            group.window_count = window_count
+            top.append(group)
+    return top
+
+
+def attach_window_counts(groups, window, now):
+    """
+    Sets window_count on every ErrorGroup, with a single query over the rollups for a window.
+    """
+    counts = {}
+    if window is not None and groups:
+        counts = dict(
+            window_rollups({group.project_id for group in groups}, window, now)
+            .filter(group_id__in=[group.id for group in groups], environment=ErrorRollup.ALL_ENVIRONMENTS)
+            .values('group_id')
+            .annotate(window_count=Sum('count'))
+            .values_list('group_id', 'window_count')
+        )
+    for group in groups:
+        group.window_count = group.count if window is None else counts.get(group.id, 0)
+    return groups
+
+
+def attach_environments(groups, window, now):
+    """
+    Sets on every ErrorGroup an environments attribute mapping each environment to its count in
+    window, with a single query over the rollups.
+    """
+    for group in groups:
+        group.environments = {}
+    if not groups:
+        return groups
+
+    by_id = {group.id: group for group in groups}
+    rows = (
+        window_rollups({group.project_id for group in groups}, window, now)
+        .filter(group_id__in=by_id)
+        .exclude(environment=ErrorRollup.ALL_ENVIRONMENTS)
+        .values('group_id', 'environment')
+        .annotate(count=Sum('count'))
+        .order_by('group_id', '-count', 'environment')
+        .values_list('group_id', 'environment', 'count')
+    )
+    for group_id, environment, count in rows:
+        by_id[group_id].environments[environment] = count
+    return groups
@@ -0,0 +1,165 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, connection
+from .blobs import attach_message_blobs
+from .counters import group_counters
+from .grouping import assign_error_groups
+from .metrics import metrics
+from .models import ErrorLog
+from .retention import assign_retention_days
+from .rollups import rollup_counters
+from .similarity import index_error_logs
+from .throttling import sample_error_logs
+
+logger = logging.getLogger(__name__)
+
+
+def store_error_logs(error_logs):
+    """
+    Assigns unsaved ErrorLog instances to their ErrorGroup, indexes the signatures of new
+    groups for similarity lookups, moves their messages to ErrorMessageBlobs, persists them with
+    a single bulk insert, updates the group counters and time-series rollups and returns them.
+
+    ErrorLogs of groups over the sampling threshold are counted but not stored; they are
+    returned without an id. Every ingestion path (single, batch, NDJSON and write-behind) goes
+    through this function.
+    """
+    if not error_logs:
+        return []
+    assign_error_groups(error_logs)
+    index_error_logs(error_logs)
+    sampled = sample_error_logs(error_logs)
+    if len(sampled) < len(error_logs):
+        metrics.increment('ingest.sampled_out', len(error_logs) - len(sampled))
+    attach_message_blobs(sampled)
+    assign_retention_days(sampled)
+    ErrorLog.objects.bulk_create(sampled)
+    group_counters.add(error_logs)
+    rollup_counters.add(error_logs)
+    return error_logs
+
+
+class ErrorLogWriter:
+    """
+    Write-behind buffer for ErrorLogs.
+
+    Views enqueue validated, unsaved ErrorLogs and return immediately; a background thread
+    drains the queue and writes them with store_error_logs in batches of at most
+    ERROR_TRACKER_FLUSH_BATCH_SIZE, waiting at most ERROR_TRACKER_FLUSH_INTERVAL seconds for
+    a batch to fill up. Pending events are flushed when the process exits.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=settings.ERROR_TRACKER_QUEUE_MAX_SIZE)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, error_logs):
+        """
+        Enqueues ErrorLogs for writing, starting the writer thread if needed.
+
+        Returns False without enqueuing anything if the queue cannot hold all of them.
+        """
+        self.start()
+        return self.put(error_logs)
+
+    def put(self, error_logs):
+        with self._lock:
+            if self._queue.maxsize and self._queue.qsize() + len(error_logs) > self._queue.maxsize:
+                metrics.increment('ingest.queue.rejected', len(error_logs))
+                return False
+            for error_log in error_logs:
+                self._queue.put_nowait(error_log)
+        metrics.set_gauge('ingest.queue.depth', self._queue.qsize())
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='error-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout=None):
+        """
+        Stops the writer thread after it has flushed every pending ErrorLog.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout if timeout is not None else settings.ERROR_TRACKER_SHUTDOWN_TIMEOUT)
+        self._thread = None
+
+    def flush(self):
+        """
+        Synchronously writes everything currently in the queue.
+        """
+        while True:
+            batch = self._collect(wait=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        # Only the writer thread recycles its connection: flush() may also be called from a
+        # thread in the middle of a transaction
+        try:
+            while not self._stopping.is_set():
+                batch = self._collect(wait=True)
+                if batch:
+                    close_old_connections()
+                    self._write(batch)
+            close_old_connections()
+            self.flush()
+        finally:
+            connection.close()
+
+    def _collect(self, wait):
+        batch_size = settings.ERROR_TRACKER_FLUSH_BATCH_SIZE
+        linger = settings.ERROR_TRACKER_FLUSH_INTERVAL
+        batch = []
+        try:
+            # Block for the first item only so that an idle writer notices shutdown quickly
+            batch.append(self._queue.get(timeout=linger) if wait else self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+        deadline = time.monotonic() + linger
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if wait and remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        started = time.monotonic()
+        try:
+            store_error_logs(batch)
+        except Exception:
+            logger.exception("Failed to write %d error logs", len(batch))
+            metrics.increment('ingest.flush.failed', len(batch))
+        else:
+            metrics.increment('ingest.flush.written', len(batch))
+        finally:
+            metrics.observe('ingest.flush.latency', time.monotonic() - started)
+            metrics.set_gauge('ingest.queue.depth', self._queue.qsize())
+
+
+error_log_writer = ErrorLogWriter()
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from error_tracker import partitions
+
+
+class Command(BaseCommand):
+    help = ("Creates the upcoming partitions of the ErrorLog table, converting it to a partitioned "
+            "table first with --convert. Meant to run daily, e.g. from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=None,
+                            help="Number of partitions created after the current one "
+                                 "(default: ERROR_TRACKER_PARTITIONS_AHEAD).")
+        parser.add_argument('--convert', action='store_true',
+                            help="Rebuild the ErrorLog table as a partitioned table, copying its rows.")
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Number of rows copied per transaction by --convert.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Partitioning requires PostgreSQL.")
+
+        if not partitions.is_partitioned():
+            if not options['convert']:
+                raise CommandError("The ErrorLog table is not partitioned, run with --convert to convert it.")
+            partitions.convert_to_partitioned(options['batch_size'], log=self.stdout.write)
+
+        created = partitions.create_partitions(timezone.now(), ahead=options['ahead'])
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} partitions."))
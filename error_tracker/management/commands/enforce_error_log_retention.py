@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from error_tracker.retention import delete_expired_rollups, delete_unreferenced_message_blobs, enforce_retention
+
+
+class Command(BaseCommand):
+    help = ("Removes the ErrorLogs older than the retention of their project, by dropping whole "
+            "partitions when the ErrorLog table is partitioned, then the message blobs no longer used "
+            "and the minute and hour rollups older than their retention.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Number of rows deleted per query when rows are deleted one by one.")
+
+    def handle(self, *args, **options):
+        dropped, deleted = enforce_retention(batch_size=options['batch_size'])
+        blobs = delete_unreferenced_message_blobs(batch_size=options['batch_size'])
+        rollups = delete_expired_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Dropped {len(dropped)} partitions and deleted {deleted} error logs, "
+                                             f"{blobs} message blobs and {rollups} rollups."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from error_tracker.blobs import search_vector_for
+from error_tracker.models import ErrorMessageBlob
+
+
+class Command(BaseCommand):
+    help = "Computes the full-text search vector of the ErrorMessageBlobs that do not have one yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Number of blobs indexed per transaction.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Full-text search requires PostgreSQL.")
+
+        batch_size = options['batch_size']
+        last_hash = ''
+        indexed = 0
+
+        while True:
+            blobs = list(
+                ErrorMessageBlob.objects
+                .filter(hash__gt=last_hash, search_vector__isnull=True)
+                .only('hash', 'data', 'compressed')
+                .order_by('hash')[:batch_size]
+            )
+            if not blobs:
+                break
+            last_hash = blobs[-1].hash
+
+            with transaction.atomic():
+                for blob in blobs:
+                    ErrorMessageBlob.objects.filter(hash=blob.hash).update(search_vector=search_vector_for(blob.text))
+            indexed += len(blobs)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} error messages."))
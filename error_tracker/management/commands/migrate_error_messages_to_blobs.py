@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from error_tracker.blobs import attach_message_blobs
+from error_tracker.models import ErrorLog
+
+
+class Command(BaseCommand):
+    help = "Moves the messages of ErrorLogs stored inline to deduplicated ErrorMessageBlobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Number of ErrorLogs converted per transaction.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        converted = 0
+
+        while True:
+            error_logs = list(
+                ErrorLog.objects
+                .filter(id__gt=last_id, message_blob__isnull=True)
+                .only('id', 'error_message', 'message_blob_id')
+                .order_by('id')[:batch_size]
+            )
+            if not error_logs:
+                break
+            last_id = error_logs[-1].id
+
+            with transaction.atomic():
+                attach_message_blobs(error_logs)
+                ErrorLog.objects.bulk_update(error_logs, ['message_blob', 'error_message'])
+            converted += len(error_logs)
+            self.stdout.write(f"Converted {converted} error logs...")
+
+        self.stdout.write(self.style.SUCCESS(f"Moved the messages of {converted} error logs to blobs."))
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from error_tracker.counters import group_counters
+from error_tracker.models import ErrorGroup, ErrorLog
+
+
+def group_aggregate(aggregate):
+    """
+    Returns a subquery of the aggregate of the ErrorLogs of the outer ErrorGroup.
+    """
+    return Subquery(
+        ErrorLog.objects.filter(error_group_id=OuterRef('pk'))
+        .values('error_group_id')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+class Command(BaseCommand):
+    help = ("Recomputes the count, first_seen and last_seen of every ErrorGroup from its ErrorLogs. "
+            "Occurrences not stored by sampling are kept in the count. With "
+            "ERROR_TRACKER_COUNTER_FLUSH_INTERVAL above 0, pause ingestion for that long first: the "
+            "increments other processes still buffer would be added to the recomputed counts.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Number of groups recomputed per UPDATE.")
+
+    def handle(self, *args, **options):
+        # The ErrorLogs behind buffered increments are already stored and counted below
+        group_counters.flush()
+        interval = settings.ERROR_TRACKER_COUNTER_FLUSH_INTERVAL
+        if interval > 0:
+            self.stderr.write(self.style.WARNING(
+                f"Counter increments are buffered for {interval:g} seconds: unless ingestion has been "
+                f"paused for that long, the ones other processes still hold will be counted twice."
+            ))
+
+        chunk_size = options['chunk_size']
+        last_id = 0
+        repaired = 0
+
+        while True:
+            ids = list(
+                ErrorGroup.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+
+            # The counters are computed and written by a single UPDATE, so the increments made
+            # by ingestion are never overwritten by counts read before them
+            repaired += ErrorGroup.objects.filter(id__gt=last_id, id__lte=ids[-1]).update(
+                count=Coalesce(group_aggregate(Count('id')), Value(0)) + F('sampled_count'),
+                first_seen=Coalesce(group_aggregate(Min('created_at')), 'first_seen'),
+                last_seen=Coalesce(group_aggregate(Max('created_at')), 'last_seen'),
+            )
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed counters of {repaired} error groups."))
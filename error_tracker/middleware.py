@@ -0,0 +1,134 @@
+import tempfile
+import zlib
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from .metrics import metrics
+
+CHUNK_SIZE = 64 * 1024
+# Decompressed bodies larger than this are spooled to a temporary file instead of memory
+SPOOL_SIZE = 1024 * 1024
+
+
+class DecompressionError(Exception):
+    pass
+
+
+class DecompressedBodyTooLarge(Exception):
+    pass
+
+
+def _make_decompressor(encoding, first_chunk):
+    if encoding == 'gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # "deflate" is meant to be zlib-wrapped, but some clients send a raw deflate stream
+    if len(first_chunk) >= 2 and first_chunk[0] & 0x0F == 8 and (first_chunk[0] << 8 | first_chunk[1]) % 31 == 0:
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    return zlib.decompressobj(-zlib.MAX_WBITS)
+
+
+def decompress_stream(stream, encoding, max_size):
+    """
+    Decompresses a gzip or deflate stream chunk by chunk into a spooled temporary file.
+
+    Never holds more than one chunk of output beyond max_size, so a zip bomb is detected after
+    max_size bytes instead of after it has been fully inflated. Returns the file positioned at
+    its start together with the number of compressed and decompressed bytes.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    decompressor = None
+    compressed_size = 0
+    decompressed_size = 0
+
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            compressed_size += len(chunk)
+            if decompressor is None:
+                decompressor = _make_decompressor(encoding, chunk)
+
+            data = chunk
+            while data:
+                # Bound the output of every call so that highly compressed data is inflated gradually
+                inflated = decompressor.decompress(data, CHUNK_SIZE)
+                decompressed_size += len(inflated)
+                if decompressed_size > max_size:
+                    raise DecompressedBodyTooLarge
+                output.write(inflated)
+                data = decompressor.unconsumed_tail
+
+        if decompressor is not None:
+            tail = decompressor.flush()
+            decompressed_size += len(tail)
+            if decompressed_size > max_size:
+                raise DecompressedBodyTooLarge
+            output.write(tail)
+            if not decompressor.eof:
+                raise DecompressionError("Truncated compressed body.")
+    except zlib.error as e:
+        output.close()
+        raise DecompressionError(str(e))
+    except Exception:
+        output.close()
+        raise
+
+    output.seek(0)
+    return output, compressed_size, decompressed_size
+
+
+class RequestDecompressionMiddleware:
+    """
+    Transparently decompresses gzip and deflate request bodies sent to the paths listed in
+    REQUEST_DECOMPRESSION_PATHS, up to REQUEST_DECOMPRESSION_MAX_SIZE decompressed bytes.
+
+    Supports both WSGI and ASGI; under ASGI the body has already been received by the handler,
+    so decompressing it does not block on the client.
+    """
+    sync_capable = True
+    async_capable = True
+    supported_encodings = ('gzip', 'deflate')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_request(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.process_request(request) or await self.get_response(request)
+
+    def process_request(self, request):
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if not encoding or encoding == 'identity' or not self._applies_to(request.path):
+            return None
+        if encoding not in self.supported_encodings:
+            return JsonResponse({'detail': f'Unsupported content encoding "{encoding}".'}, status=415)
+        try:
+            body, compressed_size, decompressed_size = decompress_stream(
+                request, encoding, settings.REQUEST_DECOMPRESSION_MAX_SIZE
+            )
+        except DecompressedBodyTooLarge:
+            metrics.increment('ingest.decompression.too_large')
+            return JsonResponse({'detail': 'Decompressed request body is too large.'}, status=413)
+        except DecompressionError:
+            metrics.increment('ingest.decompression.failed')
+            return JsonResponse({'detail': 'Malformed compressed request body.'}, status=400)
+
+        metrics.increment('ingest.bytes.compressed', compressed_size)
+        metrics.increment('ingest.bytes.decompressed', decompressed_size)
+
+        request._stream = body
+        request._read_started = False
+        request.META['CONTENT_LENGTH'] = str(decompressed_size)
+        del request.META['HTTP_CONTENT_ENCODING']
+        return None
+
+    @staticmethod
+    def _applies_to(path):
+        return any(path.startswith(prefix) for prefix in settings.REQUEST_DECOMPRESSION_PATHS)
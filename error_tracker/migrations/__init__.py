@@ -0,0 +1,11 @@
+"""
+The migrations of error_tracker are not committed: they are generated with makemigrations and
+applied with migrate at deploy time, so every model and Meta.indexes change ships that way.
+
+On PostgreSQL, indexes added to tables that already hold data (the ErrorLog indexes of the
+list filters, errorblob_search_idx, errorgroup_proj_count_idx, ...) should be built without
+blocking ingestion: edit the generated migration to set atomic = False and replace AddIndex
+with django.contrib.postgres.operations.AddIndexConcurrently. A partitioned ErrorLog table
+cannot be indexed concurrently as a whole; build the index concurrently on every partition,
+then create it ON ONLY the parent and attach the partition indexes.
+"""
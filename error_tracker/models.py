@@ -1,14 +1,163 @@
+import zlib
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
 from project_integrations.models import Project
 
 
 class ErrorGroup(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True)
+    fingerprint = models.CharField(max_length=64, blank=True, default='')
+    error_type = models.CharField(max_length=255, blank=True, default='')
+    # Denormalized occurrence counters, maintained at ingestion by error_tracker.counters
+    count = models.PositiveBigIntegerField(default=0)
+    # Occurrences counted but not stored by sampling, part of count
+    sampled_count = models.PositiveBigIntegerField(default=0)
+    first_seen = models.DateTimeField(default=timezone.now)
+    last_seen = models.DateTimeField(default=timezone.now)
+    # Message of the first stored occurrence, set along with the counters
+    sample_message_blob = models.ForeignKey('ErrorMessageBlob', on_delete=models.SET_NULL, null=True,
+                                            related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'fingerprint'], name='unique_error_group_fingerprint'),
+        ]
+        indexes = [
+            # All-time top groups of a project, see error_tracker.groups
+            models.Index(fields=['project', '-count'], name='errorgroup_proj_count_idx'),
+        ]
+
+
+class ErrorMessageBlob(models.Model):
+    """
+    Deduplicated body of error messages, addressed by the SHA-256 of its text.
+
+    Bodies larger than ERROR_TRACKER_MESSAGE_COMPRESSION_MIN_SIZE bytes are stored zlib-compressed.
+    search_vector is computed once per distinct message when the blob is inserted.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    search_vector = SearchVectorField(null=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='errorblob_search_idx'),
+        ]
+
+    @property
+    def text(self):
+        if not hasattr(self, '_text'):
+            self._text = self.decode(self.data, self.compressed)
+        return self._text
+
+    @staticmethod
+    def decode(data, compressed):
+        """
+        Returns the text stored in the data and compressed columns of a blob.
+        """
+        data = bytes(data)
+        return (zlib.decompress(data) if compressed else data).decode('utf-8')
+
+
+def default_retention_days():
+    return settings.ERROR_TRACKER_DEFAULT_RETENTION_DAYS
 
 
 class ErrorLog(models.Model):
+    # Only set for rows stored before message blobs; new messages are kept in message_blob
     error_message = models.TextField()
     environment = models.TextField(null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event is received, which can be before it is written, see ErrorLogWriter
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     error_group = models.ForeignKey(ErrorGroup, on_delete=models.CASCADE, null=True)
+    message_blob = models.ForeignKey(ErrorMessageBlob, on_delete=models.PROTECT, null=True)
+    # Retention tier of the project when the ErrorLog was stored; on PostgreSQL the table can be
+    # partitioned by it and by created_at, see error_tracker.partitions
+    retention_days = models.PositiveIntegerField(default=default_retention_days)
+
+    class Meta:
+        # Serve the list filters in (created_at, id) order, see error_tracker.filters
+        indexes = [
+            models.Index(fields=['project', 'created_at', 'id'], name='errorlog_proj_created_idx'),
+            models.Index(fields=['project', 'environment', 'created_at', 'id'], name='errorlog_proj_env_created_idx'),
+            models.Index(fields=['error_group', 'created_at', 'id'], name='errorlog_group_created_idx'),
+        ]
+
+    def get_error_message(self):
+        """
+        Returns the error message, whether it is stored inline or in an ErrorMessageBlob.
+        """
+        if self.message_blob_id is not None:
+            return self.message_blob.text
+        return self.error_message
+
+
+class ErrorRollup(models.Model):
+    """
+    Number of ErrorLogs per project, group and environment in a time bucket of a resolution.
+
+    group_id 0 and environment ALL_ENVIRONMENTS hold the totals over all groups and all
+    environments, so every chart reads a single row per bucket; the serializers reject
+    ALL_ENVIRONMENTS as the environment of an ErrorLog. Rows are upserted at ingestion by
+    error_tracker.rollups.
+    """
+    MINUTE = 'minute'
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = [(MINUTE, 'Minute'), (HOUR, 'Hour'), (DAY, 'Day')]
+    ALL_GROUPS = 0
+    ALL_ENVIRONMENTS = '*'
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    group_id = models.BigIntegerField(default=ALL_GROUPS)
+    environment = models.TextField(default=ALL_ENVIRONMENTS)
+    resolution = models.CharField(max_length=6, choices=RESOLUTION_CHOICES)
+    bucket = models.DateTimeField()
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'group_id', 'environment', 'resolution', 'bucket'],
+                                    name='unique_error_rollup_bucket'),
+        ]
+        indexes = [
+            # Top groups and environment breakdowns of a project over a window, see error_tracker.groups
+            models.Index(fields=['project', 'resolution', 'environment', 'bucket'], name='errorrollup_window_idx'),
+        ]
+
+
+class ErrorSignature(models.Model):
+    """
+    MinHash signature of the normalized message of a fingerprint, NUM_PERMUTATIONS little-endian
+    uint32 values; see error_tracker.similarity.
+    """
+    fingerprint = models.CharField(max_length=64, primary_key=True)
+    minhash = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class ErrorSignatureBand(models.Model):
+    """
+    Hash of one band of an ErrorSignature. Fingerprints sharing the hash of a band are candidate
+    near-duplicates of each other.
+    """
+    signature = models.ForeignKey(ErrorSignature, on_delete=models.CASCADE, related_name='bands')
+    band = models.PositiveSmallIntegerField()
+    hash = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['signature', 'band'], name='unique_error_signature_band'),
+        ]
+        indexes = [
+            # Candidate lookups, one per band, see error_tracker.similarity
+            models.Index(fields=['band', 'hash'], name='errorsigband_band_hash_idx'),
+        ]
@@ -0,0 +1,93 @@
+import base64
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .filters import first_rows
+
+
+class ErrorLogCursorPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    The cursor is an opaque encoding of the (created_at, id) of the last row of the previous
+    page, and each page is fetched with a "strictly older than the cursor" condition, so every
+    page read in index order costs the same as the first one. page_size is bounded by
+    ERROR_TRACKER_MAX_PAGE_SIZE.
+
+    Views listing the ErrorLogs of several projects define get_project_ids(), so pages are read
+    with one index scan per project, see error_tracker.filters.first_rows. Views may order by
+    another descending field, e.g. a search rank annotation, by defining get_cursor_field().
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    cursor_field = 'created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if hasattr(view, 'get_cursor_field'):
+            self.cursor_field = view.get_cursor_field()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, last_id = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{self.cursor_field}__lt': value}) | Q(**{self.cursor_field: value, 'id__lt': last_id})
+            )
+
+        ordering = (f'-{self.cursor_field}', '-id')
+        if self.cursor_field == 'created_at' and hasattr(view, 'get_project_ids'):
+            rows = first_rows(queryset, view.get_project_ids(), ordering, self.page_size + 1)
+        else:
+            rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = self.encode_cursor(getattr(self.last_row, self.cursor_field), self.last_row.id)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_page_size(self, request):
+        page_size = settings.ERROR_TRACKER_PAGE_SIZE
+        requested = request.query_params.get(self.page_size_query_param)
+        if requested:
+            try:
+                page_size = int(requested)
+            except ValueError:
+                raise ValidationError({self.page_size_query_param: 'A valid integer is required.'})
+        return max(1, min(page_size, settings.ERROR_TRACKER_MAX_PAGE_SIZE))
+
+    @staticmethod
+    def encode_cursor(value, row_id):
+        value = value.isoformat() if isinstance(value, datetime) else repr(value)
+        return base64.urlsafe_b64encode(f'{value}|{row_id}'.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            decoded = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            value, row_id = decoded.split('|')
+            value = datetime.fromisoformat(value) if self.cursor_field == 'created_at' else float(value)
+            return value, int(row_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
@@ -0,0 +1,304 @@
+"""
+Native PostgreSQL partitioning of the ErrorLog table.
+
+The table is partitioned by LIST on retention_days, one partition per retention tier, and every
+tier is partitioned by RANGE on created_at, per day or per month (ERROR_TRACKER_PARTITION_INTERVAL):
+
+    error_tracker_errorlog                           PARTITION BY LIST (retention_days)
+        error_tracker_errorlog_r30                   PARTITION BY RANGE (created_at)
+            error_tracker_errorlog_r30_p20261017     [2026-10-17, 2026-10-18)
+            error_tracker_errorlog_r30_default       rows outside of the created partitions
+        error_tracker_errorlog_rdefault              rows of a tier that was removed from the settings
+
+Expired ErrorLogs are removed by detaching and dropping the partitions whose whole range is older
+than their tier, see error_tracker.retention. The primary key is (id, retention_days, created_at)
+as PostgreSQL requires it to contain the partition keys; ids still come from a single identity
+sequence, so Django keeps using id alone.
+
+convert_to_partitioned() rebuilds an existing table into this layout and create_partitions()
+must run ahead of time (create_error_log_partitions command), otherwise ErrorLogs land in the
+default partitions where they can only be deleted row by row.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from .models import ErrorLog
+
+DAY = 'day'
+MONTH = 'month'
+
+PARTITION_NAME_RE = re.compile(r'_r(?P<tier>\d+)_p(?P<start>\d{6}|\d{8})$')
+
+
+def table_name():
+    return ErrorLog._meta.db_table
+
+
+def tier_table_name(tier):
+    return f'{table_name()}_r{tier}'
+
+
+def partition_start(value, interval):
+    """
+    Returns the start, in UTC, of the partition of interval containing the datetime value.
+    """
+    value = value.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == MONTH:
+        value = value.replace(day=1)
+    return value
+
+
+def next_partition_start(start, interval):
+    if interval == MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def partition_name(tier, start, interval):
+    suffix = f'{start:%Y%m}' if interval == MONTH else f'{start:%Y%m%d}'
+    return f'{tier_table_name(tier)}_p{suffix}'
+
+
+def parse_partition_name(name):
+    """
+    Returns (tier, start, end) of a partition created by create_partitions(), None for any other table.
+    """
+    match = PARTITION_NAME_RE.search(name)
+    if match is None:
+        return None
+    start = match.group('start')
+    interval = MONTH if len(start) == 6 else DAY
+    start = datetime.strptime(start, '%Y%m' if interval == MONTH else '%Y%m%d').replace(tzinfo=dt_timezone.utc)
+    return int(match.group('tier')), start, next_partition_start(start, interval)
+
+
+def is_partitioned():
+    """
+    Returns whether the ErrorLog table is a partitioned table.
+    """
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table_name()]
+        )
+        return cursor.fetchone() is not None
+
+
+def existing_tables():
+    """
+    Returns the names of the tables of the current schema, partitions included, which
+    connection.introspection.table_names() leaves out.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relname FROM pg_class WHERE relkind IN ('r', 'p') AND pg_table_is_visible(oid)")
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partitions(now, ahead=None, interval=None, parent=None, since=None):
+    """
+    Creates the tier partitions of the settings and their created_at partitions up to ahead
+    partitions after the one containing now, and returns the names of the created tables.
+
+    The created_at partitions of a tier start from the one containing now, or with since, from
+    the one containing since or the oldest unexpired created_at of the tier if it is later.
+    """
+    parent = parent or table_name()
+    ahead = settings.ERROR_TRACKER_PARTITIONS_AHEAD if ahead is None else ahead
+    interval = interval or settings.ERROR_TRACKER_PARTITION_INTERVAL
+    quote = connection.ops.quote_name
+    existing = existing_tables()
+    statements = []
+
+    last = partition_start(now, interval)
+    for _ in range(ahead):
+        last = next_partition_start(last, interval)
+
+    for tier in settings.ERROR_TRACKER_RETENTION_TIERS:
+        tier_table = tier_table_name(tier)
+        if tier_table not in existing:
+            statements.append((tier_table,
+                               f"CREATE TABLE {quote(tier_table)} PARTITION OF {quote(parent)} "
+                               f"FOR VALUES IN ({int(tier)}) PARTITION BY RANGE ({quote('created_at')})"))
+        if f'{tier_table}_default' not in existing:
+            statements.append((f'{tier_table}_default',
+                               f"CREATE TABLE {quote(tier_table + '_default')} "
+                               f"PARTITION OF {quote(tier_table)} DEFAULT"))
+
+        first = now if since is None else min(max(since, now - timedelta(days=tier)), now)
+        start = partition_start(first, interval)
+        while start <= last:
+            end = next_partition_start(start, interval)
+            name = partition_name(tier, start, interval)
+            if name not in existing:
+                statements.append((name,
+                                   f"CREATE TABLE {quote(name)} PARTITION OF {quote(tier_table)} "
+                                   f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"))
+            start = end
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for _, sql in statements:
+            cursor.execute(sql)
+    return [name for name, _ in statements]
+
+
+def list_partitions():
+    """
+    Returns the names of the created_at partitions of every tier partition.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_inherits tier ON tier.inhrelid = parent.oid "
+            "WHERE tier.inhparent = to_regclass(%s)", [table_name()]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def drop_expired_partitions(now):
+    """
+    Detaches and drops the partitions whose whole range is older than the retention of their tier,
+    and returns their names.
+    """
+    quote = connection.ops.quote_name
+    dropped = []
+    for name in sorted(list_partitions()):
+        parsed = parse_partition_name(name)
+        if parsed is None:
+            continue
+        tier, _, end = parsed
+        if end > now - timedelta(days=tier):
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(tier_table_name(tier))} DETACH PARTITION {quote(name)}")
+            cursor.execute(f"DROP TABLE {quote(name)}")
+        dropped.append(name)
+    return dropped
+
+
+def delete_expired_default_rows(now, batch_size):
+    """
+    Deletes, in batches, the expired rows stored in the default partitions and returns their number.
+    """
+    quote = connection.ops.quote_name
+    tables = [f'{tier_table_name(tier)}_default' for tier in settings.ERROR_TRACKER_RETENTION_TIERS]
+    tables.append(f'{table_name()}_rdefault')
+    existing = existing_tables()
+    deleted = 0
+    for table in tables:
+        if table not in existing:
+            continue
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {quote(table)} WHERE ctid = ANY(ARRAY("
+                    f"SELECT ctid FROM {quote(table)} "
+                    f"WHERE {quote('created_at')} < %s - make_interval(days => {quote('retention_days')}) "
+                    f"LIMIT %s))", [now, batch_size]
+                )
+                count = cursor.rowcount
+            deleted += count
+            if count < batch_size:
+                break
+    return deleted
+
+
+def _column_definitions():
+    quote = connection.ops.quote_name
+    columns = []
+    for field in ErrorLog._meta.local_concrete_fields:
+        definition = f"{quote(field.column)} {field.db_type(connection)}"
+        suffix = field.db_type_suffix(connection)
+        if suffix:
+            definition += f" {suffix}"
+        if not field.null:
+            definition += " NOT NULL"
+        if field.remote_field is not None:
+            target = field.target_field
+            definition += (f" REFERENCES {quote(target.model._meta.db_table)} ({quote(target.column)}) "
+                           f"DEFERRABLE INITIALLY DEFERRED")
+        columns.append(definition)
+    return columns
+
+
+def convert_to_partitioned(batch_size=10000, log=None):
+    """
+    Rebuilds the ErrorLog table as a partitioned table and copies its rows, batch_size at a time.
+
+    The rows are copied into a new table while ingestion goes on, into range partitions created
+    back to the oldest row; rows already older than their retention are not copied. The last rows
+    are copied and the tables swapped while the old one is locked against writes, then it is
+    dropped. Indexes
+    are recreated from ErrorLog.Meta.indexes plus one on message_blob_id.
+    """
+    log = log or (lambda message: None)
+    quote = connection.ops.quote_name
+    table = table_name()
+    new_table = f'{table}_partitioned'
+    column_names = ', '.join(quote(field.column) for field in ErrorLog._meta.local_concrete_fields)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        columns = _column_definitions()
+        columns.append(f"PRIMARY KEY ({quote('id')}, {quote('retention_days')}, {quote('created_at')})")
+        cursor.execute(f"CREATE TABLE {quote(new_table)} ({', '.join(columns)}) "
+                       f"PARTITION BY LIST ({quote('retention_days')})")
+        cursor.execute(f"CREATE TABLE {quote(table + '_rdefault')} PARTITION OF {quote(new_table)} DEFAULT")
+        for index in ErrorLog._meta.indexes:
+            fields = ', '.join(quote(ErrorLog._meta.get_field(name).column) for name in index.fields)
+            cursor.execute(f"CREATE INDEX {quote(index.name + '_p')} ON {quote(new_table)} ({fields})")
+        cursor.execute(f"CREATE INDEX {quote(table + '_blob_p')} ON {quote(new_table)} ({quote('message_blob_id')})")
+
+    # Named after the old table, which the new one replaces. The existing rows get range
+    # partitions too, back to the oldest one that has not expired.
+    now = datetime.now(dt_timezone.utc)
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({quote('created_at')}) FROM {quote(table)}")
+        oldest = cursor.fetchone()[0]
+    create_partitions(now, parent=new_table, since=oldest)
+
+    # Expired rows are left behind rather than deleted row by row from the default partitions
+    unexpired = f"{quote('created_at')} >= %s - make_interval(days => {quote('retention_days')})"
+
+    def copy_after(last_id):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT MAX({quote('id')}) FROM (SELECT {quote('id')} FROM {quote(table)} "
+                f"WHERE {quote('id')} > %s ORDER BY {quote('id')} LIMIT %s) AS batch", [last_id, batch_size]
+            )
+            batch_end = cursor.fetchone()[0]
+            if batch_end is None:
+                return None
+            cursor.execute(
+                f"INSERT INTO {quote(new_table)} ({column_names}) "
+                f"SELECT {column_names} FROM {quote(table)} "
+                f"WHERE {quote('id')} > %s AND {quote('id')} <= %s AND {unexpired}", [last_id, batch_end, now]
+            )
+        return batch_end
+
+    last_id = 0
+    while True:
+        batch_end = copy_after(last_id)
+        if batch_end is None:
+            break
+        last_id = batch_end
+        log(f"Copied error logs up to id {last_id}.")
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quote(table)} IN EXCLUSIVE MODE")
+        cursor.execute(
+            f"INSERT INTO {quote(new_table)} ({column_names}) "
+            f"SELECT {column_names} FROM {quote(table)} WHERE {quote('id')} > %s AND {unexpired}", [last_id, now]
+        )
+        cursor.execute(f"DROP TABLE {quote(table)}")
+        cursor.execute(f"ALTER TABLE {quote(new_table)} RENAME TO {quote(table)}")
+        for index in ErrorLog._meta.indexes:
+            cursor.execute(f"ALTER INDEX {quote(index.name + '_p')} RENAME TO {quote(index.name)}")
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"(SELECT COALESCE(MAX({quote('id')}), 0) + 1 FROM {quote(table)}), false)", [table]
+        )
+    log("Swapped in the partitioned table.")
@@ -1,33 +1,55 @@
 # error_tracker/permissions.py
 from rest_framework.permissions import BasePermission
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import ParseError, PermissionDenied
 from project_integrations.models import APIKey, Project
+from project_integrations.api_key_cache import normalize_uuid, resolve_project
+from .throttling import check_ingest_rate
 
 
 class HasAPIKeyPermission(BasePermission):
     """
     Custom permission to authenticate using an API key and ensure it is associated with the specified project.
+
+    The project UUID is read from the request body unless the view provides get_project_uuid(request),
+    e.g. for bodies that are not parsed as a whole. On success the resolved project id is stored in
+    request.project_id so the serializers don't have to look the project up again, and in
+    request.ingest_project for the rate limiter. Projects over their ingestion rate get a 429, and
+    bodies that are not a JSON object a 400.
     """
 
     def has_permission(self, request, view):
         if request.method == 'POST':
             api_key = request.headers.get('API-Key')
-            project_uuid = request.data.get('project')
+            if hasattr(view, 'get_project_uuid'):
+                project_uuid = view.get_project_uuid(request)
+            elif not isinstance(request.data, dict):
+                raise ParseError("Expected a JSON object.")
+            else:
+                project_uuid = request.data.get('project')
 
             if not api_key or not project_uuid:
                 return False
 
-            try:
-                project_id = Project.objects.get(uuid=project_uuid).id
-            except Project.DoesNotExist:
+            project_uuid = normalize_uuid(project_uuid)
+            if project_uuid is None:
                 raise PermissionDenied("Invalid project UUID.")
 
+            api_key = normalize_uuid(api_key)
+            if api_key is None:
+                raise PermissionDenied("Invalid API key or project association.")
+
             try:
-                # Fetch the APIKey and check if it is associated with the given project
-                api_key_instance = APIKey.objects.get(key=api_key, project_id=project_id)
-                return True
+                # Check that the APIKey is associated with the given project
+                project = resolve_project(api_key, project_uuid)
+            except Project.DoesNotExist:
+                raise PermissionDenied("Invalid project UUID.")
             except APIKey.DoesNotExist:
                 raise PermissionDenied("Invalid API key or project association.")
 
+            check_ingest_rate(project)
+            request.project_id = project.id
+            request.ingest_project = project
+            return True
+
         # Allow access for GET requests or any other method
         return True
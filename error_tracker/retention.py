@@ -0,0 +1,177 @@
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, ProtectedError
+from django.utils import timezone
+from project_integrations.models import Project
+from . import partitions
+from .groups import WINDOWS
+from .models import ErrorGroup, ErrorLog, ErrorMessageBlob, ErrorRollup
+from .rollups import truncate
+
+# Age under which an unreferenced ErrorMessageBlob may be about to be referenced by ingestion
+BLOB_GRACE_PERIOD = timedelta(hours=1)
+
+
+def retention_tier(days):
+    """
+    Returns the retention tier ErrorLogs kept for days are stored in: the smallest tier that is
+    at least days long.
+
+    A retention is never rounded down, so days longer than the longest tier raise ValueError;
+    Project.retention_days is validated against the tiers to prevent it.
+    """
+    if days is None:
+        days = settings.ERROR_TRACKER_DEFAULT_RETENTION_DAYS
+    for tier in sorted(settings.ERROR_TRACKER_RETENTION_TIERS):
+        if tier >= days:
+            return tier
+    raise ValueError(f"A retention of {days} days is longer than the longest retention tier.")
+
+
+class RetentionCache:
+    """
+    Maps a project id to its retention tier for ERROR_TRACKER_RETENTION_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, project_ids):
+        """
+        Returns {project id: retention tier}, loading the missing projects with a single query.
+        """
+        now = time.monotonic()
+        tiers = {}
+        with self._lock:
+            for project_id in project_ids:
+                entry = self._entries.get(project_id)
+                if entry is not None and entry[1] > now:
+                    tiers[project_id] = entry[0]
+
+        missing = set(project_ids) - tiers.keys()
+        if missing:
+            rows = Project.objects.filter(id__in=missing).values_list('id', 'retention_days')
+            expires_at = now + settings.ERROR_TRACKER_RETENTION_CACHE_TTL
+            with self._lock:
+                for project_id, days in rows:
+                    tiers[project_id] = retention_tier(days)
+                    self._entries[project_id] = (tiers[project_id], expires_at)
+        return tiers
+
+    def invalidate(self, project_id):
+        with self._lock:
+            self._entries.pop(project_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+retention_cache = RetentionCache()
+
+
+def assign_retention_days(error_logs):
+    """
+    Sets retention_days on unsaved ErrorLogs to the retention tier of their project.
+    """
+    tiers = retention_cache.get_many({error_log.project_id for error_log in error_logs})
+    for error_log in error_logs:
+        error_log.retention_days = tiers.get(error_log.project_id, error_log.retention_days)
+
+
+def enforce_retention(now=None, batch_size=10000):
+    """
+    Removes the ErrorLogs older than their retention and returns (names of the dropped partitions,
+    number of deleted rows).
+
+    On a partitioned table, the partitions whose whole range has expired are detached and
+    dropped, and only the rows that landed in the default partitions are deleted. Otherwise the
+    expired rows are deleted in batches of batch_size, project by project, following the
+    (project, created_at) index.
+    """
+    now = now or timezone.now()
+    if partitions.is_partitioned():
+        dropped = partitions.drop_expired_partitions(now)
+        deleted = partitions.delete_expired_default_rows(now, batch_size)
+        return dropped, deleted
+
+    deleted = 0
+    for tier in settings.ERROR_TRACKER_RETENTION_TIERS:
+        cutoff = now - timedelta(days=tier)
+        for project_id in list(Project.objects.values_list('id', flat=True)):
+            expired = ErrorLog.objects.filter(project_id=project_id, retention_days=tier, created_at__lt=cutoff)
+            while True:
+                ids = list(expired.order_by('created_at', 'id').values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                # Nothing references ErrorLogs, so the collector issues a single DELETE
+                deleted += ErrorLog.objects.filter(id__in=ids).delete()[0]
+    return [], deleted
+
+
+def delete_expired_rollups(now=None, batch_size=10000):
+    """
+    Deletes, batch_size at a time and project by project, the minute and hour ErrorRollups
+    older than ERROR_TRACKER_MINUTE_ROLLUP_RETENTION_DAYS and ERROR_TRACKER_HOUR_ROLLUP_RETENTION_DAYS,
+    and returns their number.
+
+    The buckets of the longest group window read at a resolution are always kept, and day
+    ErrorRollups, one row per group, environment and day, are kept with their project.
+    """
+    now = now or timezone.now()
+    retentions = {
+        ErrorRollup.MINUTE: timedelta(days=settings.ERROR_TRACKER_MINUTE_ROLLUP_RETENTION_DAYS),
+        ErrorRollup.HOUR: timedelta(days=settings.ERROR_TRACKER_HOUR_ROLLUP_RETENTION_DAYS),
+    }
+    deleted = 0
+    for resolution, retention in retentions.items():
+        windows = [length for length, window_resolution in WINDOWS.values() if window_resolution == resolution]
+        cutoff = truncate(now - max([retention, *windows]), resolution)
+        for project_id in list(Project.objects.values_list('id', flat=True)):
+            expired = ErrorRollup.objects.filter(project_id=project_id, resolution=resolution, bucket__lt=cutoff)
+            while True:
+                ids = list(expired.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted += ErrorRollup.objects.filter(id__in=ids).delete()[0]
+    return deleted
+
+
+def delete_unreferenced_message_blobs(now=None, batch_size=10000):
+    """
+    Deletes, batch_size at a time, the ErrorMessageBlobs no ErrorLog or ErrorGroup refers to
+    anymore, e.g. once their ErrorLogs expired or their project was deleted, and returns their number.
+
+    Blobs created or reused in the last BLOB_GRACE_PERIOD are kept, as ingestion upserts a blob
+    before the ErrorLogs referring to it. The blobs of a batch are locked while they are checked
+    again and deleted, so an upsert either refreshed a blob before, and it is kept, or waits
+    and inserts it again. A batch in which ErrorLogs referred to a blob meanwhile fails its
+    foreign key check and is left for the next run.
+    """
+    now = now or timezone.now()
+    unreferenced = ErrorMessageBlob.objects.filter(
+        ~Exists(ErrorLog.objects.filter(message_blob=OuterRef('pk'))),
+        ~Exists(ErrorGroup.objects.filter(sample_message_blob=OuterRef('pk'))),
+        created_at__lt=now - BLOB_GRACE_PERIOD,
+    )
+    deleted = 0
+    last_hash = ''
+    while True:
+        hashes = list(unreferenced.filter(hash__gt=last_hash).order_by('hash')
+                      .values_list('hash', flat=True)[:batch_size])
+        if not hashes:
+            break
+        last_hash = hashes[-1]
+        try:
+            with transaction.atomic():
+                # Checked again, the blobs reused and the ErrorLogs stored since the SELECT included
+                locked = list(unreferenced.filter(hash__in=hashes).select_for_update()
+                              .values_list('hash', flat=True))
+                deleted += ErrorMessageBlob.objects.filter(hash__in=locked).delete()[0]
+        except (IntegrityError, ProtectedError):
+            pass
+    return deleted
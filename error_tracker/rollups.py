@@ -0,0 +1,101 @@
+from datetime import timedelta
+from django.db import connection
+from .counters import CoalescedCounters
+from .models import ErrorRollup
+
+BUCKET_SIZES = {
+    ErrorRollup.MINUTE: timedelta(minutes=1),
+    ErrorRollup.HOUR: timedelta(hours=1),
+    ErrorRollup.DAY: timedelta(days=1),
+}
+
+
+def truncate(value, resolution):
+    """
+    Returns the start of the bucket of the given resolution containing the datetime value.
+    """
+    value = value.replace(second=0, microsecond=0)
+    if resolution in (ErrorRollup.HOUR, ErrorRollup.DAY):
+        value = value.replace(minute=0)
+    if resolution == ErrorRollup.DAY:
+        value = value.replace(hour=0)
+    return value
+
+
+class RollupCounters(CoalescedCounters):
+    """
+    Coalesces the ErrorRollup increments of stored ErrorLogs.
+
+    Every ErrorLog counts in the minute, hour and day bucket of its group and environment, of
+    its group over all environments, of its environment over all groups and of its project.
+    The increments are written with a single INSERT ... ON CONFLICT DO UPDATE adding them to
+    the existing rows.
+    """
+
+    def aggregate(self, error_logs):
+        for error_log in error_logs:
+            environment = error_log.environment or ''
+            group_id = error_log.error_group_id or ErrorRollup.ALL_GROUPS
+            dimensions = {
+                (group_id, environment),
+                (group_id, ErrorRollup.ALL_ENVIRONMENTS),
+                (ErrorRollup.ALL_GROUPS, environment),
+                (ErrorRollup.ALL_GROUPS, ErrorRollup.ALL_ENVIRONMENTS),
+            }
+            for resolution in BUCKET_SIZES:
+                bucket = truncate(error_log.created_at, resolution)
+                for dimension_group, dimension_environment in dimensions:
+                    key = (error_log.project_id, dimension_group, dimension_environment, resolution, bucket)
+                    self._pending[key] = self._pending.get(key, 0) + 1
+
+    def write(self, pending):
+        quote = connection.ops.quote_name
+        table = quote(ErrorRollup._meta.db_table)
+        columns = ['project_id', 'group_id', 'environment', 'resolution', 'bucket', 'count']
+        # Sorted so that concurrent flushes lock the rows in the same order
+        rows = sorted(pending.items())
+        bucket_field = ErrorRollup._meta.get_field('bucket')
+
+        params = []
+        for (project_id, group_id, environment, resolution, bucket), count in rows:
+            params.extend([project_id, group_id, environment, resolution,
+                           bucket_field.get_db_prep_value(bucket, connection), count])
+
+        placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))
+        sql = (
+            f"INSERT INTO {table} ({', '.join(quote(column) for column in columns)}) VALUES {placeholders} "
+            f"ON CONFLICT ({', '.join(quote(column) for column in columns[:-1])}) "
+            f"DO UPDATE SET {quote('count')} = {table}.{quote('count')} + EXCLUDED.{quote('count')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+rollup_counters = RollupCounters()
+
+
+def get_histogram(project_id, resolution, start, end, group_id=ErrorRollup.ALL_GROUPS,
+                  environment=ErrorRollup.ALL_ENVIRONMENTS):
+    """
+    Returns [(bucket, count), ...] for every bucket of resolution from the one containing start up
+    to end (exclusive), with 0 for the buckets without ErrorLogs.
+    """
+    step = BUCKET_SIZES[resolution]
+    first = truncate(start, resolution)
+    counts = dict(
+        ErrorRollup.objects.filter(
+            project_id=project_id,
+            group_id=group_id,
+            environment=environment,
+            resolution=resolution,
+            bucket__gte=first,
+            bucket__lt=end,
+        ).values_list('bucket', 'count')
+    )
+
+    histogram = []
+    bucket = first
+    while bucket < end:
+        histogram.append((bucket, counts.get(bucket, 0)))
+        bucket += step
+    return histogram
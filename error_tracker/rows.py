@@ -0,0 +1,79 @@
+"""
+Read path rendering ErrorLogs straight from values_list() rows, without model instances or serializers.
+
+render_error_log_rows() produces the same values as ErrorLogSerializer and dumps_json() the same
+bytes as DRF's JSONRenderer with the default settings, so the list endpoint and the exports can
+skip the per-field serializer machinery. orjson is used when it is installed.
+"""
+
+import json
+from rest_framework.fields import DateTimeField
+from rest_framework.response import Response
+from .models import ErrorMessageBlob
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Columns of ErrorLogSerializer, in the same order
+FIELDS = ['id', 'error_message', 'environment', 'created_at', 'project', 'error_group']
+
+# values_list() columns render_error_log_rows() reads, in this order
+COLUMNS = [
+    'id', 'error_message', 'message_blob_id', 'message_blob__data', 'message_blob__compressed',
+    'environment', 'created_at', 'project__uuid', 'error_group_id',
+]
+
+# Number of decoded message blobs kept while rendering; messages repeat a lot within a project
+DECODED_MESSAGES_CACHE_SIZE = 1000
+
+_datetime_field = DateTimeField()
+
+
+def render_error_log_rows(rows):
+    """
+    Yields a list of FIELDS values for every row of COLUMNS values, rendered like ErrorLogSerializer.
+
+    Rows may carry extra trailing columns, e.g. the cursor field of a page, which are ignored.
+    """
+    messages = {}
+    for row in rows:
+        log_id, error_message, blob_hash, data, compressed, environment, created_at, project_uuid, group_id = row[:9]
+        if blob_hash is not None:
+            error_message = messages.get(blob_hash)
+            if error_message is None:
+                if len(messages) >= DECODED_MESSAGES_CACHE_SIZE:
+                    messages.clear()
+                error_message = messages[blob_hash] = ErrorMessageBlob.decode(data, compressed)
+        yield [log_id, error_message, environment, _datetime_field.to_representation(created_at),
+               str(project_uuid), group_id]
+
+
+def dumps_json(data):
+    """
+    Returns data as JSON bytes, identical to what rest_framework.renderers.JSONRenderer renders
+    with UNICODE_JSON, COMPACT_JSON and STRICT_JSON left to their defaults.
+    """
+    if orjson is not None:
+        content = orjson.dumps(data)
+    else:
+        content = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+    # Like JSONRenderer, escape the line separators that are valid JSON but not valid JavaScript
+    return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class PreRenderedResponse(Response):
+    """
+    Response whose JSON content was already rendered by dumps_json(); data is kept for callers
+    inspecting it, but is not rendered again.
+    """
+
+    def __init__(self, data, content, **kwargs):
+        super().__init__(data, **kwargs)
+        self.prerendered_content = content
+
+    @property
+    def rendered_content(self):
+        self['Content-Type'] = self.accepted_renderer.media_type
+        return self.prerendered_content
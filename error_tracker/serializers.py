@@ -1,19 +1,122 @@
 from rest_framework import serializers
-from .models import ErrorLog, Project
+from .models import ErrorGroup, ErrorLog, ErrorRollup, Project
+
+
+class ProjectUUIDField(serializers.UUIDField):
+    """
+    Accepts a project UUID as input and renders the UUID of the related project.
+    """
+
+    def get_attribute(self, instance):
+        return instance.project.uuid
+
+
+class ErrorMessageField(serializers.CharField):
+    """
+    Renders the message of an ErrorLog whether it is stored inline or in an ErrorMessageBlob.
+    """
+
+    def get_attribute(self, instance):
+        return instance.get_error_message()
+
+
+class SampleMessageField(serializers.CharField):
+    """
+    Renders the sample message of an ErrorGroup, null while it has none.
+    """
+
+    def get_attribute(self, instance):
+        blob = instance.sample_message_blob
+        return blob.text if blob is not None else None
+
+
+def get_project(value, context):
+    """
+    Converts a project UUID to a Project instance.
+
+    When HasAPIKeyPermission already resolved the project, its id is passed in the serializer
+    context and an unsaved Project carrying only the id and UUID is returned without a query.
+    """
+    project_id = context.get('project_id')
+    if project_id is not None:
+        return Project(id=project_id, uuid=value)
+    try:
+        return Project.objects.get(uuid=value)
+    except Project.DoesNotExist:
+        raise serializers.ValidationError("Project with this UUID does not exist.")
+
+
+def validate_environment(value):
+    """
+    Rejects the environment name the ErrorRollups reserve for their totals over all environments.
+    """
+    if value == ErrorRollup.ALL_ENVIRONMENTS:
+        raise serializers.ValidationError(f'"{value}" is reserved and cannot name an environment.')
+    return value
 
 
 class ErrorLogSerializer(serializers.ModelSerializer):
-    project = serializers.UUIDField(format='hex_verbose', required=True)  # Accept UUID as input
+    error_message = ErrorMessageField()
+    project = ProjectUUIDField(format='hex_verbose', required=True)  # Accept UUID as input
 
     class Meta:
         model = ErrorLog
-        fields = ['id', 'error_message', 'environment', 'created_at', 'project']
+        fields = ['id', 'error_message', 'environment', 'created_at', 'project', 'error_group']
+        read_only_fields = ['error_group']
 
     def validate_project(self, value):
         """
         This method will convert the UUID string to a Project instance.
         """
-        try:
-            return Project.objects.get(uuid=value)
-        except Project.DoesNotExist:
-            raise serializers.ValidationError("Project with this UUID does not exist.")
+        return get_project(value, self.context)
+
+    def validate_environment(self, value):
+        return validate_environment(value)
+
+
+class ErrorLogBatchItemSerializer(serializers.ModelSerializer):
+    """
+    Validates a single event of a batch. The project is shared by the whole batch.
+    """
+
+    class Meta:
+        model = ErrorLog
+        fields = ['error_message', 'environment']
+
+    def validate_environment(self, value):
+        return validate_environment(value)
+
+
+class ErrorLogBatchSerializer(serializers.Serializer):
+    """
+    Envelope of a batch upload: one project UUID and a list of error events. Events are validated
+    one by one with ErrorLogBatchItemSerializer, so an event that is not an object only rejects itself.
+    """
+    project = serializers.UUIDField(format='hex_verbose', required=True)
+    events = serializers.ListField(child=serializers.JSONField(), allow_empty=False)
+
+    def validate_project(self, value):
+        return get_project(value, self.context)
+
+    def validate_events(self, value):
+        max_size = self.context.get('max_batch_size')
+        if max_size and len(value) > max_size:
+            raise serializers.ValidationError(f"A batch cannot contain more than {max_size} errors.")
+        return value
+
+
+class ErrorGroupSerializer(serializers.ModelSerializer):
+    """
+    Read-only representation of an ErrorGroup with the attributes set by error_tracker.groups:
+    window_count, its occurrences in the requested window, and environments, their breakdown.
+    """
+    project = serializers.UUIDField(source='project.uuid', format='hex_verbose', read_only=True, allow_null=True)
+    sample_message = SampleMessageField(read_only=True, allow_null=True)
+    window_count = serializers.IntegerField(read_only=True)
+    environments = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = ErrorGroup
+        fields = ['id', 'project', 'error_type', 'fingerprint', 'count', 'window_count', 'first_seen', 'last_seen',
+                  'sample_message', 'environments', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from project_integrations.models import Project
+from .grouping import group_id_cache
+from .models import ErrorGroup
+from .retention import retention_cache
+
+
+@receiver(post_delete, sender=ErrorGroup)
+def invalidate_group_id_cache(sender, instance, **kwargs):
+    group_id_cache.invalidate((instance.project_id, instance.fingerprint))
+
+
+@receiver(post_save, sender=Project)
+def invalidate_retention_cache(sender, instance, created, **kwargs):
+    # Other processes pick up the new retention once ERROR_TRACKER_RETENTION_CACHE_TTL expires
+    if not created:
+        retention_cache.invalidate(instance.id)
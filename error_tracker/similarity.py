@@ -0,0 +1,212 @@
+"""
+Near-duplicate errors by MinHash signatures of their normalized messages, indexed with banded
+locality-sensitive hashing.
+
+The shingles of a message are its runs of SHINGLE_SIZE consecutive tokens after
+normalize_error_message(). Its signature holds, for each of NUM_PERMUTATIONS universal hash
+functions, the minimum hash of its shingles; the fraction of equal values of two signatures
+estimates the Jaccard similarity of their shingles. Signatures are stored once per fingerprint
+and cut into BANDS bands of ROWS values whose hashes are indexed (ErrorSignatureBand), so the
+candidates of a message are the fingerprints sharing a band hash with it: one index lookup per
+band, whatever the number of signatures. A pair of similarity s is a candidate with probability
+1 - (1 - s ** ROWS) ** BANDS, 0.23 at s = 0.3, 0.87 at s = 0.5 and 0.99 at s = 0.6. Candidates
+are then ranked by the similarity estimated from their signatures.
+
+Only the first and last ERROR_TRACKER_SIMILARITY_MAX_CHARS / 2 characters of a message are
+shingled, which bounds the cost of indexing a huge traceback at ingestion. Signatures are
+computed and compared with NumPy when it is installed, and in pure Python otherwise; both give
+the same values.
+"""
+
+import hashlib
+import random
+import re
+import struct
+import zlib
+from functools import reduce
+from operator import or_
+from django.conf import settings
+from django.db.models import Count, Q
+from .grouping import GroupIdCache, compute_fingerprint, normalize_error_message
+from .models import ErrorSignature, ErrorSignatureBand
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+
+# Universal hashes (a * x + b) mod _PRIME of the 32-bit CRC of a shingle; with a and b below
+# 2 ** 31 the products fit in 64 bits. Changing any of these values invalidates the stored signatures.
+_PRIME = 4294967291
+_random = random.Random(20241017)
+_COEFFICIENTS = [(_random.randrange(1, 2 ** 31), _random.randrange(0, 2 ** 31)) for _ in range(NUM_PERMUTATIONS)]
+_SIGNATURE_FORMAT = f'<{NUM_PERMUTATIONS}I'
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+# Shingles hashed per NumPy operation, bounding its memory to a few MB
+_CHUNK_SIZE = 2048
+
+if numpy is not None:
+    _A = numpy.array([a for a, _ in _COEFFICIENTS], dtype=numpy.uint64)
+    _B = numpy.array([b for _, b in _COEFFICIENTS], dtype=numpy.uint64)
+
+# Ids of the ErrorGroups whose fingerprint is known to be indexed
+indexed_groups = GroupIdCache()
+
+
+def shingle_hashes(error_message):
+    """
+    Returns the set of the 32-bit hashes of the shingles of the normalized error message, cut
+    to its start and end when longer than ERROR_TRACKER_SIMILARITY_MAX_CHARS.
+    """
+    half = settings.ERROR_TRACKER_SIMILARITY_MAX_CHARS // 2
+    if len(error_message) > 2 * half:
+        error_message = error_message[:half] + '\n' + error_message[-half:]
+    tokens = _TOKEN.findall(normalize_error_message(error_message))
+    count = max(len(tokens) - SHINGLE_SIZE + 1, 1) if tokens else 0
+    return {zlib.crc32(' '.join(tokens[index:index + SHINGLE_SIZE]).encode()) for index in range(count)}
+
+
+def compute_signature(error_message):
+    """
+    Returns the MinHash signature of an error message as bytes, or None for a message without tokens.
+    """
+    hashes = shingle_hashes(error_message)
+    if not hashes:
+        return None
+    if numpy is not None:
+        values = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        minimums = numpy.full(NUM_PERMUTATIONS, _PRIME, dtype=numpy.uint64)
+        for start in range(0, len(values), _CHUNK_SIZE):
+            chunk = values[start:start + _CHUNK_SIZE, None]
+            numpy.minimum(minimums, ((chunk * _A + _B) % _PRIME).min(axis=0), out=minimums)
+        return minimums.astype('<u4').tobytes()
+    return struct.pack(_SIGNATURE_FORMAT, *(min((a * x + b) % _PRIME for x in hashes) for a, b in _COEFFICIENTS))
+
+
+def band_hashes(signature):
+    """
+    Returns the signed 64-bit hash of every band of a signature.
+    """
+    size = ROWS * 4
+    return [
+        int.from_bytes(hashlib.blake2b(signature[band * size:(band + 1) * size], digest_size=8).digest(),
+                       'little', signed=True)
+        for band in range(BANDS)
+    ]
+
+
+def estimate_similarities(signature, others):
+    """
+    Returns the estimated Jaccard similarity of signature with each of the others.
+    """
+    if not others:
+        return []
+    if numpy is not None:
+        matrix = numpy.frombuffer(b''.join(others), dtype='<u4').reshape(len(others), NUM_PERMUTATIONS)
+        return (matrix == numpy.frombuffer(signature, dtype='<u4')).mean(axis=1).tolist()
+    values = struct.unpack(_SIGNATURE_FORMAT, signature)
+    return [sum(a == b for a, b in zip(values, struct.unpack(_SIGNATURE_FORMAT, other))) / NUM_PERMUTATIONS
+            for other in others]
+
+
+def index_signatures(messages):
+    """
+    Stores the signature and band hashes of every fingerprint of messages, a dict mapping
+    fingerprints to one of their messages, that is not stored yet, and returns the signatures
+    computed by fingerprint.
+    """
+    existing = set(ErrorSignature.objects.filter(fingerprint__in=messages).values_list('fingerprint', flat=True))
+    signatures = {}
+    for fingerprint, error_message in messages.items():
+        if fingerprint not in existing:
+            signature = compute_signature(error_message)
+            if signature is not None:
+                signatures[fingerprint] = signature
+    if not signatures:
+        return signatures
+
+    # Concurrent workers may index the same fingerprint; the first one wins
+    ErrorSignature.objects.bulk_create(
+        [ErrorSignature(fingerprint=fingerprint, minhash=signature) for fingerprint, signature in signatures.items()],
+        ignore_conflicts=True,
+    )
+    ErrorSignatureBand.objects.bulk_create(
+        [
+            ErrorSignatureBand(signature_id=fingerprint, band=band, hash=value)
+            for fingerprint, signature in signatures.items()
+            for band, value in enumerate(band_hashes(signature))
+        ],
+        ignore_conflicts=True,
+    )
+    return signatures
+
+
+def index_error_logs(error_logs):
+    """
+    Indexes the fingerprints of the groups of grouped ErrorLogs that this process has not indexed
+    yet, so only the first occurrences of a group after a restart cost any query.
+    """
+    pending = {}
+    for error_log in error_logs:
+        if error_log.error_group_id is not None and indexed_groups.get(error_log.error_group_id) is None:
+            pending.setdefault(error_log.error_group_id, error_log.error_message)
+    if not pending:
+        return
+    index_signatures({compute_fingerprint(error_message): error_message for error_message in pending.values()})
+    for group_id in pending:
+        indexed_groups.set(group_id, True)
+
+
+def get_signature(fingerprint, error_message):
+    """
+    Returns the stored signature of a fingerprint, indexing it from error_message if missing,
+    e.g. for fingerprints last seen before signatures were indexed.
+    """
+    signature = ErrorSignature.objects.filter(fingerprint=fingerprint).values_list('minhash', flat=True).first()
+    if signature is None:
+        signature = index_signatures({fingerprint: error_message}).get(fingerprint) or compute_signature(error_message)
+    return bytes(signature) if signature is not None else None
+
+
+def similar_fingerprints(fingerprint, error_message, fingerprints=None, limit=None):
+    """
+    Returns up to limit (similarity, fingerprint) tuples of the fingerprints most similar to the
+    given one, most similar first, among the fingerprints queryset or all of them.
+
+    Only the ERROR_TRACKER_SIMILARITY_MAX_CANDIDATES candidates sharing the most band hashes are
+    compared, and those below ERROR_TRACKER_SIMILARITY_THRESHOLD are left out.
+    """
+    limit = limit or settings.ERROR_TRACKER_SIMILAR_LIMIT
+    signature = get_signature(fingerprint, error_message)
+    if signature is None:
+        return []
+
+    bands = (
+        ErrorSignatureBand.objects
+        .filter(reduce(or_, (Q(band=band, hash=value) for band, value in enumerate(band_hashes(signature)))))
+        .exclude(signature_id=fingerprint)
+    )
+    if fingerprints is not None:
+        bands = bands.filter(signature_id__in=fingerprints)
+    candidates = list(
+        bands.values('signature_id')
+        .annotate(matches=Count('id'))
+        .order_by('-matches', 'signature_id')
+        .values_list('signature_id', flat=True)[:settings.ERROR_TRACKER_SIMILARITY_MAX_CANDIDATES]
+    )
+    others = dict(ErrorSignature.objects.filter(fingerprint__in=candidates).values_list('fingerprint', 'minhash'))
+    candidates = [candidate for candidate in candidates if candidate in others]
+
+    similarities = estimate_similarities(signature, [bytes(others[candidate]) for candidate in candidates])
+    similar = [
+        (similarity, candidate) for similarity, candidate in zip(similarities, candidates)
+        if similarity >= settings.ERROR_TRACKER_SIMILARITY_THRESHOLD
+    ]
+    similar.sort(key=lambda item: (-item[0], item[1]))
+    return similar[:limit]
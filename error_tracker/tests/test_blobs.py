@@ -0,0 +1,65 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from project_integrations.models import Project
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog, ErrorMessageBlob
+from error_tracker.serializers import ErrorLogSerializer
+
+LONG_TRACEBACK = 'Traceback (most recent call last):\n' + '  File "/app/loop.py", line 3, in loop\n' * 200 + \
+                 'RecursionError: maximum recursion depth exceeded\n'
+
+
+@override_settings(ERROR_TRACKER_MESSAGE_COMPRESSION_MIN_SIZE=512)
+class ErrorMessageBlobTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+
+    def test_identical_messages_share_one_blob(self):
+        """
+        Test that identical messages are stored once and long ones are compressed.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message=LONG_TRACEBACK) for _ in range(3)])
+        store_error_logs([ErrorLog(project=self.project, error_message=LONG_TRACEBACK)])
+
+        blob = ErrorMessageBlob.objects.get()
+        self.assertTrue(blob.compressed)
+        self.assertLess(len(bytes(blob.data)), blob.size)
+        self.assertEqual(ErrorLog.objects.filter(message_blob=blob, error_message='').count(), 4)
+
+    def test_short_messages_are_not_compressed(self):
+        """
+        Test that messages under the threshold are stored as is.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'id'")])
+        blob = ErrorMessageBlob.objects.get()
+        self.assertFalse(blob.compressed)
+        self.assertEqual(bytes(blob.data), b"KeyError: 'id'")
+
+    def test_serializer_reads_message_from_blob(self):
+        """
+        Test that the serializer renders the decompressed message of a stored ErrorLog.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message=LONG_TRACEBACK)])
+        error_log = ErrorLog.objects.select_related('message_blob').get()
+        self.assertEqual(ErrorLogSerializer(error_log).data['error_message'], LONG_TRACEBACK)
+
+    def test_migrate_command_converts_inline_messages(self):
+        """
+        Test that the conversion command moves inline messages to shared blobs.
+        """
+        for _ in range(3):
+            ErrorLog.objects.create(project=self.project, error_message=LONG_TRACEBACK)
+        ErrorLog.objects.create(project=self.project, error_message="ValueError: bad value")
+
+        call_command('migrate_error_messages_to_blobs', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(ErrorMessageBlob.objects.count(), 2)
+        self.assertFalse(ErrorLog.objects.filter(message_blob__isnull=True).exists())
+        messages = [error_log.get_error_message() for error_log in ErrorLog.objects.order_by('id')]
+        self.assertEqual(messages, [LONG_TRACEBACK] * 3 + ["ValueError: bad value"])
@@ -0,0 +1,141 @@
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from nomorebugs import db_routing
+from nomorebugs.db_routing import ReplicaRouter, replica_reads
+from project_integrations.models import Project
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog
+
+# Replicas that are separate databases in tests, i.e. not mirrors of the default one
+TEST_REPLICAS = [alias for alias in settings.DATABASE_REPLICAS
+                 if not settings.DATABASES[alias].get('TEST', {}).get('MIRROR')]
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def test_reads_use_default_database_by_default(self):
+        """
+        Test that reads outside replica_reads() and all writes go to the default database.
+        """
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(ErrorLog), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_write(ErrorLog), 'default')
+
+    def test_reads_use_replica_inside_replica_reads(self):
+        """
+        Test that reads inside replica_reads() go to a replica.
+        """
+        with mock.patch.object(db_routing.connections['default'], 'in_atomic_block', False), replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(ErrorLog), 'replica_1')
+
+    def test_reads_in_transaction_use_default_database(self):
+        """
+        Test that reads in a transaction of the default database stay on it.
+        """
+        with mock.patch.object(db_routing.connections['default'], 'in_atomic_block', True), replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(ErrorLog), 'default')
+
+
+# The only replica is the default database itself, so the routing decisions can be observed
+# without a second database
+@override_settings(DATABASE_REPLICAS=['default'])
+class ReplicaReadViewTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.addCleanup(db_routing._stickiness_cache().clear)
+
+    def get_list_on_replica(self):
+        """
+        Returns whether the reads of a list request were sent to a replica.
+        """
+        reads = []
+        original = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            reads.append(db_routing._replica_reads.get())
+            return original(router, model, **hints)
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', record):
+            response = self.client.get(reverse('error-log-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return any(reads)
+
+    def test_list_reads_from_replica(self):
+        """
+        Test that listing ErrorLogs reads from a replica.
+        """
+        self.assertTrue(self.get_list_on_replica())
+
+    def test_reads_stick_to_default_database_after_a_write(self):
+        """
+        Test that a user's reads stay on the default database right after they write.
+        """
+        response = self.client.post(reverse('project_list_create'), {'name': "New Project"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(self.get_list_on_replica())
+
+    def test_failed_write_does_not_stick(self):
+        """
+        Test that a rejected write does not keep the user on the default database.
+        """
+        response = self.client.post(reverse('project_list_create'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(self.get_list_on_replica())
+
+    def test_reads_are_not_left_on_replica(self):
+        """
+        Test that replica reads end with the request.
+        """
+        self.get_list_on_replica()
+        self.assertFalse(db_routing._replica_reads.get())
+
+
+@skipUnless(TEST_REPLICAS, "Requires a replica that is not a test mirror (DB_REPLICA_TEST_MIRROR=False)")
+class TwoDatabaseRoutingTests(TransactionTestCase):
+    databases = {'default', *TEST_REPLICAS}
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.addCleanup(db_routing._stickiness_cache().clear)
+        with transaction.atomic():
+            store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+
+    def test_list_reads_replica_until_the_user_writes(self):
+        """
+        Test that the list is read from the replica, where nothing was replicated, and from the
+        default database after the user's own write.
+        """
+        # Replicate the user and the project only, without going through the signals
+        for alias in TEST_REPLICAS:
+            User.objects.using(alias).bulk_create([User(id=self.user.id, username='testuser')])
+            Project.objects.using(alias).bulk_create([Project(id=self.project.id, uuid=self.project.uuid,
+                                                              name="Test Project", user_id=self.user.id)])
+
+        response = self.client.get(reverse('error-log-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+        self.client.post(reverse('project_list_create'), {'name': "New Project"}, format='json')
+        response = self.client.get(reverse('error-log-list-create'))
+        self.assertEqual(len(response.data['results']), 1)
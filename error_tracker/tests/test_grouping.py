@@ -0,0 +1,207 @@
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from project_integrations.models import Project
+from error_tracker.counters import CoalescedCounters, GroupCounters, group_counters
+from error_tracker.grouping import (assign_error_groups, compute_fingerprint, extract_error_type,
+                                    group_id_cache, normalize_error_message)
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog, ErrorGroup
+from error_tracker.rollups import rollup_counters
+
+TRACEBACK = (
+    'Traceback (most recent call last):\n'
+    '  File "/app/payments/views.py", line {line}, in charge\n'
+    '    customer = Customer.objects.get(id={customer_id})\n'
+    'payments.models.DoesNotExist: Customer {customer_id} at 0x{address} ({uuid}) does not exist\n'
+)
+
+
+def make_traceback(line=42, customer_id=7, address='7f3a2c', uuid='0b6f3a0e-8a1c-4c1e-9d5e-3f2a1b0c9d8e'):
+    return TRACEBACK.format(line=line, customer_id=customer_id, address=address, uuid=uuid)
+
+
+class FingerprintTests(TestCase):
+
+    def test_normalize_removes_volatile_parts(self):
+        """
+        Test that line numbers, numbers, memory addresses and UUIDs are removed.
+        """
+        normalized = normalize_error_message(make_traceback())
+        self.assertIn('line <n>', normalized)
+        self.assertIn('Customer <n> at <address> (<uuid>)', normalized)
+
+    def test_same_error_has_same_fingerprint(self):
+        """
+        Test that occurrences differing only in volatile parts share a fingerprint.
+        """
+        self.assertEqual(
+            compute_fingerprint(make_traceback()),
+            compute_fingerprint(make_traceback(line=43, customer_id=99, address='1b2c3d',
+                                               uuid='11111111-2222-3333-4444-555555555555')),
+        )
+
+    def test_different_errors_have_different_fingerprints(self):
+        """
+        Test that different exceptions are not grouped together.
+        """
+        self.assertNotEqual(
+            compute_fingerprint(make_traceback()),
+            compute_fingerprint(make_traceback().replace('charge', 'refund')),
+        )
+
+    def test_extract_error_type(self):
+        """
+        Test that the last raised exception type is extracted from the message.
+        """
+        self.assertEqual(extract_error_type("ValueError: bad value"), "ValueError")
+        self.assertEqual(extract_error_type("something went wrong"), "UnknownError")
+
+
+class AssignErrorGroupsTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+
+    def test_assigns_same_group_to_repeated_errors(self):
+        """
+        Test that repeated errors share one ErrorGroup and distinct errors get their own.
+        """
+        error_logs = [
+            ErrorLog(project=self.project, error_message=make_traceback(customer_id=1)),
+            ErrorLog(project=self.project, error_message=make_traceback(customer_id=2)),
+            ErrorLog(project=self.project, error_message="KeyError: 'total'"),
+        ]
+        assign_error_groups(error_logs)
+
+        self.assertEqual(ErrorGroup.objects.count(), 2)
+        self.assertEqual(error_logs[0].error_group_id, error_logs[1].error_group_id)
+        self.assertNotEqual(error_logs[0].error_group_id, error_logs[2].error_group_id)
+        self.assertEqual(ErrorGroup.objects.get(id=error_logs[2].error_group_id).error_type, "KeyError")
+
+    def test_known_fingerprint_does_not_query_groups(self):
+        """
+        Test that a fingerprint seen before is resolved from the in-memory cache.
+        """
+        assign_error_groups([ErrorLog(project=self.project, error_message=make_traceback())])
+
+        error_log = ErrorLog(project=self.project, error_message=make_traceback(line=50))
+        with self.assertNumQueries(0):
+            assign_error_groups([error_log])
+        self.assertIsNotNone(error_log.error_group_id)
+
+    def test_existing_group_is_reused_after_cache_miss(self):
+        """
+        Test that a group created by another worker is found instead of duplicated.
+        """
+        assign_error_groups([ErrorLog(project=self.project, error_message=make_traceback())])
+        group_id_cache.clear()
+
+        error_log = ErrorLog(project=self.project, error_message=make_traceback())
+        assign_error_groups([error_log])
+        self.assertEqual(ErrorGroup.objects.count(), 1)
+        self.assertEqual(error_log.error_group_id, ErrorGroup.objects.get().id)
+
+    def test_groups_are_scoped_to_projects(self):
+        """
+        Test that the same error in two projects creates two groups.
+        """
+        other_project = Project.objects.create(name="Other Project", user=self.user)
+        error_logs = [
+            ErrorLog(project=self.project, error_message=make_traceback()),
+            ErrorLog(project=other_project, error_message=make_traceback()),
+        ]
+        assign_error_groups(error_logs)
+        self.assertNotEqual(error_logs[0].error_group_id, error_logs[1].error_group_id)
+
+
+class GroupCountersTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+
+    def test_store_error_logs_updates_counters(self):
+        """
+        Test that storing ErrorLogs increments the count and moves last_seen of their group.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message=make_traceback()) for _ in range(3)])
+        store_error_logs([ErrorLog(project=self.project, error_message=make_traceback(line=7))])
+
+        group = ErrorGroup.objects.get()
+        self.assertEqual(group.count, 4)
+        self.assertEqual(group.last_seen, ErrorLog.objects.order_by('-created_at').first().created_at)
+        self.assertLessEqual(group.first_seen, group.last_seen)
+
+    @override_settings(ERROR_TRACKER_COUNTER_FLUSH_INTERVAL=60)
+    def test_counters_are_coalesced_per_flush_window(self):
+        """
+        Test that increments accumulated during a window are written with one UPDATE per group.
+        """
+        counters = GroupCounters()
+        with mock.patch.object(GroupCounters, '_schedule_flush'):
+            assign_error_groups([ErrorLog(project=self.project, error_message=make_traceback())])
+            for _ in range(5):
+                error_log = ErrorLog(project=self.project, error_message=make_traceback())
+                assign_error_groups([error_log])
+                error_log.save()
+                counters.add([error_log])
+
+        self.assertEqual(ErrorGroup.objects.get().count, 0)
+        with self.assertNumQueries(1):
+            counters.flush()
+        self.assertEqual(ErrorGroup.objects.get().count, 5)
+
+    def test_recompute_command_repairs_counters(self):
+        """
+        Test that the repair command recomputes counters from the stored ErrorLogs.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message=make_traceback()) for _ in range(2)])
+        ErrorGroup.objects.update(count=100)
+        empty_group = ErrorGroup.objects.create(project=self.project, fingerprint='unused', count=3)
+
+        call_command('recompute_error_group_counters', chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(ErrorGroup.objects.exclude(id=empty_group.id).get().count, 2)
+        empty_group.refresh_from_db()
+        self.assertEqual(empty_group.count, 0)
+
+    @override_settings(ERROR_TRACKER_COUNTER_FLUSH_INTERVAL=60)
+    def test_recompute_command_drains_buffered_increments(self):
+        """
+        Test that the increments buffered by the process are written before the recount, not after.
+        """
+        self.addCleanup(rollup_counters.flush)
+        self.addCleanup(group_counters.flush)
+        with mock.patch.object(CoalescedCounters, '_schedule_flush'):
+            store_error_logs([ErrorLog(project=self.project, error_message=make_traceback()) for _ in range(2)])
+        self.assertEqual(ErrorGroup.objects.get().count, 0)
+
+        err = StringIO()
+        call_command('recompute_error_group_counters', stdout=StringIO(), stderr=err)
+        group_counters.flush()
+
+        self.assertEqual(ErrorGroup.objects.get().count, 2)
+        self.assertIn('counted twice', err.getvalue())
+
+    @override_settings(ERROR_TRACKER_SAMPLING_THRESHOLD=2, ERROR_TRACKER_SAMPLING_KEEP_EVERY=3)
+    def test_recompute_command_keeps_sampled_occurrences(self):
+        """
+        Test that the occurrences not stored by sampling are still counted after a repair.
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        store_error_logs([ErrorLog(project=self.project, error_message=make_traceback()) for _ in range(8)])
+        group = ErrorGroup.objects.get()
+        self.assertEqual((group.count, group.sampled_count), (8, 4))
+
+        call_command('recompute_error_group_counters', stdout=StringIO())
+
+        group.refresh_from_db()
+        self.assertEqual(group.count, 8)
@@ -0,0 +1,233 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import skipUnless
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from project_integrations.models import Project
+from error_tracker import partitions
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorGroup, ErrorLog, ErrorMessageBlob, ErrorRollup
+from error_tracker.retention import (delete_expired_rollups, delete_unreferenced_message_blobs, enforce_retention,
+                                     retention_cache, retention_tier)
+
+
+@override_settings(ERROR_TRACKER_RETENTION_TIERS=[7, 30, 90], ERROR_TRACKER_DEFAULT_RETENTION_DAYS=30)
+class RetentionTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        retention_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user, retention_days=5)
+        self.default_project = Project.objects.create(name="Default Project", user=self.user)
+
+    def test_retention_tier_rounds_up(self):
+        """
+        Test that a retention is rounded up to the next tier and never down.
+        """
+        self.assertEqual(retention_tier(5), 7)
+        self.assertEqual(retention_tier(30), 30)
+        self.assertEqual(retention_tier(None), 30)
+        with self.assertRaises(ValueError):
+            retention_tier(400)
+
+    def test_retention_longer_than_tiers_is_refused(self):
+        """
+        Test that a project cannot ask for a retention longer than the longest tier.
+        """
+        self.project.retention_days = 400
+        with self.assertRaises(ValidationError):
+            self.project.full_clean()
+        self.project.retention_days = 90
+        self.project.full_clean()
+
+    def test_ingestion_stores_retention_tier(self):
+        """
+        Test that ingested ErrorLogs carry the retention tier of their project.
+        """
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 'a'"),
+            ErrorLog(project=self.default_project, error_message="KeyError: 'a'"),
+        ])
+        self.assertEqual(ErrorLog.objects.get(project=self.project).retention_days, 7)
+        self.assertEqual(ErrorLog.objects.get(project=self.default_project).retention_days, 30)
+
+    def test_changing_retention_invalidates_cache(self):
+        """
+        Test that ErrorLogs stored after a project changes its retention use the new tier.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+        self.project.retention_days = 90
+        self.project.save()
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'b'")])
+        self.assertEqual(sorted(ErrorLog.objects.values_list('retention_days', flat=True)), [7, 90])
+
+    def test_enforce_retention_deletes_expired_error_logs(self):
+        """
+        Test that only the ErrorLogs older than their retention are deleted.
+        """
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 'a'"),
+            ErrorLog(project=self.default_project, error_message="KeyError: 'a'"),
+        ])
+        ErrorLog.objects.update(created_at=timezone.now() - timedelta(days=10))
+
+        dropped, deleted = enforce_retention()
+        self.assertEqual(dropped, [])
+        self.assertEqual(deleted, 1)
+        self.assertEqual(list(ErrorLog.objects.values_list('project_id', flat=True)), [self.default_project.id])
+
+    def test_enforce_retention_command(self):
+        """
+        Test that the management command reports the deleted ErrorLogs.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+        ErrorLog.objects.update(created_at=timezone.now() - timedelta(days=8))
+        out = StringIO()
+        call_command('enforce_error_log_retention', batch_size=1, stdout=out)
+        self.assertIn('deleted 1 error logs', out.getvalue())
+        self.assertFalse(ErrorLog.objects.exists())
+
+    @override_settings(ERROR_TRACKER_MINUTE_ROLLUP_RETENTION_DAYS=0, ERROR_TRACKER_HOUR_ROLLUP_RETENTION_DAYS=3)
+    def test_expired_rollups_are_deleted(self):
+        """
+        Test that minute and hour rollups are deleted past their retention or the longest window
+        read at their resolution, whichever is longer, and day rollups are kept.
+        """
+        now = timezone.now()
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'", created_at=created_at)
+                          for created_at in (now - timedelta(days=5), now - timedelta(hours=2), now)])
+        totals = ErrorRollup.objects.filter(group_id=ErrorRollup.ALL_GROUPS, environment=ErrorRollup.ALL_ENVIRONMENTS)
+        # Four rows per bucket: the group and the totals, per environment and over all of them.
+        # The hour buckets of the 7d window outlive their retention
+        self.assertEqual(delete_expired_rollups(now, batch_size=3), 2 * 4)
+        self.assertEqual(sorted(totals.exclude(resolution=ErrorRollup.DAY).values_list('resolution', flat=True)),
+                         ['hour', 'hour', 'hour', 'minute'])
+
+        self.assertEqual(delete_expired_rollups(now + timedelta(days=8)), 4 * 4)
+        self.assertEqual(set(totals.values_list('resolution', flat=True)), {ErrorRollup.DAY})
+
+
+    def test_unreferenced_message_blobs_are_deleted(self):
+        """
+        Test that the message blobs of expired ErrorLogs are deleted, except the group samples.
+        """
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 1"),
+            ErrorLog(project=self.project, error_message="KeyError: 2"),
+        ])
+        sample = ErrorGroup.objects.get().sample_message_blob_id
+        long_ago = timezone.now() - timedelta(days=10)
+        ErrorLog.objects.update(created_at=long_ago)
+        ErrorMessageBlob.objects.update(created_at=long_ago)
+
+        self.assertEqual(delete_unreferenced_message_blobs(batch_size=1), 0)
+        enforce_retention()
+        self.assertEqual(delete_unreferenced_message_blobs(batch_size=1), 1)
+        self.assertEqual(list(ErrorMessageBlob.objects.values_list('hash', flat=True)), [sample])
+
+        self.project.delete()
+        self.assertEqual(delete_unreferenced_message_blobs(), 1)
+        self.assertFalse(ErrorMessageBlob.objects.exists())
+
+    def test_reused_message_blobs_are_kept(self):
+        """
+        Test that an old blob reused by ingestion gets a new grace period.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+        ErrorMessageBlob.objects.update(created_at=timezone.now() - timedelta(days=10))
+
+        store_error_logs([ErrorLog(project=self.default_project, error_message="KeyError: 'a'")])
+        ErrorLog.objects.all().delete()
+        ErrorGroup.objects.update(sample_message_blob=None)
+        self.assertEqual(delete_unreferenced_message_blobs(), 0)
+        self.assertEqual(ErrorMessageBlob.objects.count(), 1)
+
+    def test_recent_message_blobs_are_kept(self):
+        """
+        Test that blobs ingestion may be about to refer to are not deleted.
+        """
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+        self.project.delete()
+        self.assertEqual(delete_unreferenced_message_blobs(), 0)
+        self.assertEqual(ErrorMessageBlob.objects.count(), 1)
+
+
+class PartitionNameTests(TestCase):
+
+    def test_daily_partition_bounds(self):
+        """
+        Test that a daily partition starts at midnight UTC and its name round-trips.
+        """
+        now = datetime(2026, 10, 17, 23, 30, tzinfo=dt_timezone(timedelta(hours=-2)))
+        start = partitions.partition_start(now, partitions.DAY)
+        self.assertEqual(start, datetime(2026, 10, 18, tzinfo=dt_timezone.utc))
+        name = partitions.partition_name(30, start, partitions.DAY)
+        self.assertEqual(name, 'error_tracker_errorlog_r30_p20261018')
+        self.assertEqual(partitions.parse_partition_name(name),
+                         (30, start, datetime(2026, 10, 19, tzinfo=dt_timezone.utc)))
+
+    def test_monthly_partition_bounds(self):
+        """
+        Test that a monthly partition covers a calendar month.
+        """
+        start = partitions.partition_start(datetime(2026, 12, 31, 12, tzinfo=dt_timezone.utc), partitions.MONTH)
+        name = partitions.partition_name(365, start, partitions.MONTH)
+        self.assertEqual(name, 'error_tracker_errorlog_r365_p202612')
+        self.assertEqual(partitions.parse_partition_name(name),
+                         (365, datetime(2026, 12, 1, tzinfo=dt_timezone.utc), datetime(2027, 1, 1, tzinfo=dt_timezone.utc)))
+
+    def test_other_tables_are_not_partitions(self):
+        """
+        Test that default partitions are not mistaken for range partitions.
+        """
+        self.assertIsNone(partitions.parse_partition_name('error_tracker_errorlog_r30_default'))
+
+
+@skipUnless(connection.vendor == 'postgresql', "Partitioning requires PostgreSQL")
+@override_settings(ERROR_TRACKER_RETENTION_TIERS=[7, 90], ERROR_TRACKER_DEFAULT_RETENTION_DAYS=90,
+                   ERROR_TRACKER_PARTITION_INTERVAL='day', ERROR_TRACKER_PARTITIONS_AHEAD=2)
+class PartitionedRetentionTests(TransactionTestCase):
+
+    def test_convert_and_drop_expired_partitions(self):
+        """
+        Test that converting keeps the unexpired ErrorLogs in range partitions and that expired
+        partitions are dropped whole.
+        """
+        group_id_cache.clear()
+        retention_cache.clear()
+        user = User.objects.create_user(username='testuser', password='password')
+        project = Project.objects.create(name="Test Project", user=user, retention_days=7)
+        _, old, expired = store_error_logs([ErrorLog(project=project, error_message=f"KeyError: '{key}'")
+                                            for key in ('a', 'old', 'expired')])
+        ErrorLog.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=3))
+        ErrorLog.objects.filter(id=expired.id).update(created_at=timezone.now() - timedelta(days=20))
+
+        call_command('create_error_log_partitions', convert=True, stdout=StringIO())
+        self.assertTrue(partitions.is_partitioned())
+        self.assertEqual(ErrorLog.objects.count(), 2)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {partitions.tier_table_name(7)}_default")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+        store_error_logs([ErrorLog(project=project, error_message="KeyError: 'b'")])
+        self.assertEqual(ErrorLog.objects.count(), 3)
+
+        dropped, _ = enforce_retention(now=timezone.now() + timedelta(days=10))
+        self.assertIn(partitions.partition_name(7, partitions.partition_start(timezone.now(), 'day'), 'day'), dropped)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+    def test_partitions_are_created_once(self):
+        """
+        Test that later runs of the command only create the partitions that are missing.
+        """
+        if not partitions.is_partitioned():
+            call_command('create_error_log_partitions', convert=True, stdout=StringIO())
+        call_command('create_error_log_partitions', stdout=StringIO())
+        self.assertEqual(partitions.create_partitions(timezone.now()), [])
+        self.assertIn(f'{partitions.tier_table_name(7)}_default', partitions.existing_tables())
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from project_integrations.models import Project
+from error_tracker.grouping import compute_fingerprint, group_id_cache
+from error_tracker.ingest import store_error_logs
+from error_tracker.models import ErrorLog, ErrorSignature, ErrorSignatureBand
+from error_tracker.similarity import (BANDS, compute_signature, estimate_similarities, index_error_logs,
+                                      indexed_groups, similar_fingerprints)
+
+TRACEBACK = (
+    'Traceback (most recent call last):\n'
+    '  File "/app/payments/views.py", line 42, in charge\n'
+    '    customer = Customer.objects.get(id=customer_id)\n'
+    '  File "/app/payments/models.py", line 12, in get\n'
+    '    return self.{method}(**filters)\n'
+    'payments.models.DoesNotExist: {model} matching query does not exist\n'
+)
+UNRELATED = 'ZeroDivisionError: division by zero in reports.totals.average_basket'
+
+
+class SignatureTests(TestCase):
+
+    def test_signature_estimates_similarity(self):
+        """
+        Test that near-duplicate messages have close signatures and unrelated ones do not.
+        """
+        signature = compute_signature(TRACEBACK.format(method='get_queryset', model='Customer'))
+        near = compute_signature(TRACEBACK.format(method='get_queryset', model='Invoice'))
+        unrelated = compute_signature(UNRELATED)
+        near_similarity, unrelated_similarity = estimate_similarities(signature, [near, unrelated])
+        self.assertGreater(near_similarity, 0.7)
+        self.assertLess(unrelated_similarity, 0.2)
+        self.assertEqual(estimate_similarities(signature, [signature]), [1.0])
+
+    def test_volatile_parts_do_not_change_signature(self):
+        """
+        Test that signatures are computed on the normalized message.
+        """
+        self.assertEqual(compute_signature('KeyError: 12 at 0x7f3a'), compute_signature('KeyError: 7 at 0x1b2c'))
+        self.assertIsNone(compute_signature('   '))
+
+    @override_settings(ERROR_TRACKER_SIMILARITY_MAX_CHARS=200)
+    def test_only_start_and_end_of_long_messages_are_shingled(self):
+        """
+        Test that the middle of a message longer than the limit does not change its signature.
+        """
+        start = TRACEBACK.format(method='get_queryset', model='Customer')
+        self.assertEqual(compute_signature(start + 'payload = ' + 'x ' * 5000 + UNRELATED),
+                         compute_signature(start + 'context = ' + 'x ' * 9000 + UNRELATED))
+
+
+class SimilarityIndexTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        indexed_groups.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.messages = [
+            TRACEBACK.format(method='get_queryset', model='Customer'),
+            TRACEBACK.format(method='get_queryset', model='Invoice'),
+            TRACEBACK.format(method='filter', model='Customer'),
+            UNRELATED,
+        ]
+        store_error_logs([ErrorLog(project=self.project, error_message=message) for message in self.messages])
+        self.fingerprints = [compute_fingerprint(message) for message in self.messages]
+
+    def test_groups_are_indexed_at_ingestion(self):
+        """
+        Test that the signature and band hashes of every new group are stored once.
+        """
+        self.assertEqual(ErrorSignature.objects.count(), 4)
+        self.assertEqual(ErrorSignatureBand.objects.count(), 4 * BANDS)
+
+        # Groups indexed by this process are not looked up again
+        error_logs = list(ErrorLog.objects.all())
+        with self.assertNumQueries(0):
+            index_error_logs(error_logs)
+
+    def test_similar_fingerprints_are_ranked(self):
+        """
+        Test that near-duplicates are found, most similar first, without the unrelated message.
+        """
+        similar = similar_fingerprints(self.fingerprints[0], self.messages[0])
+        self.assertEqual([fingerprint for _, fingerprint in similar], [self.fingerprints[1], self.fingerprints[2]])
+        self.assertGreaterEqual(similar[0][0], similar[1][0])
+
+    @override_settings(ERROR_TRACKER_SIMILARITY_THRESHOLD=0.0)
+    def test_candidates_can_be_restricted(self):
+        """
+        Test that only the given fingerprints are returned.
+        """
+        similar = similar_fingerprints(self.fingerprints[0], self.messages[0], fingerprints=self.fingerprints[2:])
+        self.assertEqual([fingerprint for _, fingerprint in similar], [self.fingerprints[2]])
+
+    def test_missing_signature_is_indexed_on_lookup(self):
+        """
+        Test that a fingerprint stored before signatures existed is indexed when it is looked up.
+        """
+        ErrorSignature.objects.filter(fingerprint=self.fingerprints[1]).delete()
+        similar = similar_fingerprints(self.fingerprints[1], self.messages[1])
+        self.assertIn(self.fingerprints[0], [fingerprint for _, fingerprint in similar])
+        self.assertTrue(ErrorSignature.objects.filter(fingerprint=self.fingerprints[1]).exists())
@@ -1,15 +1,36 @@
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+import zlib
+from datetime import timedelta
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from rest_framework.test import APITestCase, APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
 from project_integrations.models import Project, APIKey
+from error_tracker.grouping import group_id_cache
+from error_tracker.ingest import ErrorLogWriter, store_error_logs
 from error_tracker.models import ErrorLog, ErrorGroup
+from error_tracker.throttling import check_ingest_rate, consume_ingest_tokens
 
 
 class ErrorTrackerTests(APITestCase):
 
     def setUp(self):
+        group_id_cache.clear()
+
         # Create a user and project
         self.user = User.objects.create_user(username='testuser', password='password')
         self.project = Project.objects.create(name="Test Project", user=self.user)
@@ -42,6 +63,7 @@ class ErrorTrackerTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(ErrorLog.objects.count(), 1)
         self.assertEqual(ErrorLog.objects.first().project, self.project)
+        self.assertEqual(response.data['error_group'], ErrorLog.objects.first().error_group_id)
 
     def test_post_error_log_with_invalid_api_key(self):
         """
@@ -71,13 +93,15 @@ class ErrorTrackerTests(APITestCase):
 
         response = self.client.get(self.error_log_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_get_error_group_list_with_jwt(self):
         """
         Test that an authenticated user can list ErrorGroup entries using JWT.
         """
-        ErrorGroup.objects.create()  # Create an ErrorGroup instance
+        ErrorGroup.objects.create(project=self.project)
+        # Groups without a project belong to no user
+        ErrorGroup.objects.create(fingerprint='unscoped')
 
         response = self.client.get(self.error_group_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -99,3 +123,1040 @@ class ErrorTrackerTests(APITestCase):
         response = self.client.post(self.error_log_list_url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertEqual(ErrorLog.objects.count(), 0)
+
+
+class ErrorLogBatchTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_API_KEY=self.api_key.key)
+        self.batch_url = reverse('error-log-batch-create')
+
+    def test_post_batch_creates_all_valid_events(self):
+        """
+        Test that a batch of valid events is stored for the project in one request.
+        """
+        data = {
+            "project": self.project.uuid,
+            "events": [
+                {"error_message": "First error", "environment": "Production"},
+                {"error_message": "Second error", "environment": "Staging"},
+            ],
+        }
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(ErrorLog.objects.filter(project=self.project).count(), 2)
+        ids = [result['id'] for result in response.data['results']]
+        self.assertEqual(ids, list(ErrorLog.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_post_batch_reports_rejected_events(self):
+        """
+        Test that invalid events are rejected individually while valid ones are stored.
+        """
+        data = {
+            "project": self.project.uuid,
+            "events": [
+                {"error_message": "Valid error"},
+                {"environment": "Production"},
+            ],
+        }
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['rejected'], 1)
+        self.assertEqual(response.data['results'][1]['status'], 'rejected')
+        self.assertIn('error_message', response.data['results'][1]['errors'])
+        self.assertEqual(ErrorLog.objects.count(), 1)
+
+    def test_post_batch_rejects_events_that_are_not_objects(self):
+        """
+        Test that an event that is not a JSON object is rejected on its own.
+        """
+        data = {"project": self.project.uuid, "events": [{"error_message": "Valid error"}, "Not an event", 42]}
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['created', 'rejected', 'rejected'])
+        self.assertIn('non_field_errors', response.data['results'][1]['errors'])
+
+    def test_post_reserved_environment_is_rejected(self):
+        """
+        Test that the environment name the rollups reserve for all environments is rejected.
+        """
+        data = {"project": self.project.uuid, "events": [{"error_message": "Valid error", "environment": "*"}]}
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertIn('environment', response.data['results'][0]['errors'])
+
+        data = {"project": self.project.uuid, "error_message": "Valid error", "environment": "*"}
+        response = self.client.post(reverse('error-log-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('environment', response.data)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+    def test_post_body_that_is_not_an_object(self):
+        """
+        Test that a JSON body that is not an object is a bad request rather than a server error.
+        """
+        for url in (self.batch_url, reverse('error-log-list-create')):
+            response = self.client.post(url, [{"error_message": "Sample error"}], format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+    def test_post_batch_with_invalid_api_key(self):
+        """
+        Test that a batch is refused when the APIKey belongs to another project.
+        """
+        another_project = Project.objects.create(name="Other Project", user=self.user)
+        other_key = APIKey.objects.create(user=self.user, project=another_project)
+        self.client.credentials(HTTP_API_KEY=other_key.key)
+
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}]}
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+    def test_post_batch_reuses_resolved_api_key(self):
+        """
+        Test that once the APIKey and the ErrorGroup have been resolved, a batch only costs the
+        message blob and error log inserts, the group counter update and the rollup upsert.
+        """
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}]}
+        self.client.post(self.batch_url, data, format='json')
+
+        with self.assertNumQueries(4):
+            response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_post_batch_after_api_key_deleted(self):
+        """
+        Test that a deleted APIKey is no longer accepted even after it has been cached.
+        """
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}]}
+        self.client.post(self.batch_url, data, format='json')
+        self.api_key.delete()
+
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(ErrorLog.objects.count(), 1)
+
+
+@override_settings(ERROR_TRACKER_WRITE_BEHIND=True)
+class ErrorLogWriteBehindTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_API_KEY=self.api_key.key)
+
+        # Use a writer without background thread so the test controls when it flushes
+        self.writer = ErrorLogWriter()
+        patcher = mock.patch('error_tracker.views.error_log_writer', self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        start_patcher = mock.patch.object(ErrorLogWriter, 'start')
+        start_patcher.start()
+        self.addCleanup(start_patcher.stop)
+
+    def test_post_error_log_is_accepted_and_written_on_flush(self):
+        """
+        Test that an ErrorLog is acknowledged with 202 and stored when the writer flushes.
+        """
+        data = {"error_message": "Sample error", "environment": "Production", "project": self.project.uuid}
+        response = self.client.post(reverse('error-log-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+        self.assertEqual(self.writer.qsize(), 1)
+
+        self.writer.flush()
+        self.assertEqual(self.writer.qsize(), 0)
+        self.assertEqual(ErrorLog.objects.get().project, self.project)
+
+    def test_created_at_is_the_time_of_receipt(self):
+        """
+        Test that an ErrorLog written later keeps the time it was received at.
+        """
+        received_before = timezone.now()
+        data = {"error_message": "Sample error", "project": self.project.uuid}
+        self.client.post(reverse('error-log-list-create'), data, format='json')
+        received_after = timezone.now()
+
+        with mock.patch('django.utils.timezone.now', return_value=received_after + timedelta(minutes=5)):
+            self.writer.flush()
+        self.assertTrue(received_before <= ErrorLog.objects.get().created_at <= received_after)
+
+    def test_post_batch_is_accepted_and_written_on_flush(self):
+        """
+        Test that a batch is acknowledged with 202 and every valid event is written on flush.
+        """
+        data = {
+            "project": self.project.uuid,
+            "events": [{"error_message": f"Error {index}"} for index in range(5)],
+        }
+        response = self.client.post(reverse('error-log-batch-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['accepted'], 5)
+
+        with override_settings(ERROR_TRACKER_FLUSH_BATCH_SIZE=2):
+            self.writer.flush()
+        self.assertEqual(ErrorLog.objects.count(), 5)
+
+    @override_settings(ERROR_TRACKER_QUEUE_MAX_SIZE=1)
+    def test_post_error_log_when_queue_is_full(self):
+        """
+        Test that ingestion answers 503 instead of buffering beyond the queue size.
+        """
+        self.writer = ErrorLogWriter()
+        with mock.patch('error_tracker.views.error_log_writer', self.writer):
+            data = {"error_message": "Sample error", "project": self.project.uuid}
+            self.client.post(reverse('error-log-list-create'), data, format='json')
+            response = self.client.post(reverse('error-log-list-create'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.writer.qsize(), 1)
+
+
+class CompressedIngestionTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_API_KEY=self.api_key.key)
+
+    def post_compressed(self, url, body, encoding):
+        return self.client.generic('POST', url, body, content_type='application/json',
+                                   HTTP_CONTENT_ENCODING=encoding)
+
+    def test_post_gzip_error_log(self):
+        """
+        Test that a gzip-compressed ErrorLog is decompressed and stored.
+        """
+        data = {"error_message": "Sample error", "project": str(self.project.uuid)}
+        response = self.post_compressed(reverse('error-log-list-create'),
+                                        gzip.compress(json.dumps(data).encode()), 'gzip')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ErrorLog.objects.get().get_error_message(), "Sample error")
+
+    def test_post_deflate_batch(self):
+        """
+        Test that a deflate-compressed batch is decompressed and stored.
+        """
+        data = {"project": str(self.project.uuid), "events": [{"error_message": "First"}, {"error_message": "Second"}]}
+        response = self.post_compressed(reverse('error-log-batch-create'),
+                                        zlib.compress(json.dumps(data).encode()), 'deflate')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ErrorLog.objects.count(), 2)
+
+    @override_settings(REQUEST_DECOMPRESSION_MAX_SIZE=1024)
+    def test_post_compressed_body_over_limit(self):
+        """
+        Test that a body inflating beyond the configured limit is refused.
+        """
+        data = {"error_message": "x" * 10000, "project": str(self.project.uuid)}
+        response = self.post_compressed(reverse('error-log-list-create'),
+                                        gzip.compress(json.dumps(data).encode()), 'gzip')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+    def test_post_malformed_compressed_body(self):
+        """
+        Test that a body which is not valid gzip is refused.
+        """
+        response = self.post_compressed(reverse('error-log-list-create'), b'not gzip at all', 'gzip')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ErrorLogNDJSONTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_API_KEY=self.api_key.key)
+        self.ndjson_url = f"{reverse('error-log-ndjson-create')}?project={self.project.uuid}"
+
+    def post_lines(self, lines, **extra):
+        return self.client.generic('POST', self.ndjson_url, '\n'.join(lines).encode(),
+                                   content_type='application/x-ndjson', **extra)
+
+    @override_settings(ERROR_TRACKER_NDJSON_CHUNK_SIZE=2)
+    def test_post_ndjson_stores_valid_lines_in_chunks(self):
+        """
+        Test that valid lines are stored and invalid ones reported with their line number.
+        """
+        lines = [json.dumps({"error_message": f"Error {index}", "environment": "Production"}) for index in range(5)]
+        lines.insert(2, '{"environment": "Production"}')
+        lines.insert(4, 'not json')
+
+        response = self.post_lines(lines)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['accepted'], 5)
+        self.assertEqual(response.data['accepted_lines'], [[1, 2], [4, 4], [6, 7]])
+        self.assertEqual([rejected['line'] for rejected in response.data['rejected_lines']], [3, 5])
+        self.assertEqual(ErrorLog.objects.filter(project=self.project).count(), 5)
+
+    @override_settings(ERROR_TRACKER_NDJSON_MAX_LINE_SIZE=100)
+    def test_post_ndjson_rejects_long_lines(self):
+        """
+        Test that a line longer than the limit is rejected without affecting the next ones.
+        """
+        lines = [json.dumps({"error_message": "x" * 500}), json.dumps({"error_message": "short"})]
+        response = self.post_lines(lines)
+        self.assertEqual(response.data['accepted_lines'], [[2, 2]])
+        self.assertEqual(response.data['rejected_lines'][0]['line'], 1)
+        self.assertEqual(ErrorLog.objects.get().get_error_message(), "short")
+
+    def test_post_gzip_ndjson(self):
+        """
+        Test that a gzip-compressed NDJSON upload is streamed and stored.
+        """
+        body = '\n'.join(json.dumps({"error_message": f"Error {index}"}) for index in range(3)).encode()
+        response = self.client.generic('POST', self.ndjson_url, gzip.compress(body),
+                                       content_type='application/x-ndjson', HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(response.data['accepted'], 3)
+        self.assertEqual(ErrorLog.objects.count(), 3)
+
+    def test_post_ndjson_without_project(self):
+        """
+        Test that the upload is refused when the project query parameter is missing.
+        """
+        response = self.client.generic('POST', reverse('error-log-ndjson-create'), b'{"error_message": "x"}',
+                                       content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(ErrorLog.objects.count(), 0)
+
+
+class IngestionThrottlingTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user,
+                                              ingest_rate_limit=1, ingest_burst=3)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+
+        self.client = APIClient()
+        self.client.credentials(HTTP_API_KEY=self.api_key.key)
+        self.batch_url = reverse('error-log-batch-create')
+
+    def test_project_over_its_rate_is_throttled(self):
+        """
+        Test that a project which used up its token bucket gets a 429 with Retry-After.
+        """
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}] * 3}
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(ErrorLog.objects.count(), 3)
+
+    def test_bucket_is_shared_and_refills(self):
+        """
+        Test that tokens taken concurrently through the shared cache all count, and that they are
+        given back at the rate of the project.
+        """
+        # Windows of burst / rate = 3 seconds
+        window_start = time.time() // 3 * 3
+        with mock.patch('error_tracker.throttling.time.time', return_value=window_start + 0.5):
+            threads = [threading.Thread(target=consume_ingest_tokens, args=(self.project, 1)) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with self.assertRaises(Throttled) as throttled:
+                check_ingest_rate(self.project)
+            self.assertEqual(throttled.exception.wait, 4)
+
+        with mock.patch('error_tracker.throttling.time.time', return_value=window_start + 4):
+            check_ingest_rate(self.project)
+
+    def test_rate_limits_are_per_project(self):
+        """
+        Test that one project using up its bucket does not throttle another one.
+        """
+        other_project = Project.objects.create(name="Other Project", user=self.user)
+        other_key = APIKey.objects.create(user=self.user, project=other_project)
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}] * 3}
+        self.client.post(self.batch_url, data, format='json')
+
+        self.client.credentials(HTTP_API_KEY=other_key.key)
+        data = {"project": other_project.uuid, "events": [{"error_message": "Sample error"}]}
+        response = self.client.post(self.batch_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(ERROR_TRACKER_SAMPLING_THRESHOLD=2, ERROR_TRACKER_SAMPLING_KEEP_EVERY=3)
+    def test_repeated_errors_are_sampled_but_counted(self):
+        """
+        Test that past the sampling threshold only one in N occurrences is stored, while the
+        group still counts all of them.
+        """
+        self.project.ingest_rate_limit = 0
+        self.project.save()
+        data = {"project": self.project.uuid, "events": [{"error_message": "Sample error"}] * 8}
+        response = self.client.post(self.batch_url, data, format='json')
+
+        statuses = [result['status'] for result in response.data['results']]
+        self.assertEqual(statuses, ['created', 'created', 'sampled', 'sampled', 'created',
+                                    'sampled', 'sampled', 'created'])
+        self.assertEqual(ErrorLog.objects.count(), 4)
+        self.assertEqual(ErrorGroup.objects.get().count, 8)
+
+
+class AsyncErrorLogCreateTests(TestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.api_key = APIKey.objects.create(user=self.user, project=self.project)
+        self.async_url = reverse('error-log-async-create')
+
+    async def test_post_error_log(self):
+        """
+        Test that the async view stores an ErrorLog authenticated with an APIKey.
+        """
+        data = {"error_message": "Sample error", "environment": "Production", "project": str(self.project.uuid)}
+        response = await self.async_client.post(self.async_url, data, content_type='application/json',
+                                                headers={'API-Key': str(self.api_key.key)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        error_log = await ErrorLog.objects.select_related('message_blob').aget()
+        self.assertEqual(response.json()['id'], error_log.id)
+        self.assertEqual(error_log.get_error_message(), "Sample error")
+        self.assertEqual(error_log.project_id, self.project.id)
+
+    async def test_post_error_log_with_invalid_api_key(self):
+        """
+        Test that the async view refuses an APIKey of another project.
+        """
+        another_project = await Project.objects.acreate(name="Other Project", user=self.user)
+        other_key = await APIKey.objects.acreate(user=self.user, project=another_project)
+        data = {"error_message": "Sample error", "project": str(self.project.uuid)}
+        response = await self.async_client.post(self.async_url, data, content_type='application/json',
+                                                headers={'API-Key': str(other_key.key)})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(await ErrorLog.objects.acount(), 0)
+
+    async def test_post_invalid_error_log(self):
+        """
+        Test that the async view reports validation errors.
+        """
+        data = {"environment": "Production", "project": str(self.project.uuid)}
+        response = await self.async_client.post(self.async_url, data, content_type='application/json',
+                                                headers={'API-Key': str(self.api_key.key)})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error_message', response.json())
+
+
+class ErrorLogListPaginationTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-log-list-create')
+
+    def test_pages_follow_cursor_without_gaps_or_duplicates(self):
+        """
+        Test that following the next links returns every ErrorLog once, newest first, even when
+        several share the same created_at.
+        """
+        error_logs = ErrorLog.objects.bulk_create(
+            [ErrorLog(project=self.project, error_message=f"Error {index}") for index in range(7)]
+        )
+        ErrorLog.objects.filter(id__in=[error_log.id for error_log in error_logs[:4]]).update(
+            created_at=error_logs[0].created_at
+        )
+
+        ids = []
+        url = f'{self.list_url}?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            ids.extend(result['id'] for result in response.data['results'])
+            url = response.data['next']
+
+        expected = list(ErrorLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_pages_merge_several_projects(self):
+        """
+        Test that the pages over several projects, read one index scan per project, follow each
+        other in order.
+        """
+        other_project = Project.objects.create(name="Other Project", user=self.user)
+        now = timezone.now()
+        ErrorLog.objects.bulk_create([
+            ErrorLog(project=self.project if index % 3 else other_project, error_message=f"Error {index}",
+                     created_at=now - timedelta(minutes=index // 2))
+            for index in range(10)
+        ])
+
+        ids = []
+        url = f'{self.list_url}?page_size=3'
+        while url:
+            response = self.client.get(url)
+            ids.extend(result['id'] for result in response.data['results'])
+            url = response.data['next']
+
+        expected = list(ErrorLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_list_only_contains_own_projects(self):
+        """
+        Test that ErrorLogs of projects of other users are not listed.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        other_project = Project.objects.create(name="Other Project", user=other_user)
+        ErrorLog.objects.create(project=self.project, error_message="Mine")
+        ErrorLog.objects.create(project=other_project, error_message="Not mine")
+
+        response = self.client.get(self.list_url)
+        self.assertEqual([result['error_message'] for result in response.data['results']], ["Mine"])
+
+    @override_settings(ERROR_TRACKER_MAX_PAGE_SIZE=2)
+    def test_page_size_is_bounded(self):
+        """
+        Test that the requested page size cannot exceed the configured maximum.
+        """
+        for index in range(3):
+            ErrorLog.objects.create(project=self.project, error_message=f"Error {index}")
+        response = self.client.get(f'{self.list_url}?page_size=1000')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        """
+        Test that a tampered cursor is rejected.
+        """
+        response = self.client.get(f'{self.list_url}?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ErrorLogListFilterTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.other_project = Project.objects.create(name="Other Project", user=self.user)
+        self.group = ErrorGroup.objects.create(project=self.project, fingerprint='a')
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-log-list-create')
+
+        now = timezone.now()
+        self.logs = {
+            'old': ErrorLog.objects.create(project=self.project, error_message="old", environment="production"),
+            'prod': ErrorLog.objects.create(project=self.project, error_message="prod", environment="production",
+                                            error_group=self.group),
+            'staging': ErrorLog.objects.create(project=self.project, error_message="staging", environment="staging"),
+            'other': ErrorLog.objects.create(project=self.other_project, error_message="other",
+                                             environment="production"),
+        }
+        ErrorLog.objects.filter(id=self.logs['old'].id).update(created_at=now - timedelta(days=2))
+
+    def get_messages(self, **params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(result['error_message'] for result in response.data['results'])
+
+    def test_filter_by_project(self):
+        """
+        Test filtering ErrorLogs by project UUID.
+        """
+        self.assertEqual(self.get_messages(project=self.other_project.uuid), ["other"])
+
+    def test_filter_by_project_and_environment(self):
+        """
+        Test filtering ErrorLogs by project and environment.
+        """
+        self.assertEqual(self.get_messages(project=self.project.uuid, environment="production"), ["old", "prod"])
+
+    def test_filter_by_group(self):
+        """
+        Test filtering ErrorLogs by ErrorGroup.
+        """
+        self.assertEqual(self.get_messages(group=self.group.id), ["prod"])
+
+    def test_filter_by_created_range(self):
+        """
+        Test filtering ErrorLogs by creation time range.
+        """
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertEqual(self.get_messages(project=self.project.uuid, created_after=since), ["prod", "staging"])
+        self.assertEqual(self.get_messages(created_before=since), ["old"])
+
+    def test_filter_by_project_of_another_user(self):
+        """
+        Test that filtering by a project of another user returns nothing.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        foreign_project = Project.objects.create(name="Foreign Project", user=other_user)
+        ErrorLog.objects.create(project=foreign_project, error_message="foreign")
+        self.assertEqual(self.get_messages(project=foreign_project.uuid), [])
+
+    def test_invalid_filter_values(self):
+        """
+        Test that malformed filter values are rejected.
+        """
+        for params in ({'project': 'nope'}, {'group': 'nope'}, {'created_after': 'yesterday'}):
+            response = self.client.get(self.list_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(connection.vendor == 'postgresql', "Full-text search requires PostgreSQL")
+class ErrorLogSearchTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Payments", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-log-list-create')
+
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="ConnectionResetError: [Errno 104] Connection reset by peer"),
+            ErrorLog(project=self.project, error_message="ConnectionResetError: peer closed the connection"),
+            ErrorLog(project=self.project, error_message="KeyError: 'amount'"),
+        ])
+
+    def test_search_returns_matching_error_logs(self):
+        """
+        Test that only ErrorLogs whose message matches the query are returned.
+        """
+        response = self.client.get(self.list_url, {'search': 'ConnectionResetError'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        messages = [result['error_message'] for result in response.data['results']]
+        self.assertEqual(len(messages), 2)
+        self.assertTrue(all(message.startswith('ConnectionResetError') for message in messages))
+
+    def test_search_pages_by_rank(self):
+        """
+        Test that search results can be paged through with the cursor.
+        """
+        ids = []
+        url = f'{self.list_url}?search=ConnectionResetError&page_size=1'
+        while url:
+            response = self.client.get(url)
+            ids.extend(result['id'] for result in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(len(set(ids)), 2)
+
+
+class ErrorHistogramTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.histogram_url = reverse('error-histogram')
+        self.now = timezone.now().replace(minute=30, second=0, microsecond=0)
+
+    def ingest(self, error_logs, created_at):
+        for error_log in error_logs:
+            error_log.created_at = created_at
+        with mock.patch('django.utils.timezone.now', return_value=created_at):
+            store_error_logs(error_logs)
+
+    def get_counts(self, **params):
+        params.setdefault('project', str(self.project.uuid))
+        response = self.client.get(self.histogram_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [bucket['count'] for bucket in response.data['buckets']]
+
+    def test_histogram_counts_error_logs_per_bucket(self):
+        """
+        Test that the histogram counts the ingested ErrorLogs in their buckets and fills the empty ones with 0.
+        """
+        self.ingest([ErrorLog(project=self.project, error_message="KeyError: 'a'", environment="production"),
+                     ErrorLog(project=self.project, error_message="KeyError: 'b'", environment="staging")],
+                    self.now - timedelta(hours=2))
+        self.ingest([ErrorLog(project=self.project, error_message="KeyError: 'c'", environment="production")],
+                    self.now)
+
+        start = (self.now - timedelta(hours=3)).isoformat()
+        end = (self.now + timedelta(minutes=30)).isoformat()
+        self.assertEqual(self.get_counts(resolution='hour', start=start, end=end), [0, 2, 0, 1])
+        self.assertEqual(self.get_counts(resolution='hour', start=start, end=end, environment='production'),
+                         [0, 1, 0, 1])
+
+    def test_histogram_counts_accumulate_across_ingestions(self):
+        """
+        Test that successive ingestions in the same bucket add up instead of overwriting each other.
+        """
+        for message in ["ValueError: 1", "ValueError: 2", "ValueError: 3"]:
+            self.ingest([ErrorLog(project=self.project, error_message=message)], self.now)
+        group = ErrorGroup.objects.get(project=self.project)
+
+        start = self.now.isoformat()
+        end = (self.now + timedelta(minutes=1)).isoformat()
+        self.assertEqual(self.get_counts(resolution='minute', start=start, end=end), [3])
+        self.assertEqual(self.get_counts(resolution='minute', start=start, end=end, group=group.id), [3])
+        self.assertEqual(self.get_counts(resolution='day', start=start, end=end), [3])
+
+    def test_histogram_of_another_users_project_is_not_found(self):
+        """
+        Test that the histogram of a project of another user returns 404.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        other_project = Project.objects.create(name="Other Project", user=other_user)
+        response = self.client.get(self.histogram_url, {'project': str(other_project.uuid)})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(ERROR_TRACKER_HISTOGRAM_MAX_BUCKETS=10)
+    def test_histogram_rejects_too_many_buckets(self):
+        """
+        Test that a range spanning more than ERROR_TRACKER_HISTOGRAM_MAX_BUCKETS buckets is rejected.
+        """
+        response = self.client.get(self.histogram_url, {'project': str(self.project.uuid), 'resolution': 'minute'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('start', response.data)
+
+
+class ErrorLogExportTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        self.other_project = Project.objects.create(name="Other Project", user=other_user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+        # Blob-backed messages, one of them compressed, and a message stored inline
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 'a'", environment="production"),
+            ErrorLog(project=self.project, error_message="Traceback, line 1\n" * 100, environment="staging"),
+            ErrorLog(project=self.other_project, error_message="KeyError: 'secret'", environment="production"),
+        ])
+        ErrorLog.objects.create(project=self.project, error_message='ValueError: "quoted", comma')
+
+    def export(self, export_format, **params):
+        response = self.client.get(reverse('error-log-export', args=[export_format]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_csv(self):
+        """
+        Test that the CSV export contains a header and the ErrorLogs of the user's projects in creation order.
+        """
+        response, content = self.export('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment;', response['Content-Disposition'])
+
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'error_message', 'environment', 'created_at', 'project', 'error_group'])
+        self.assertEqual([row[1] for row in rows[1:]],
+                         ["KeyError: 'a'", "Traceback, line 1\n" * 100, 'ValueError: "quoted", comma'])
+        self.assertTrue(all(row[4] == str(self.project.uuid) for row in rows[1:]))
+
+    def test_export_ndjson_matches_serializer(self):
+        """
+        Test that every NDJSON line has the same fields and values as the list endpoint.
+        """
+        _, content = self.export('ndjson')
+        exported = [json.loads(line) for line in content.splitlines()]
+
+        listed = self.client.get(reverse('error-log-list-create')).json()['results']
+        self.assertEqual(sorted(exported, key=lambda e: e['id']), sorted(listed, key=lambda e: e['id']))
+
+    def test_export_applies_list_filters(self):
+        """
+        Test that the export accepts the filters of the list endpoint.
+        """
+        _, content = self.export('ndjson', environment='staging')
+        exported = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([e['environment'] for e in exported], ['staging'])
+
+    def test_export_requires_authentication(self):
+        """
+        Test that exporting without a JWT is rejected.
+        """
+        self.client.credentials()
+        response = self.client.get(reverse('error-log-export', args=['csv']))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ErrorLogFastListTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-log-list-create')
+
+        store_error_logs([
+            ErrorLog(project=self.project, error_message="KeyError: 'a'", environment="production"),
+            ErrorLog(project=self.project, error_message="Traceback, line 1\n" * 100),
+            ErrorLog(project=self.project, error_message="UnicodeError: café \u2028 \"quoted\" \t\x01"),
+        ])
+        ErrorLog.objects.create(project=self.project, error_message="ValueError: stored inline", environment="")
+
+    def get_both(self, params, **extra):
+        with override_settings(ERROR_TRACKER_FAST_LIST=False):
+            slow = self.client.get(self.list_url, params, **extra)
+        fast = self.client.get(self.list_url, params, **extra)
+        self.assertEqual(fast.status_code, status.HTTP_200_OK)
+        return slow, fast
+
+    def test_fast_list_is_byte_identical(self):
+        """
+        Test that the values_list read path renders exactly the bytes of ErrorLogSerializer.
+        """
+        slow, fast = self.get_both({})
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+        self.assertEqual(len(fast.json()['results']), 4)
+
+    def test_fast_list_pages_are_byte_identical(self):
+        """
+        Test that every page, including the cursor of the next one, is identical on both paths.
+        """
+        params = {'page_size': 1}
+        pages = 0
+        while True:
+            slow, fast = self.get_both(params)
+            self.assertEqual(fast.content, slow.content)
+            pages += 1
+            next_url = fast.json()['next']
+            if next_url is None:
+                break
+            params = {'page_size': 1, 'cursor': next_url.split('cursor=')[1].split('&')[0]}
+        self.assertEqual(pages, 4)
+
+    def test_fast_list_skips_serializer(self):
+        """
+        Test that the fast path does not instantiate ErrorLogSerializer.
+        """
+        with mock.patch('error_tracker.views.ErrorLogSerializer') as serializer:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        serializer.assert_not_called()
+
+    def test_indented_json_uses_serializer(self):
+        """
+        Test that responses the fast path cannot render, like indented JSON, still work.
+        """
+        response = self.client.get(self.list_url, HTTP_ACCEPT='application/json; indent=4')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'\n    "results"', response.content)
+
+
+class ErrorLogConditionalListTests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-log-list-create')
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'a'")])
+
+    def test_unchanged_list_returns_not_modified(self):
+        """
+        Test that repeating a request with the ETag of the response returns 304 without running the list query.
+        """
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        # The user lookup of the JWT authentication, the project lookup and the two validator lookups
+        with self.assertNumQueries(4):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_new_error_log_changes_etag(self):
+        """
+        Test that storing a matching ErrorLog invalidates the ETag.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 'b'")])
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_etag_depends_on_filters(self):
+        """
+        Test that the ETag of one filter is not accepted for another.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, {'environment': 'staging'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_no_last_modified(self):
+        """
+        Test that the list has no Last-Modified, which could not tell expired ErrorLogs were deleted.
+        """
+        response = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ErrorGroupAPITests(APITestCase):
+
+    def setUp(self):
+        group_id_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.project = Project.objects.create(name="Test Project", user=self.user)
+        self.other_project = Project.objects.create(name="Other Project", user=self.user)
+        self.client = APIClient()
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.list_url = reverse('error-group-list')
+
+        now = timezone.now()
+        with mock.patch('django.utils.timezone.now', return_value=now - timedelta(days=3)):
+            store_error_logs([ErrorLog(project=self.project, error_message=f"KeyError: {i}", environment="production",
+                                       created_at=now - timedelta(days=3))
+                              for i in range(5)])
+        store_error_logs(
+            [ErrorLog(project=self.project, error_message=f"ValueError: {i}", environment="production")
+             for i in range(2)] +
+            [ErrorLog(project=self.project, error_message="ValueError: 9", environment="staging"),
+             ErrorLog(project=self.other_project, error_message="TypeError: x", environment="production")]
+        )
+        self.key_error = ErrorGroup.objects.get(error_type='KeyError')
+        self.value_error = ErrorGroup.objects.get(error_type='ValueError')
+
+    def test_list_ranks_groups_by_all_time_count(self):
+        """
+        Test that without a window the groups of a project are ranked by their total count.
+        """
+        response = self.client.get(self.list_url, {'project': str(self.project.uuid)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([group['id'] for group in response.data], [self.key_error.id, self.value_error.id])
+        self.assertEqual(response.data[0]['window_count'], 5)
+        self.assertEqual(response.data[0]['sample_message'], "KeyError: 0")
+        self.assertEqual(response.data[1]['environments'], {'production': 2, 'staging': 1})
+
+    def test_list_ranks_groups_within_window(self):
+        """
+        Test that with a window only the occurrences of the window are counted.
+        """
+        response = self.client.get(self.list_url, {'project': str(self.project.uuid), 'window': '24h'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(group['id'], group['window_count']) for group in response.data],
+                         [(self.value_error.id, 3)])
+        self.assertEqual(response.data[0]['count'], 3)
+
+    def test_list_limit(self):
+        """
+        Test that limit bounds the number of groups returned.
+        """
+        response = self.client.get(self.list_url, {'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([group['id'] for group in response.data], [self.key_error.id])
+
+    def test_list_excludes_other_users_groups(self):
+        """
+        Test that groups of projects of other users are not listed.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        foreign_project = Project.objects.create(name="Foreign Project", user=other_user)
+        store_error_logs([ErrorLog(project=foreign_project, error_message="OSError: nope")])
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('OSError', [group['error_type'] for group in response.data])
+
+    def test_list_rejects_unknown_window(self):
+        """
+        Test that an unsupported window is rejected.
+        """
+        response = self.client.get(self.list_url, {'window': '2h'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_does_not_read_error_logs(self):
+        """
+        Test that listing groups never queries the ErrorLog table.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.list_url, {'window': '7d'})
+        self.assertFalse(any(ErrorLog._meta.db_table in query['sql'] for query in queries.captured_queries))
+
+    def test_unchanged_list_returns_not_modified(self):
+        """
+        Test that the group list honors If-None-Match until a group changes.
+        """
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        store_error_logs([ErrorLog(project=self.project, error_message="KeyError: 7")])
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_window_moving_past_occurrences_is_modified(self):
+        """
+        Test that If-Modified-Since returns the new counts once occurrences leave the window.
+        """
+        last_modified = self.client.get(self.list_url, {'window': '24h'})['Last-Modified']
+        response = self.client.get(self.list_url, {'window': '24h'}, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=2)):
+            response = self.client.get(self.list_url, {'window': '24h'}, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_detail(self):
+        """
+        Test that the detail of a group has its window count and environment breakdown.
+        """
+        url = reverse('error-group-detail', args=[self.value_error.id])
+        response = self.client.get(url, {'window': '1h'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['window_count'], 3)
+        self.assertEqual(response.data['project'], str(self.project.uuid))
+        self.assertEqual(response.data['environments'], {'production': 2, 'staging': 1})
+
+    def test_detail_of_other_users_group_is_not_found(self):
+        """
+        Test that the detail of a group of another user returns 404.
+        """
+        other_user = User.objects.create_user(username='otheruser', password='password')
+        foreign_project = Project.objects.create(name="Foreign Project", user=other_user)
+        store_error_logs([ErrorLog(project=foreign_project, error_message="OSError: nope")])
+        group = ErrorGroup.objects.get(project=foreign_project)
+
+        response = self.client.get(reverse('error-group-detail', args=[group.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
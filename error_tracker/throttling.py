@@ -0,0 +1,130 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+
+
+def _cache():
+    return caches[settings.ERROR_TRACKER_THROTTLE_CACHE]
+
+
+def get_ingest_limits(project):
+    """
+    Returns the (events per second, burst) token bucket of a ResolvedProject.
+    """
+    rate = project.ingest_rate_limit
+    if rate is None:
+        rate = settings.ERROR_TRACKER_INGEST_RATE_LIMIT
+    burst = project.ingest_burst
+    if burst is None:
+        burst = settings.ERROR_TRACKER_INGEST_BURST
+    return rate, max(burst, 1)
+
+
+def _window_keys(project_id, window, now):
+    index = int(now // window)
+    return f'ingest-window:{project_id}:{index}', f'ingest-window:{project_id}:{index - 1}'
+
+
+def _bucket(project_id, rate, burst, now):
+    """
+    Returns (tokens left, seconds until one more token is available) in the bucket of a project.
+
+    The bucket is approximated by counters of the events accepted in windows of burst / rate
+    seconds: the tokens used are the events of the current window plus those of the previous
+    one in proportion of the part of it still within the last window length, so a full window
+    drains at rate tokens per second. The counters live in the ERROR_TRACKER_THROTTLE_CACHE cache
+    and are only changed by its atomic add() and incr(), so the limit holds across every worker.
+    """
+    window = burst / rate
+    current_key, previous_key = _window_keys(project_id, window, now)
+    counts = _cache().get_many([current_key, previous_key])
+    current, previous = counts.get(current_key, 0), counts.get(previous_key, 0)
+    remaining = window - now % window
+    previous_left = previous * remaining / window
+    tokens = burst - current - previous_left
+
+    # The previous window drains until the end of the current one, which then drains in turn
+    missing = 1 - tokens
+    if missing <= 0:
+        return tokens, 0
+    if missing <= previous_left:
+        return tokens, missing * window / previous
+    return tokens, remaining + (missing - previous_left) * window / current
+
+
+def check_ingest_rate(project):
+    """
+    Raises Throttled if the project has no ingestion token left.
+    """
+    rate, burst = get_ingest_limits(project)
+    if not rate:
+        return
+    tokens, wait = _bucket(project.id, rate, burst, time.time())
+    if tokens < 1:
+        raise Throttled(wait=wait)
+
+
+def consume_ingest_tokens(project, count):
+    """
+    Takes the tokens of count accepted events from the bucket of the project.
+
+    Requests are only checked for one available token, so a large upload can leave the bucket
+    in debt, which delays the following requests accordingly.
+    """
+    rate, burst = get_ingest_limits(project)
+    if not rate or not count:
+        return
+    cache = _cache()
+    window = burst / rate
+    key, _ = _window_keys(project.id, window, time.time())
+    # Kept while it is the current or the previous window
+    timeout = int(2 * window) + 1
+    cache.add(key, 0, timeout=timeout)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        # The entry expired between add() and incr()
+        cache.set(key, count, timeout=timeout)
+
+
+def sample_error_logs(error_logs):
+    """
+    Returns the ErrorLogs that should be stored.
+
+    Within every ERROR_TRACKER_SAMPLING_WINDOW seconds, the first ERROR_TRACKER_SAMPLING_THRESHOLD
+    occurrences of a group are all kept, then only one in ERROR_TRACKER_SAMPLING_KEEP_EVERY.
+    Occurrence counts are shared through the cache.
+    """
+    threshold = settings.ERROR_TRACKER_SAMPLING_THRESHOLD
+    if not threshold:
+        return error_logs
+
+    window = settings.ERROR_TRACKER_SAMPLING_WINDOW
+    keep_every = max(settings.ERROR_TRACKER_SAMPLING_KEEP_EVERY, 1)
+    window_start = int(time.time() // window)
+    cache = _cache()
+
+    by_group = {}
+    for error_log in error_logs:
+        by_group.setdefault(error_log.error_group_id, []).append(error_log)
+
+    kept = []
+    for group_id, group_logs in by_group.items():
+        if group_id is None:
+            kept.extend(group_logs)
+            continue
+
+        key = f'ingest-sampling:{group_id}:{window_start}'
+        cache.add(key, 0, timeout=window)
+        try:
+            total = cache.incr(key, len(group_logs))
+        except ValueError:
+            # The entry expired between add() and incr()
+            cache.set(key, len(group_logs), timeout=window)
+            total = len(group_logs)
+
+        for position, error_log in enumerate(group_logs, start=total - len(group_logs) + 1):
+            if position <= threshold or (position - threshold) % keep_every == 0:
+                kept.append(error_log)
+    return kept
@@ -1,6 +1,24 @@
-from django.urls import path
-from .views import ErrorLogListCreateView
+from django.conf import settings
+from django.urls import path, re_path
+from .async_views import async_error_log_create_view, error_log_list_async_create_view
+from .views import (ErrorLogListCreateView, ErrorLogExportView, ErrorLogBatchCreateView, ErrorLogNDJSONCreateView,
+                    ErrorGroupListView, ErrorGroupDetailView, ErrorHistogramView, MetricsView)
+
+if settings.ERROR_TRACKER_ASYNC_INGEST:
+    # Under ASGI, POST on error-logs/ is served by the async-native view
+    error_log_list_create_view = error_log_list_async_create_view
+else:
+    error_log_list_create_view = ErrorLogListCreateView.as_view()
 
 urlpatterns = [
-    path('error-logs/', ErrorLogListCreateView.as_view(), name='error-log-list-create'),
+    path('error-logs/', error_log_list_create_view, name='error-log-list-create'),
+    path('error-logs/async/', async_error_log_create_view, name='error-log-async-create'),
+    re_path(r'^error-logs/export/(?P<export_format>csv|ndjson)/$', ErrorLogExportView.as_view(),
+            name='error-log-export'),
+    path('error-logs/batch/', ErrorLogBatchCreateView.as_view(), name='error-log-batch-create'),
+    path('error-logs/ndjson/', ErrorLogNDJSONCreateView.as_view(), name='error-log-ndjson-create'),
+    path('error-groups/', ErrorGroupListView.as_view(), name='error-group-list'),
+    path('error-groups/<int:pk>/', ErrorGroupDetailView.as_view(), name='error-group-detail'),
+    path('histogram/', ErrorHistogramView.as_view(), name='error-histogram'),
+    path('metrics/', MetricsView.as_view(), name='error-tracker-metrics'),
 ]
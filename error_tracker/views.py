@@ -1,50 +1,458 @@
-import re
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
-from .models import ErrorLog
-from .serializers import ErrorLogSerializer
+import json
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from nomorebugs.db_routing import ReplicaReadMixin
+from project_integrations.api_key_cache import normalize_uuid
+from project_integrations.models import Project
+from .conditional import ConditionalGetMixin
+from .export import EXPORT_CONTENT_TYPES, EXPORT_WRITERS
+from .filters import filter_error_logs, first_rows, get_cursor_field, get_projects, parse_datetime_param
+from .ingest import error_log_writer, store_error_logs
+from .metrics import metrics
+from .groups import WINDOWS, attach_environments, attach_window_counts, top_error_groups, window_start
+from .models import ErrorGroup, ErrorLog, ErrorRollup
+from .pagination import ErrorLogCursorPagination
+from .serializers import ErrorLogSerializer, ErrorLogBatchSerializer, ErrorLogBatchItemSerializer, ErrorGroupSerializer
 from .permissions import HasAPIKeyPermission
+from .rollups import BUCKET_SIZES, get_histogram
+from .rows import COLUMNS, FIELDS, PreRenderedResponse, dumps_json, render_error_log_rows
+from .throttling import consume_ingest_tokens
 
 
-class ErrorLogListCreateView(generics.ListCreateAPIView):
+class ErrorLogListCreateView(ReplicaReadMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Handles GET requests for listing ErrorLogs with JWT authentication.
     Handles POST requests for creating ErrorLogs with APIKey authentication.
+
+    The list only contains ErrorLogs of the projects of the user, can be filtered with the
+    parameters described in error_tracker.filters and is paginated with a cursor. Plain JSON
+    responses are rendered from values_list() rows by error_tracker.rows, byte for byte like
+    ErrorLogSerializer would. Unchanged lists are answered with 304 Not Modified.
     """
-    queryset = ErrorLog.objects.all()
+    queryset = ErrorLog.objects.select_related('project', 'message_blob')
     serializer_class = ErrorLogSerializer
+    pagination_class = ErrorLogCursorPagination
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [HasAPIKeyPermission()]
         return [IsAuthenticated()]
 
+    def get_queryset(self):
+        return filter_error_logs(super().get_queryset(), self.request.user, self.request.query_params)
+
+    def get_cursor_field(self):
+        return get_cursor_field(self.request.query_params)
+
+    def get_project_ids(self):
+        if not hasattr(self, '_project_ids'):
+            projects = get_projects(self.request.user, self.request.query_params)
+            self._project_ids = list(projects.values_list('id', flat=True))
+        return self._project_ids
+
+    def get_validators(self, request):
+        # The newest and oldest matching rows, each one LIMIT 1 on a (..., created_at, id) index
+        # per project: new ErrorLogs change the first and expired ones the second. There is no
+        # Last-Modified, as nothing records when retention deleted the expired ones.
+        queryset = self.get_queryset()
+        project_ids = self.get_project_ids()
+        newest = first_rows(queryset.values_list('id', flat=True), project_ids, ('-created_at', '-id'), 1)
+        oldest = first_rows(queryset.values_list('id', flat=True), project_ids, ('created_at', 'id'), 1)
+        return (newest[0] if newest else None, oldest[0] if oldest else None), None
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list(request):
+            return super().list(request, *args, **kwargs)
+
+        columns = list(COLUMNS)
+        cursor_field = self.get_cursor_field()
+        if cursor_field not in columns:
+            columns.append(cursor_field)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*columns, named=True)
+        rows = self.paginate_queryset(queryset)
+        data = {
+            'next': self.paginator.get_next_link(),
+            'results': [dict(zip(FIELDS, row)) for row in render_error_log_rows(rows)],
+        }
+        return PreRenderedResponse(data, dumps_json(data))
+
+    @staticmethod
+    def use_fast_list(request):
+        # Other renderers, e.g. the browsable API, and indented JSON go through the serializer
+        return (
+            settings.ERROR_TRACKER_FAST_LIST
+            and type(request.accepted_renderer) is JSONRenderer
+            and 'indent' not in request.accepted_media_type
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Set by HasAPIKeyPermission once the API key and project have been resolved
+        context['project_id'] = getattr(self.request, 'project_id', None)
+        return context
+
+    def create(self, request, *args, **kwargs):
+        if not settings.ERROR_TRACKER_WRITE_BEHIND:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not error_log_writer.submit([ErrorLog(**serializer.validated_data)]):
+            return queue_full_response()
+        consume_ingest_tokens(request.ingest_project, 1)
+        return Response({'detail': 'Error log accepted.'}, status=status.HTTP_202_ACCEPTED)
+
     def perform_create(self, serializer):
+        # Goes through the shared ingestion path so the ErrorLog is assigned to its ErrorGroup
+        serializer.instance = store_error_logs([ErrorLog(**serializer.validated_data)])[0]
+        consume_ingest_tokens(self.request.ingest_project, 1)
+
+
+class ErrorLogExportView(ReplicaReadMixin, APIView):
+    """
+    Handles GET requests exporting all the ErrorLogs matching the list filters as CSV or NDJSON,
+    with JWT authentication.
+
+    The response is streamed in (created_at, id) order, without pagination, from a server-side
+    cursor, see error_tracker.export.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, export_format):
+        queryset = filter_error_logs(ErrorLog.objects.all(), request.user, request.query_params)
+        response = StreamingHttpResponse(EXPORT_WRITERS[export_format](queryset),
+                                         content_type=EXPORT_CONTENT_TYPES[export_format])
+        filename = f'error-logs-{timezone.now():%Y%m%dT%H%M%SZ}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ErrorLogBatchCreateView(APIView):
+    """
+    Handles POST requests with a batch of ErrorLogs for a single project, authenticated with an APIKey.
 
-        error_data = self.request.data.get("error_message", "")
+    The body is {"project": <uuid>, "events": [{"error_message": ..., "environment": ...}, ...]}.
+    Every event is validated independently, the valid ones are written with a single bulk insert
+    and the response reports the outcome of each event in the order they were sent.
+    """
+    permission_classes = [HasAPIKeyPermission]
+
+    def post(self, request):
+        batch = ErrorLogBatchSerializer(
+            data=request.data,
+            context={
+                'max_batch_size': settings.ERROR_TRACKER_MAX_BATCH_SIZE,
+                'project_id': getattr(request, 'project_id', None),
+            }
+        )
+        batch.is_valid(raise_exception=True)
+        project = batch.validated_data['project']
+
+        results = []
+        error_logs = []
+        for index, event in enumerate(batch.validated_data['events']):
+            item = ErrorLogBatchItemSerializer(data=event)
+            if item.is_valid():
+                error_logs.append(ErrorLog(project=project, **item.validated_data))
+                results.append({'index': index, 'status': 'created'})
+            else:
+                results.append({'index': index, 'status': 'rejected', 'errors': item.errors})
+
+        if settings.ERROR_TRACKER_WRITE_BEHIND:
+            if error_logs and not error_log_writer.submit(error_logs):
+                return queue_full_response()
+            consume_ingest_tokens(request.ingest_project, len(error_logs))
+            for result in results:
+                if result['status'] == 'created':
+                    result['status'] = 'accepted'
+            return Response({
+                'accepted': len(error_logs),
+                'rejected': len(results) - len(error_logs),
+                'results': results,
+            }, status=status.HTTP_202_ACCEPTED if error_logs else status.HTTP_400_BAD_REQUEST)
+
+        error_logs = store_error_logs(error_logs)
+        consume_ingest_tokens(request.ingest_project, len(error_logs))
+
+        created = iter(error_logs)
+        for result in results:
+            if result['status'] == 'created':
+                result['id'] = next(created).id
+                if result['id'] is None:
+                    # Counted in its group but not stored because of sampling
+                    result['status'] = 'sampled'
+
+        response_status = status.HTTP_201_CREATED if error_logs else status.HTTP_400_BAD_REQUEST
+        return Response({
+            'created': len(error_logs),
+            'rejected': len(results) - len(error_logs),
+            'results': results,
+        }, status=response_status)
+
+
+class ErrorLogNDJSONCreateView(APIView):
+    """
+    Handles POST requests streaming newline-delimited JSON ErrorLogs for the project given in the
+    "project" query parameter, authenticated with an APIKey.
 
-        # Extract error type and key details from the message
-        # error_type, error_signature = self._extract_error_details(error_data)
-        #
-        # # Find or create an ErrorGroup for this error type and signature
-        # error_group, created = ErrorGroup.objects.get_or_create(
-        #     error_type=error_type,
-        #     error_signature=error_signature
-        # )
+    The body is read line by line and the valid events are stored every
+    ERROR_TRACKER_NDJSON_CHUNK_SIZE lines, so memory use does not depend on the size of the upload.
+    The response lists the accepted lines as ranges and the rejected ones with their errors.
+    """
+    permission_classes = [HasAPIKeyPermission]
+
+    def get_project_uuid(self, request):
+        return request.query_params.get('project')
+
+    def post(self, request):
+        chunk_size = settings.ERROR_TRACKER_NDJSON_CHUNK_SIZE
+        max_line_size = settings.ERROR_TRACKER_NDJSON_MAX_LINE_SIZE
+        max_reported = settings.ERROR_TRACKER_NDJSON_MAX_REPORTED_ERRORS
+        project_id = request.project_id
+
+        accepted_lines = []
+        rejected_lines = []
+        accepted = rejected = 0
+        chunk = []
+        line_number = 0
+
+        for line, too_long in self._read_lines(request, max_line_size):
+            line_number += 1
+            if not too_long and not line.strip():
+                continue
 
-        # Save the ErrorLog with the associated ErrorGroup
-        # serializer.save(error_group=error_group)
-        serializer.save()
+            errors = None
+            if too_long:
+                errors = {'non_field_errors': [f'Line is longer than {max_line_size} bytes.']}
+            else:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if not isinstance(event, dict):
+                    errors = {'non_field_errors': ['Line is not a JSON object.']}
+                else:
+                    item = ErrorLogBatchItemSerializer(data=event)
+                    if item.is_valid():
+                        chunk.append(ErrorLog(project_id=project_id, **item.validated_data))
+                    else:
+                        errors = item.errors
 
-    def _extract_error_details(self, error_message):
+            if errors is None:
+                accepted += 1
+                if accepted_lines and accepted_lines[-1][1] == line_number - 1:
+                    accepted_lines[-1][1] = line_number
+                else:
+                    accepted_lines.append([line_number, line_number])
+                if len(chunk) >= chunk_size:
+                    store_error_logs(chunk)
+                    consume_ingest_tokens(request.ingest_project, len(chunk))
+                    chunk = []
+            else:
+                rejected += 1
+                if len(rejected_lines) < max_reported:
+                    rejected_lines.append({'line': line_number, 'errors': errors})
+
+        store_error_logs(chunk)
+        consume_ingest_tokens(request.ingest_project, len(chunk))
+
+        return Response({
+            'accepted': accepted,
+            'rejected': rejected,
+            'accepted_lines': accepted_lines,
+            'rejected_lines': rejected_lines,
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _read_lines(request, max_line_size):
         """
-        Helper method to extract the error type and a signature from the error message.
+        Yields (line, too_long) for every line of the body, skipping the remainder of lines longer
+        than max_line_size instead of buffering them.
         """
-        # Basic regex to capture the error type (e.g., TypeError) and location
-        type_match = re.search(r'(\w+Error):', error_message)
-        location_match = re.search(r'File "(.+)", line (\d+)', error_message)
+        while True:
+            line = request.readline(max_line_size + 1)
+            if not line:
+                return
+            if len(line) <= max_line_size or line.endswith(b'\n'):
+                yield line, False
+                continue
+            while line and not line.endswith(b'\n'):
+                line = request.readline(max_line_size + 1)
+            yield b'', True
+
+
+class ErrorGroupViewMixin(ConditionalGetMixin):
+    """
+    Shared parameters of the ErrorGroup endpoints, with JWT authentication:
+
+        project  UUID of one of the user's projects, all of them by default
+        window   1h, 24h, 7d or 30d to count occurrences in that window only, all time by default
+
+    Groups without a project, created before groups were scoped to projects, belong to no user
+    and are never listed.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get_window(self):
+        window = self.request.query_params.get('window') or None
+        if window is not None and window not in WINDOWS:
+            raise ValidationError({'window': f'Must be one of: {", ".join(WINDOWS)}.'})
+        return window
+
+    def get_project_ids(self):
+        projects = Project.objects.filter(user=self.request.user)
+        project_uuid = self.request.query_params.get('project')
+        if project_uuid:
+            project_uuid = normalize_uuid(project_uuid)
+            if project_uuid is None:
+                raise ValidationError({'project': 'Enter a valid UUID.'})
+            projects = projects.filter(uuid=project_uuid)
+        return list(projects.values_list('id', flat=True))
+
+    def get_groups(self, project_ids):
+        return ErrorGroup.objects.filter(project_id__in=project_ids)
+
+    def get_validators(self, request):
+        # Counters only grow through last_seen and groups are only added or removed, so the
+        # latest last_seen and the number of groups change whenever a group does. The start of
+        # the window moves the ETag along with the window. Window counts also drop as buckets
+        # leave the window without any last_seen changing, so Last-Modified is at least the start
+        # of the window.
+        self.now = timezone.now()
+        self.window = self.get_window()
+        self.project_ids = self.get_project_ids()
+        state = self.get_groups(self.project_ids).aggregate(last_seen=Max('last_seen'), groups=Count('id'))
+        start = window_start(self.window, self.now)
+        last_modified = max(filter(None, [state['last_seen'], start]), default=None)
+        return (state['last_seen'], state['groups'], start), last_modified
+
+
+class ErrorGroupListView(ReplicaReadMixin, ErrorGroupViewMixin, generics.ListAPIView):
+    """
+    Handles GET requests for the top ErrorGroups of the user's projects by number of occurrences.
+
+    Besides the parameters of ErrorGroupViewMixin, "limit" sets the number of groups returned
+    (ERROR_TRACKER_TOP_GROUPS by default, at most ERROR_TRACKER_MAX_TOP_GROUPS). Every group
+    comes with its sample message and the breakdown of its occurrences per environment.
+    """
+    serializer_class = ErrorGroupSerializer
+
+    def get_limit(self):
+        limit = settings.ERROR_TRACKER_TOP_GROUPS
+        if self.request.query_params.get('limit'):
+            try:
+                limit = int(self.request.query_params['limit'])
+            except ValueError:
+                raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(1, min(limit, settings.ERROR_TRACKER_MAX_TOP_GROUPS))
+
+    def list(self, request, *args, **kwargs):
+        groups = top_error_groups(self.get_groups(self.project_ids), self.project_ids, self.window,
+                                  self.get_limit(), self.now)
+        attach_environments(groups, self.window, self.now)
+        return Response(self.get_serializer(groups, many=True).data, status=status.HTTP_200_OK)
+
+
+class ErrorGroupDetailView(ReplicaReadMixin, ErrorGroupViewMixin, generics.RetrieveAPIView):
+    """
+    Handles GET requests for a single ErrorGroup, with the parameters of ErrorGroupViewMixin.
+    """
+    serializer_class = ErrorGroupSerializer
+
+    def get_queryset(self):
+        return self.get_groups(self.project_ids).select_related('project', 'sample_message_blob')
+
+    def retrieve(self, request, *args, **kwargs):
+        group = self.get_object()
+        attach_window_counts([group], self.window, self.now)
+        attach_environments([group], self.window, self.now)
+        return Response(self.get_serializer(group).data, status=status.HTTP_200_OK)
+
+
+class ErrorHistogramView(ReplicaReadMixin, APIView):
+    """
+    Handles GET requests for the number of ErrorLogs of a project per time bucket, with JWT authentication.
+
+    The counts are read from the ErrorRollups maintained at ingestion; minute and hour buckets
+    older than their retention, see delete_expired_rollups, count 0. Query parameters:
+
+        project      UUID of one of the user's projects, required
+        group        ErrorGroup id, all groups by default
+        environment  exact environment name, all environments by default
+        resolution   minute, hour (default) or day
+        start        ISO 8601 datetime, inclusive; defaults to DEFAULT_WINDOWS[resolution] before end
+        end          ISO 8601 datetime, exclusive; defaults to now
+    """
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_WINDOWS = {
+        ErrorRollup.MINUTE: timedelta(hours=1),
+        ErrorRollup.HOUR: timedelta(days=1),
+        ErrorRollup.DAY: timedelta(days=30),
+    }
+
+    def get(self, request):
+        params = request.query_params
+
+        project_uuid = normalize_uuid(params.get('project'))
+        if project_uuid is None:
+            raise ValidationError({'project': 'Enter a valid UUID.'})
+        project_id = Project.objects.filter(user=request.user, uuid=project_uuid).values_list('id', flat=True).first()
+        if project_id is None:
+            raise NotFound('Project not found.')
+
+        resolution = params.get('resolution') or ErrorRollup.HOUR
+        if resolution not in BUCKET_SIZES:
+            raise ValidationError({'resolution': f'Must be one of: {", ".join(BUCKET_SIZES)}.'})
+
+        group_id = ErrorRollup.ALL_GROUPS
+        if params.get('group'):
+            try:
+                group_id = int(params['group'])
+            except ValueError:
+                raise ValidationError({'group': 'A valid integer is required.'})
+
+        environment = params.get('environment') or ErrorRollup.ALL_ENVIRONMENTS
+
+        end = parse_datetime_param(params, 'end') or timezone.now()
+        start = parse_datetime_param(params, 'start') or end - self.DEFAULT_WINDOWS[resolution]
+        if start >= end:
+            raise ValidationError({'start': 'Must be before end.'})
+        max_buckets = settings.ERROR_TRACKER_HISTOGRAM_MAX_BUCKETS
+        if (end - start) / BUCKET_SIZES[resolution] > max_buckets:
+            raise ValidationError({'start': f'The range spans more than {max_buckets} {resolution} buckets.'})
+
+        histogram = get_histogram(project_id, resolution, start, end, group_id=group_id, environment=environment)
+        return Response({
+            'resolution': resolution,
+            'buckets': [{'bucket': bucket, 'count': count} for bucket, count in histogram],
+        }, status=status.HTTP_200_OK)
+
+
+class MetricsView(APIView):
+    """
+    Returns the ingestion metrics of the worker process that serves the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        snapshot = metrics.snapshot()
+        snapshot['gauges']['ingest.queue.depth'] = error_log_writer.qsize()
+        return Response(snapshot, status=status.HTTP_200_OK)
 
-        error_type = type_match.group(1) if type_match else "UnknownError"
-        error_signature = f"{location_match.group(1)}:{location_match.group(2)}" if location_match else "unknown_location"
 
-        return error_type, error_signature
+def queue_full_response():
+    return Response(
+        {'detail': 'The ingestion queue is full, retry later.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': '1'},
+    )
@@ -0,0 +1,158 @@
+"""
+Routing of read-heavy endpoints to read replicas of the default database.
+
+Reads only go to a replica inside replica_reads(), which ReplicaReadMixin enters for the safe
+requests of the views it is mixed into; everything else, writes included, uses the default
+database. After a user writes (any successful unsafe request), their reads stay on the default
+database for DATABASE_REPLICA_STICKINESS seconds so they see their own changes despite the
+replication lag.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Sends the reads made in the block to a replica, if any is configured.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def iter_with_replica_reads(iterable):
+    """
+    Iterates over iterable with replica reads enabled around every step only, so a streamed
+    response never leaks the setting to whatever runs between two chunks.
+    """
+    iterator = iter(iterable)
+    while True:
+        with replica_reads():
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class ReplicaRouter:
+    """
+    Picks a random replica of DATABASE_REPLICAS for the reads made inside replica_reads(), unless
+    the default database is in a transaction, in which case reads must see its writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and settings.DATABASE_REPLICAS
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the default database
+        return True
+
+
+def _sticky_key(user):
+    return f'replica-sticky:{user.pk}'
+
+
+def _stickiness_cache():
+    return caches[settings.DATABASE_REPLICA_STICKINESS_CACHE]
+
+
+def mark_sticky(user):
+    """
+    Keeps the reads of user on the default database for DATABASE_REPLICA_STICKINESS seconds.
+    """
+    if settings.DATABASE_REPLICAS and settings.DATABASE_REPLICA_STICKINESS > 0:
+        _stickiness_cache().set(_sticky_key(user), True, settings.DATABASE_REPLICA_STICKINESS)
+
+
+def is_sticky(user):
+    if not settings.DATABASE_REPLICAS or not user.is_authenticated:
+        return False
+    return _stickiness_cache().get(_sticky_key(user), False)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Marks the user of every successful unsafe request as sticky to the default database.
+
+    DRF sets the user it authenticates (e.g. from a JWT) on the underlying request, so it is
+    known here once the view has run. A session user the view never looked at is not loaded.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user = self.get_writing_user(request, response)
+        if user is not None:
+            mark_sticky(user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user = self.get_writing_user(request, response)
+        if user is not None:
+            await sync_to_async(mark_sticky)(user)
+        return response
+
+    @staticmethod
+    def get_writing_user(request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            return None
+        return user if user is not None and user.is_authenticated else None
+
+
+class ReplicaReadMixin:
+    """
+    Serves the safe requests of a DRF view from a read replica, unless the user wrote recently.
+
+    Authentication and permission checks run on the default database; everything from the
+    handler on, including the iteration of a streamed response, reads from the replica.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_sticky(request.user):
+            self._replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            self._replica_token = None
+            _replica_reads.reset(token)
+            if response.streaming:
+                response.streaming_content = iter_with_replica_reads(response.streaming_content)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -71,6 +72,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'error_tracker.middleware.RequestDecompressionMiddleware',
+    'nomorebugs.db_routing.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'nomorebugs.urls'
@@ -109,6 +112,29 @@ DATABASES = {
     }
 }
 
+# Read replicas of the default database, as comma-separated host[:port] in DB_REPLICA_HOSTS.
+# List, search, export, group and analysis reads go to a random replica, see nomorebugs.db_routing.
+# Tests use the default database for them unless DB_REPLICA_TEST_MIRROR is False, e.g. to run the
+# routing tests against two local databases.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    alias = f'replica_{index + 1}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'} if environ.get('DB_REPLICA_TEST_MIRROR', 'True') == 'True' else {},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['nomorebugs.db_routing.ReplicaRouter']
+
+# Seconds a user's reads stay on the default database after they write, and the cache shared by
+# the workers remembering it
+DATABASE_REPLICA_STICKINESS = int(environ.get('DATABASE_REPLICA_STICKINESS', 5))
+DATABASE_REPLICA_STICKINESS_CACHE = environ.get('DATABASE_REPLICA_STICKINESS_CACHE', 'default')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -150,3 +176,140 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Error tracker ingestion
+
+# Maximum number of events accepted by a single batch upload
+ERROR_TRACKER_MAX_BATCH_SIZE = int(environ.get('ERROR_TRACKER_MAX_BATCH_SIZE', 1000))
+
+# NDJSON uploads are stored every CHUNK_SIZE valid lines; longer lines are rejected and at most
+# MAX_REPORTED_ERRORS rejected lines are detailed in the response
+ERROR_TRACKER_NDJSON_CHUNK_SIZE = int(environ.get('ERROR_TRACKER_NDJSON_CHUNK_SIZE', 500))
+ERROR_TRACKER_NDJSON_MAX_LINE_SIZE = int(environ.get('ERROR_TRACKER_NDJSON_MAX_LINE_SIZE', 1024 * 1024))
+ERROR_TRACKER_NDJSON_MAX_REPORTED_ERRORS = int(environ.get('ERROR_TRACKER_NDJSON_MAX_REPORTED_ERRORS', 1000))
+
+# gzip/deflate request bodies are accepted on these paths, up to this many decompressed bytes
+REQUEST_DECOMPRESSION_PATHS = ['/api/error-tracker/']
+REQUEST_DECOMPRESSION_MAX_SIZE = int(environ.get('REQUEST_DECOMPRESSION_MAX_SIZE', 20 * 1024 * 1024))
+
+# Serve POST on error-logs/ with the async-native view; only useful when running under ASGI
+ERROR_TRACKER_ASYNC_INGEST = environ.get('ERROR_TRACKER_ASYNC_INGEST', 'False') == 'True'
+
+# Write-behind mode: ingest endpoints answer 202 and a background thread stores the events
+ERROR_TRACKER_WRITE_BEHIND = environ.get('ERROR_TRACKER_WRITE_BEHIND', 'False') == 'True'
+ERROR_TRACKER_QUEUE_MAX_SIZE = int(environ.get('ERROR_TRACKER_QUEUE_MAX_SIZE', 50000))
+ERROR_TRACKER_FLUSH_BATCH_SIZE = int(environ.get('ERROR_TRACKER_FLUSH_BATCH_SIZE', 500))
+ERROR_TRACKER_FLUSH_INTERVAL = float(environ.get('ERROR_TRACKER_FLUSH_INTERVAL', 1.0))
+ERROR_TRACKER_SHUTDOWN_TIMEOUT = float(environ.get('ERROR_TRACKER_SHUTDOWN_TIMEOUT', 10.0))
+
+# Number of (project, fingerprint) -> ErrorGroup id entries kept in memory by each worker
+ERROR_TRACKER_GROUP_CACHE_SIZE = int(environ.get('ERROR_TRACKER_GROUP_CACHE_SIZE', 100000))
+
+# Seconds during which ErrorGroup counter increments are accumulated before being written,
+# 0 writes them with every ingestion call
+ERROR_TRACKER_COUNTER_FLUSH_INTERVAL = float(environ.get('ERROR_TRACKER_COUNTER_FLUSH_INTERVAL', 0))
+
+# Per-project ingestion token bucket (events per second, 0 disables it, and bucket size), used
+# unless the project defines its own. Buckets and sampling counters live in this cache, which
+# must be shared between workers (e.g. Redis) for the limits to be global.
+ERROR_TRACKER_INGEST_RATE_LIMIT = int(environ.get('ERROR_TRACKER_INGEST_RATE_LIMIT', 100))
+ERROR_TRACKER_INGEST_BURST = int(environ.get('ERROR_TRACKER_INGEST_BURST', 1000))
+ERROR_TRACKER_THROTTLE_CACHE = environ.get('ERROR_TRACKER_THROTTLE_CACHE', 'default')
+
+# Once a group got THRESHOLD occurrences within WINDOW seconds, only one in KEEP_EVERY further
+# occurrences is stored; all of them are still counted. A threshold of 0 disables sampling.
+ERROR_TRACKER_SAMPLING_THRESHOLD = int(environ.get('ERROR_TRACKER_SAMPLING_THRESHOLD', 1000))
+ERROR_TRACKER_SAMPLING_WINDOW = int(environ.get('ERROR_TRACKER_SAMPLING_WINDOW', 60))
+ERROR_TRACKER_SAMPLING_KEEP_EVERY = int(environ.get('ERROR_TRACKER_SAMPLING_KEEP_EVERY', 100))
+
+# Error messages of at least this many bytes are zlib-compressed in their ErrorMessageBlob
+ERROR_TRACKER_MESSAGE_COMPRESSION_MIN_SIZE = int(environ.get('ERROR_TRACKER_MESSAGE_COMPRESSION_MIN_SIZE', 512))
+ERROR_TRACKER_MESSAGE_COMPRESSION_LEVEL = int(environ.get('ERROR_TRACKER_MESSAGE_COMPRESSION_LEVEL', 6))
+
+# Default and maximum number of ErrorLogs per page of the list endpoint
+ERROR_TRACKER_PAGE_SIZE = int(environ.get('ERROR_TRACKER_PAGE_SIZE', 50))
+ERROR_TRACKER_MAX_PAGE_SIZE = int(environ.get('ERROR_TRACKER_MAX_PAGE_SIZE', 500))
+
+# Lists over at most this many projects are read with one index scan per project and merged,
+# see error_tracker.filters.first_rows; above it, the matching rows are sorted
+ERROR_TRACKER_LIST_MAX_MERGED_PROJECTS = int(environ.get('ERROR_TRACKER_LIST_MAX_MERGED_PROJECTS', 100))
+
+# Render JSON ErrorLog lists from values_list() rows instead of ErrorLogSerializer; both produce
+# the same bytes
+ERROR_TRACKER_FAST_LIST = environ.get('ERROR_TRACKER_FAST_LIST', 'True') == 'True'
+
+# Number of rows fetched per round trip by the server-side cursor of the export endpoint
+ERROR_TRACKER_EXPORT_CHUNK_SIZE = int(environ.get('ERROR_TRACKER_EXPORT_CHUNK_SIZE', 2000))
+
+# Retention of ErrorLogs. Projects pick a number of days that is rounded up to one of the tiers;
+# on PostgreSQL the ErrorLog table can be partitioned per tier and per day or month of
+# created_at, so expired ErrorLogs are removed by dropping whole partitions
+ERROR_TRACKER_RETENTION_TIERS = [int(days) for days in environ.get('ERROR_TRACKER_RETENTION_TIERS', '7,30,90,365').split(',')]
+ERROR_TRACKER_DEFAULT_RETENTION_DAYS = int(environ.get('ERROR_TRACKER_DEFAULT_RETENTION_DAYS', 90))
+ERROR_TRACKER_RETENTION_CACHE_TTL = int(environ.get('ERROR_TRACKER_RETENTION_CACHE_TTL', 60))
+ERROR_TRACKER_PARTITION_INTERVAL = environ.get('ERROR_TRACKER_PARTITION_INTERVAL', 'day')
+ERROR_TRACKER_PARTITIONS_AHEAD = int(environ.get('ERROR_TRACKER_PARTITIONS_AHEAD', 7))
+
+# Full-text search over error messages: text search configuration ('simple' keeps identifiers
+# such as ConnectionResetError unstemmed) and number of characters of a message indexed
+ERROR_TRACKER_SEARCH_CONFIG = environ.get('ERROR_TRACKER_SEARCH_CONFIG', 'simple')
+ERROR_TRACKER_SEARCH_MAX_CHARS = int(environ.get('ERROR_TRACKER_SEARCH_MAX_CHARS', 100000))
+
+# Number of days minute and hour ErrorRollups are kept for histograms; never less than the
+# longest group window read at their resolution. Day ErrorRollups are kept with their project
+ERROR_TRACKER_MINUTE_ROLLUP_RETENTION_DAYS = int(environ.get('ERROR_TRACKER_MINUTE_ROLLUP_RETENTION_DAYS', 2))
+ERROR_TRACKER_HOUR_ROLLUP_RETENTION_DAYS = int(environ.get('ERROR_TRACKER_HOUR_ROLLUP_RETENTION_DAYS', 90))
+
+# Maximum number of buckets returned by the histogram endpoint
+ERROR_TRACKER_HISTOGRAM_MAX_BUCKETS = int(environ.get('ERROR_TRACKER_HISTOGRAM_MAX_BUCKETS', 1500))
+
+# Default and maximum number of groups returned by the top ErrorGroups endpoint
+ERROR_TRACKER_TOP_GROUPS = int(environ.get('ERROR_TRACKER_TOP_GROUPS', 20))
+ERROR_TRACKER_MAX_TOP_GROUPS = int(environ.get('ERROR_TRACKER_MAX_TOP_GROUPS', 100))
+
+# Similar errors (error_tracker.similarity): minimum estimated Jaccard similarity of the
+# normalized messages, number of candidates compared and of similar fingerprints returned, and
+# number of characters of a message shingled (its start and end)
+ERROR_TRACKER_SIMILARITY_THRESHOLD = float(environ.get('ERROR_TRACKER_SIMILARITY_THRESHOLD', 0.5))
+ERROR_TRACKER_SIMILARITY_MAX_CANDIDATES = int(environ.get('ERROR_TRACKER_SIMILARITY_MAX_CANDIDATES', 100))
+ERROR_TRACKER_SIMILAR_LIMIT = int(environ.get('ERROR_TRACKER_SIMILAR_LIMIT', 10))
+ERROR_TRACKER_SIMILARITY_MAX_CHARS = int(environ.get('ERROR_TRACKER_SIMILARITY_MAX_CHARS', 20000))
+
+# Analyses shared per error fingerprint: in-process LRU size, and cache of CACHES shared by the
+# workers (None to only use the in-process LRU and the database) with its timeout in seconds
+ANALYZER_CACHE_SIZE = int(environ.get('ANALYZER_CACHE_SIZE', 10000))
+ANALYZER_CACHE_ALIAS = environ.get('ANALYZER_CACHE_ALIAS', 'default') or None
+ANALYZER_CACHE_TTL = int(environ.get('ANALYZER_CACHE_TTL', 24 * 3600))
+
+# Provider of the analyses (dotted path of an analyzer.backends class) and its OpenAI settings
+ANALYZER_BACKEND = environ.get('ANALYZER_BACKEND', 'analyzer.backends.StubBackend')
+ANALYZER_OPENAI_API_KEY = environ.get('ANALYZER_OPENAI_API_KEY') or environ.get('OPENAI_API_KEY')
+ANALYZER_OPENAI_MODEL = environ.get('ANALYZER_OPENAI_MODEL', 'gpt-4')
+
+# Provider calls: at most ANALYZER_MAX_CONCURRENCY at once and ANALYZER_MAX_PENDING distinct
+# prompts queued or running per process, ANALYZER_TIMEOUT seconds per attempt, and
+# ANALYZER_RETRIES retries after a jittered delay of up to ANALYZER_RETRY_BACKOFF * 2 ** attempt
+ANALYZER_MAX_CONCURRENCY = int(environ.get('ANALYZER_MAX_CONCURRENCY', 4))
+ANALYZER_MAX_PENDING = int(environ.get('ANALYZER_MAX_PENDING', 100))
+ANALYZER_TIMEOUT = float(environ.get('ANALYZER_TIMEOUT', 30))
+ANALYZER_RETRIES = int(environ.get('ANALYZER_RETRIES', 2))
+ANALYZER_RETRY_BACKOFF = float(environ.get('ANALYZER_RETRY_BACKOFF', 0.5))
+
+# Compaction of error messages in prompts: estimated token budget of a message, characters kept
+# of the lines of a frame (e.g. locals), and frames kept at both ends of a traceback
+ANALYZER_PROMPT_TOKEN_BUDGET = int(environ.get('ANALYZER_PROMPT_TOKEN_BUDGET', 3000))
+ANALYZER_PROMPT_MAX_LINE_CHARS = int(environ.get('ANALYZER_PROMPT_MAX_LINE_CHARS', 200))
+ANALYZER_PROMPT_EDGE_FRAMES = int(environ.get('ANALYZER_PROMPT_EDGE_FRAMES', 5))
+
+# Background analysis of the error groups hit in the window (one of error_tracker.groups.WINDOWS),
+# see analyzer.preanalysis: number of fingerprints queued at once and seconds between two polls
+ANALYZER_PREANALYSIS_WINDOW = environ.get('ANALYZER_PREANALYSIS_WINDOW', '1h')
+ANALYZER_PREANALYSIS_QUEUE_SIZE = int(environ.get('ANALYZER_PREANALYSIS_QUEUE_SIZE', 100))
+ANALYZER_PREANALYSIS_INTERVAL = float(environ.get('ANALYZER_PREANALYSIS_INTERVAL', 60))
+
+# API key -> project resolution cache used by the ingestion endpoints. Set API_KEY_CACHE_ALIAS
+# to the name of an entry of CACHES to share it between worker processes.
+API_KEY_CACHE_MAX_SIZE = int(environ.get('API_KEY_CACHE_MAX_SIZE', 10000))
+API_KEY_CACHE_TTL = int(environ.get('API_KEY_CACHE_TTL', 30))
+API_KEY_CACHE_ALIAS = environ.get('API_KEY_CACHE_ALIAS') or None
@@ -7,5 +7,6 @@ urlpatterns = [
     path('api/users/', include('user_management.urls')),
     path('api/project-integrations/', include('project_integrations.urls')),
     path('api/error-tracker/', include('error_tracker.urls')),
+    path('api/analyze/', include('analyzer.urls')),
 
 ]
@@ -0,0 +1,160 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+from django.core.cache import caches
+from .models import APIKey, Project
+
+
+# What the ingestion endpoints need to know about the project an API key belongs to
+ResolvedProject = namedtuple('ResolvedProject', ['uuid', 'id', 'ingest_rate_limit', 'ingest_burst'])
+
+
+class APIKeyCache:
+    """
+    Maps an API key to the ResolvedProject it belongs to.
+
+    Entries live in an in-process LRU with a TTL and, when API_KEY_CACHE_ALIAS names one of
+    the configured CACHES, in Django's cache framework as a second level shared by every
+    worker. Deleting an APIKey invalidates both levels of the current process; other
+    processes drop their local copy once the TTL expires.
+    """
+    key_prefix = 'api-key:'
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return settings.API_KEY_CACHE_MAX_SIZE
+
+    @property
+    def ttl(self):
+        return settings.API_KEY_CACHE_TTL
+
+    @property
+    def shared(self):
+        alias = settings.API_KEY_CACHE_ALIAS
+        return caches[alias] if alias else None
+
+    def get(self, api_key):
+        value = self._get_local(api_key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(self.key_prefix + api_key)
+            if value is not None:
+                self._store_local(api_key, value)
+        return value
+
+    async def aget(self, api_key):
+        value = self._get_local(api_key)
+        if value is None and self.shared is not None:
+            value = await self.shared.aget(self.key_prefix + api_key)
+            if value is not None:
+                self._store_local(api_key, value)
+        return value
+
+    def set(self, api_key, value):
+        self._store_local(api_key, value)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + api_key, value, self.ttl)
+
+    async def aset(self, api_key, value):
+        self._store_local(api_key, value)
+        if self.shared is not None:
+            await self.shared.aset(self.key_prefix + api_key, value, self.ttl)
+
+    def invalidate(self, api_key):
+        with self._lock:
+            self._entries.pop(api_key, None)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + api_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, api_key):
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(api_key)
+                return value
+            del self._entries[api_key]
+            return None
+
+    def _store_local(self, api_key, value):
+        with self._lock:
+            self._entries[api_key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(api_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+api_key_cache = APIKeyCache()
+
+
+def normalize_uuid(value):
+    """
+    Returns the canonical string form of a UUID, or None if the value is not a valid UUID.
+    """
+    try:
+        return str(value if isinstance(value, uuid.UUID) else uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def resolve_project(api_key, project_uuid):
+    """
+    Returns the ResolvedProject identified by project_uuid if api_key belongs to it.
+
+    Raises Project.DoesNotExist if the project UUID is unknown and APIKey.DoesNotExist if
+    the key does not belong to that project. Arguments must already be normalized.
+    """
+    project = api_key_cache.get(api_key)
+    if project is not None:
+        if project.uuid == project_uuid:
+            return project
+        # The key is valid but belongs to another project
+        raise APIKey.DoesNotExist
+
+    row = (APIKey.objects
+           .filter(key=api_key, project__uuid=project_uuid)
+           .values_list('project_id', 'project__ingest_rate_limit', 'project__ingest_burst')
+           .first())
+    if row is None:
+        if not Project.objects.filter(uuid=project_uuid).exists():
+            raise Project.DoesNotExist
+        raise APIKey.DoesNotExist
+
+    project = ResolvedProject(project_uuid, *row)
+    api_key_cache.set(api_key, project)
+    return project
+
+
+async def aresolve_project(api_key, project_uuid):
+    """
+    Async version of resolve_project, using the async ORM and cache APIs.
+    """
+    project = await api_key_cache.aget(api_key)
+    if project is not None:
+        if project.uuid == project_uuid:
+            return project
+        raise APIKey.DoesNotExist
+
+    row = await (APIKey.objects
+                 .filter(key=api_key, project__uuid=project_uuid)
+                 .values_list('project_id', 'project__ingest_rate_limit', 'project__ingest_burst')
+                 .afirst())
+    if row is None:
+        if not await Project.objects.filter(uuid=project_uuid).aexists():
+            raise Project.DoesNotExist
+        raise APIKey.DoesNotExist
+
+    project = ResolvedProject(project_uuid, *row)
+    await api_key_cache.aset(api_key, project)
+    return project
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProjectIntegrationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project_integrations'
+
+    def ready(self):
+        import project_integrations.signals
@@ -1,13 +1,31 @@
 import uuid
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 
 
+def validate_retention_days(days):
+    """
+    Refuses retentions longer than the longest of ERROR_TRACKER_RETENTION_TIERS, which could
+    only be honored by rounding them down.
+    """
+    longest = max(settings.ERROR_TRACKER_RETENTION_TIERS)
+    if days is not None and days > longest:
+        raise ValidationError(f"Ensure this value is less than or equal to {longest}.")
+
+
 class Project(models.Model):
     name = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    # Ingestion token bucket: events per second and bucket size, null uses the settings defaults
+    ingest_rate_limit = models.PositiveIntegerField(null=True, blank=True)
+    ingest_burst = models.PositiveIntegerField(null=True, blank=True)
+    # Days ErrorLogs are kept, rounded up to one of ERROR_TRACKER_RETENTION_TIERS; null uses
+    # ERROR_TRACKER_DEFAULT_RETENTION_DAYS
+    retention_days = models.PositiveIntegerField(null=True, blank=True, validators=[validate_retention_days])
 
     def __str__(self):
         return self.name
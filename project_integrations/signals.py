@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .api_key_cache import api_key_cache
+from .models import APIKey, Project
+
+
+@receiver(post_delete, sender=APIKey)
+def invalidate_api_key_cache(sender, instance, **kwargs):
+    # Also runs for the keys removed by the cascade when a project is deleted
+    api_key_cache.invalidate(str(instance.key))
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_api_keys(sender, instance, created, **kwargs):
+    # The cached entries carry the ingestion limits of the project
+    if not created:
+        for key in APIKey.objects.filter(project=instance).values_list('key', flat=True):
+            api_key_cache.invalidate(str(key))